@@ -1,35 +1,49 @@
+import itertools
 import json
 import os
+import multiprocessing
 import datetime as dt
+from time import perf_counter
 import xxhash
 import logging
+from typing import Optional
+from ..parser.dates import parse_date
+from ..parser.shards import iter_shard_records
+from .charges import ChargeIndex, get_charge_index, get_charge_map_hash
+from .motions import get_motion_matcher, load_good_motions
+from .pseudonyms import ATTORNEY_DIMENSION_FILENAME, Pseudonymizer
+from .report import CleanReport, split_batch_stats
+from .schema import adapt_case
+from .streams import JsonlWriter, iter_jsonl_records
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
-# List of motions identified as evidentiary.
-# TODO: These should be moved to a separate JSON in resources
-GOOD_MOTIONS = [
-    "Motion To Suppress",
-    "Motion to Reduce Bond",
-    "Motion to Reduce Bond Hearing",
-    "Motion for Production",
-    "Motion For Speedy Trial",
-    "Motion for Discovery",
-    "Motion In Limine",
-]
+# Bump when a change to the cleaner changes its output, so incremental runs re-clean every case.
+CLEANER_VERSION = "1.1.0"
+
+# List of motions identified as evidentiary, from resources/good_motions.json.
+GOOD_MOTIONS = load_good_motions()
 
 
 class Cleaner:
-    def __init__(self):
-        pass
+    def __init__(self, fuzzy_charge_cutoff: Optional[float] = None, pseudonym_key: Optional[bytes] = None):
+        """
+        fuzzy_charge_cutoff (0.0 - 1.0) maps charges that aren't in the UMich data,
+        even after normalizing, to the closest charge name at least that similar.
+        pseudonym_key hashes attorneys and cause numbers with that key (see pseudonyms.py).
+        """
+        self.fuzzy_charge_cutoff = fuzzy_charge_cutoff
+        self.pseudonymizer = Pseudonymizer(pseudonym_key)
+        self.motion_matcher = get_motion_matcher(tuple(GOOD_MOTIONS))
+        # Stage timings and unmapped charge counts of the current run (see report.py)
+        self.report = CleanReport()
 
     def redact_cause_number(self, input_dict: dict) -> str:
         # This will hash and redact the cause number and then add it to the output file.
-        cause_number_hash = xxhash.xxh64(str(input_dict["code"])).hexdigest()
-        return cause_number_hash
+        return self.pseudonymizer.hash_value(str(input_dict["code"]))
 
     def get_or_create_folder_path(self, county: str, folder_type: str) -> str:
         """Returns and ensures the existence of the folder path."""
@@ -46,6 +60,63 @@ class Cleaner:
             logging.error(f"Error creating folder '{folder_path}': {e}")
         return folder_path
 
+    def get_clean_manifest_path(self, county: str) -> str:
+        return os.path.join(
+            os.path.dirname(__file__), "..", "..", "data", county.lower(), "clean_manifest.json"
+        )
+
+    def get_attorney_dimension_path(self, county: str) -> str:
+        """The attorney table sits next to the clean manifest, in data/<county>."""
+        return os.path.join(
+            os.path.dirname(self.get_clean_manifest_path(county)), ATTORNEY_DIMENSION_FILENAME
+        )
+
+    def load_clean_manifest(self, county: str) -> dict:
+        """The input hash each case was last cleaned from, keyed by its file name."""
+        manifest_path = self.get_clean_manifest_path(county)
+        try:
+            with open(manifest_path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError as e:
+            logging.warning(f"Ignoring unreadable clean manifest {manifest_path}: {e}")
+            return {}
+
+    def write_clean_manifest(self, county: str, manifest: dict) -> None:
+        manifest_path = self.get_clean_manifest_path(county)
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        # Write to a temporary file first so an interrupted run can't truncate the manifest.
+        with open(manifest_path + ".tmp", "w") as f:
+            json.dump(manifest, f)
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+    def get_input_hash(self, input_dict: dict) -> Optional[str]:
+        """
+        Hash of everything the cleaned output depends on: the case's html_hash and
+        parser version, the cleaner version, the charge map, the fuzzy charge cutoff
+        and the good motions list. None for cases parsed without an html_hash.
+        """
+        input_dict = adapt_case(input_dict)
+        html_hash = input_dict.get("html_hash")
+        if not html_hash:
+            return None
+        input_key = f"{html_hash}:{CLEANER_VERSION}:{get_charge_map_hash()}:{self.motion_matcher.motions_hash}"
+        # runs without fuzzy matching keep the hash they always had for it
+        if self.fuzzy_charge_cutoff is not None:
+            input_key += f":fuzzy={self.fuzzy_charge_cutoff}"
+        # unkeyed pseudonyms are the ones cases were always cleaned with
+        if self.pseudonymizer.key is not None:
+            input_key += f":{self.pseudonymizer.hash_scheme}"
+        # cases from before parser_version existed keep the hash they were cleaned with
+        parser_version = input_dict.get("parser_version")
+        if parser_version:
+            input_key += f":{parser_version}"
+        return xxhash.xxh64(input_key).hexdigest()
+
+    def get_charge_index(self) -> ChargeIndex:
+        return get_charge_index(fuzzy_cutoff=self.fuzzy_charge_cutoff)
+
     def load_json_file(self, file_path: str) -> dict:
         """Loads a JSON file from a given file path and returns the data as an object"""
         try:
@@ -55,22 +126,8 @@ class Cleaner:
             logging.error(f"Error loading file at {file_path}: {e}")
             return {}
 
-    def load_and_map_charge_names(self, file_path: str) -> dict:
-        """Loads a JSON file and maps charge names to their corresponding UMich data."""
-        charge_data = self.load_json_file(file_path)
-        # Check if the file loaded successfully
-        if not charge_data:
-            logging.error(f"Failed to load charge data from {file_path}")
-            raise FileNotFoundError(f"File not found or is empty: {file_path}")
-        # Create dictionary mapping charge names
-        try:
-            return {item["charge_name"]: item for item in charge_data}
-        except KeyError as e:
-            logging.error(f"Error in mapping charge names: {e}")
-            raise ValueError(f"Invalid data structure: {file_path}")
-
     def process_charges(
-        self, charges: list[dict], charge_mapping: dict
+        self, charges: list[dict], charge_mapping: dict | ChargeIndex
     ) -> tuple[list[dict], str]:
         """
         Processes a list of charges by formatting charge details,
@@ -78,7 +135,7 @@ class Cleaner:
 
         Args:
             charges: A list of charges where each charge is a dictionary containing charge details.
-            charge_mapping: A dictionary mapping charge names to corresponding UMich data.
+            charge_mapping: A dictionary or ChargeIndex mapping charge names to corresponding UMich data.
 
         Returns:
             tuple: A list of processed charges and the earliest charge date.
@@ -96,55 +153,53 @@ class Cleaner:
             }
 
             # Parse the charge date and append it to charge_dates
-            try:
-                charge_datetime = dt.datetime.strptime(charge["date"], "%m/%d/%Y")
-                charge_dates.append(charge_datetime)
-                charge_dict["charge_date"] = dt.datetime.strftime(
-                    charge_datetime, "%Y-%m-%d"
-                )
-            except ValueError:
-                logging.error(f"Error parsing date for charge: {charge}")
+            charge_date = parse_date(charge["date"])
+            if charge_date is None:
+                logging.debug(f"Error parsing date for charge: {charge}")
+                self.report.add_unparsed_date()
                 continue
+            charge_dates.append(charge_date)
+            charge_dict["charge_date"] = charge_date.isoformat()
 
             # Try to map the charge to UMich data
             try:
                 charge_dict.update(charge_mapping[charge["charges"]])
             except KeyError:
-                logging.warning(f"Couldn't find this charge: {charge['charges']}")
+                # counted in the run report rather than logged as a warning per charge
+                logging.debug(f"Couldn't find this charge: {charge['charges']}")
+                self.report.add_unmapped_charge(charge["charges"])
                 continue
 
             processed_charges.append(charge_dict)
 
         # Find the earliest charge date
         if charge_dates:
-            earliest_charge_date = dt.datetime.strftime(min(charge_dates), "%Y-%m-%d")
+            earliest_charge_date = min(charge_dates).isoformat()
         else:
             logging.warning("No valid charge dates found.")
             earliest_charge_date = ""
 
         return processed_charges, earliest_charge_date
 
-    def contains_good_motion(self, motion: str, event: list | str) -> bool:
-        """Recursively check if a motion exists in an event list or sublist."""
-        if isinstance(event, list):
-            return any(self.contains_good_motion(motion, item) for item in event)
-        return motion.lower() in event.lower()
-
     def find_good_motions(
         self, events: list | str, good_motions: list[str]
     ) -> list[str]:
         """Finds motions in events based on list of good motions."""
-        return [
-            motion
-            for motion in good_motions
-            if self.contains_good_motion(motion, events)
-        ]
+        return get_motion_matcher(tuple(good_motions)).find_motions(events)
+
+    def find_good_motion_events(
+        self, events: list | str, good_motions: list[str]
+    ) -> list[dict]:
+        """The motion, event and date of each good motion found in events."""
+        return get_motion_matcher(tuple(good_motions)).find_hits(events)
 
     def hash_defense_attorney(self, input_dict: dict) -> str:
         """Hashes the defense attorney info to anonymize it."""
         try:
-            def_atty_unique_str = f'{input_dict["party information"]["defense attorney"]}:{input_dict["party information"]["defense attorney phone number"]}'
-            return xxhash.xxh64(def_atty_unique_str).hexdigest()
+            party_information = input_dict["party information"]
+            return self.pseudonymizer.attorney_id(
+                party_information["defense attorney"], party_information["defense attorney phone number"]
+            )
         except KeyError as e:
             logging.error(f"Missing defense attorney data: {e}")
             return ""
@@ -158,19 +213,12 @@ class Cleaner:
         except OSError as e:
             logging.error(f"Failed to write JSON output to {file_path}: {e}")
 
-    def process_single_case(
-        self,
-        case_json_folder_path: str,
-        case_json_filename: str,
-        cleaned_folder_path: str,
-    ) -> None:
-        """Process a single case JSON file."""
-        input_json_path = os.path.join(case_json_folder_path, case_json_filename)
-        input_dict = self.load_json_file(input_json_path)
-
-        if not input_dict:
-            logging.error(f"Failed to load case data from {input_json_path}")
-            return
+    def clean_case_data(self, input_dict: dict) -> dict:
+        """Builds the cleaned output for a single parsed case, in any layout adapt_case reads."""
+        input_dict = adapt_case(input_dict)
+        with self.report.stage("hashing"):
+            defense_attorney = self.hash_defense_attorney(input_dict)
+            cause_number_redacted = self.redact_cause_number(input_dict)
 
         # Initialize cleaned output data
         output_json_data = {
@@ -181,60 +229,404 @@ class Cleaner:
             "charges": [],
             "earliest_charge_date": "",
             "motions": [],
+            "motion_events": [],
             "has_evidence_of_representation": False,
-            "defense_attorney": self.hash_defense_attorney(input_dict),
+            "defense_attorney": defense_attorney,
             "parsing_date": dt.datetime.today().strftime("%Y-%m-%d"),
         }
 
-        # Load charge mappings
-        charge_name_to_umich_file = os.path.join(
-            os.path.dirname(__file__),
-            "..",
-            "..",
-            "resources",
-            "umich-uccs-database.json",
-        )
-        charges_mapped = self.load_and_map_charge_names(charge_name_to_umich_file)
+        with self.report.stage("charges"):
+            # Charge mappings, loaded once per process
+            charges_mapped = self.get_charge_index()
+            output_json_data["charges"], output_json_data["earliest_charge_date"] = (
+                self.process_charges(input_dict["charge information"], charges_mapped)
+            )
 
-        # Process charges and motions
-        output_json_data["charges"], output_json_data["earliest_charge_date"] = (
-            self.process_charges(input_dict["charge information"], charges_mapped)
-        )
-        output_json_data["motions"] = self.find_good_motions(
-            input_dict["other events and hearings"], GOOD_MOTIONS
-        )
+        with self.report.stage("motions"):
+            output_json_data["motion_events"] = self.motion_matcher.find_hits(
+                input_dict["other events and hearings"]
+            )
+        found_motions = {hit["motion"] for hit in output_json_data["motion_events"]}
+        output_json_data["motions"] = [
+            motion for motion in self.motion_matcher.motions if motion in found_motions
+        ]
         output_json_data["has_evidence_of_representation"] = (
             len(output_json_data["motions"]) > 0
         )
 
-        output_json_data["cause_number_redacted"] = self.redact_cause_number(input_dict)
+        output_json_data["cause_number_redacted"] = cause_number_redacted
+
+        return output_json_data
+
+    def process_single_case(
+        self,
+        case_json_folder_path: str,
+        case_json_filename: str,
+        cleaned_folder_path: str,
+        previous_input_hash: Optional[str] = None,
+    ) -> tuple[str, Optional[str]]:
+        """
+        Process a single case JSON file.
+
+        Returns the status, "cleaned", "skipped" when its input hash is still
+        previous_input_hash and the cleaned file exists, or "failed" when it couldn't
+        be loaded, along with the input hash.
+        """
+        input_json_path = os.path.join(case_json_folder_path, case_json_filename)
+        with self.report.stage("load"):
+            input_dict = self.load_json_file(input_json_path)
+
+        if not input_dict:
+            logging.error(f"Failed to load case data from {input_json_path}")
+            return "failed", None
 
-        # Write output to file
         output_filepath = os.path.join(cleaned_folder_path, case_json_filename)
-        self.write_json_output(output_filepath, output_json_data)
+        with self.report.stage("hashing"):
+            input_hash = self.get_input_hash(input_dict)
+        if (
+            input_hash is not None
+            and input_hash == previous_input_hash
+            and os.path.exists(output_filepath)
+        ):
+            return "skipped", input_hash
+
+        output_json_data = self.clean_case_data(input_dict)
+
+        # Write output to file
+        with self.report.stage("write"):
+            self.write_json_output(output_filepath, output_json_data)
+        return "cleaned", input_hash
+
+    def clean_file(
+        self, task: tuple[str, str, str, Optional[str]]
+    ) -> tuple[str, str, Optional[str], Optional[str], Optional[dict]]:
+        """
+        Cleans one (case_json_folder_path, case_json_filename, cleaned_folder_path,
+        previous_input_hash) task. Returns the file name, status, input hash, error
+        and the case's stats (None when it was skipped): its run report stats, and
+        under "attorneys" the attorney table rows it added.
+        """
+        case_json_filename = task[1]
+        self.report.start_case(case_json_filename)
+        try:
+            status, input_hash = self.process_single_case(*task)
+        except Exception as e:
+            logging.error(f"Error processing file {case_json_filename}. Error: {e}")
+            return case_json_filename, "failed", None, repr(e), self.finish_case_stats()
+        if status == "skipped":
+            self.report.cancel_case()
+            return case_json_filename, status, input_hash, None, None
+        error = "could not be loaded" if status == "failed" else None
+        return case_json_filename, status, input_hash, error, self.finish_case_stats()
+
+    def finish_case_stats(self) -> dict:
+        stats = self.report.finish_case()
+        stats["attorneys"] = self.pseudonymizer.take_new_attorneys()
+        return stats
+
+    def clean_files_batch(
+        self, task: tuple[str, list[str], str, list[Optional[str]]]
+    ) -> list[tuple[str, str, Optional[str], Optional[str], Optional[dict]]]:
+        """
+        Cleans a (case_json_folder_path, case_json_filenames, cleaned_folder_path,
+        previous_input_hashes) task as one batch (see batch.py), skipping unchanged
+        cases like process_single_case. Returns what clean_file does for each file,
+        with the batch's stats shared out over the files that weren't skipped.
+        """
+        # pyarrow is only needed for batch cleaning
+        from .batch import clean_case_batch
+
+        case_json_folder_path, case_json_filenames, cleaned_folder_path, previous_input_hashes = task
+        self.report.start_case(case_json_filenames[0] if case_json_filenames else "")
+        results = []
+        pending = []
+        for case_json_filename, previous_input_hash in zip(case_json_filenames, previous_input_hashes):
+            input_json_path = os.path.join(case_json_folder_path, case_json_filename)
+            with self.report.stage("load"):
+                input_dict = self.load_json_file(input_json_path)
+            if not input_dict:
+                logging.error(f"Failed to load case data from {input_json_path}")
+                results.append((case_json_filename, "failed", None, "could not be loaded"))
+                continue
+            with self.report.stage("hashing"):
+                input_hash = self.get_input_hash(input_dict)
+            if (
+                input_hash is not None
+                and input_hash == previous_input_hash
+                and os.path.exists(os.path.join(cleaned_folder_path, case_json_filename))
+            ):
+                results.append((case_json_filename, "skipped", input_hash, None))
+                continue
+            pending.append((case_json_filename, input_hash, input_dict))
+
+        with self.report.stage("batch"):
+            cleaned_cases = clean_case_batch(self, [input_dict for _, _, input_dict in pending])
+        for (case_json_filename, input_hash, _), (output_json_data, error) in zip(pending, cleaned_cases):
+            if error is None:
+                try:
+                    with self.report.stage("write"):
+                        with open(os.path.join(cleaned_folder_path, case_json_filename), "w") as f:
+                            json.dump(output_json_data, f)
+                except OSError as e:
+                    error = repr(e)
+            if error is None:
+                results.append((case_json_filename, "cleaned", input_hash, None))
+            else:
+                logging.error(f"Error processing file {case_json_filename}. Error: {error}")
+                results.append((case_json_filename, "failed", None, error))
+
+        counted = [result for result in results if result[1] != "skipped"]
+        shares = iter(split_batch_stats(self.finish_case_stats(), len(counted)))
+        return [
+            (*result, None if result[1] == "skipped" else next(shares)) for result in results
+        ]
+
+    def process_json_files(
+        self,
+        county: str,
+        case_json_folder_path: str,
+        workers: int = 1,
+        chunksize: int = 64,
+        force: bool = False,
+        batch_size: Optional[int] = None,
+    ) -> dict:
+        """
+        Processes all JSON files in the specified folder.
+
+        Cases whose html_hash, cleaner version and charge map are unchanged since they
+        were last cleaned (per data/<county>/clean_manifest.json) are skipped, and keep
+        their cleaned file as it is. force re-cleans every case.
 
-    def process_json_files(self, county: str, case_json_folder_path: str) -> None:
-        """Processes all JSON files in the specified folder."""
+        workers > 1 cleans them in that many processes, handing out chunksize files
+        at a time. Each worker loads the charge index once, when it starts.
+        batch_size cleans the files batch_size at a time with clean_files_batch,
+        which writes the same output with the charge work done per batch.
+        Returns the number of files cleaned, skipped and failed, and the error of each failure.
+        """
+        summary = {"cleaned": 0, "skipped": 0, "failed": 0, "errors": {}}
+        self.report = CleanReport()
         try:
             list_case_json_files = os.listdir(case_json_folder_path)
         except (FileNotFoundError, Exception) as e:
             logging.error(f"Error reading directory {case_json_folder_path}: {e}")
-            return
+            return summary
 
         # Ensure the case_json_cleaned folder exists
         cleaned_folder_path = self.get_or_create_folder_path(
             county, "case_json_cleaned"
         )
 
-        for case_json_filename in list_case_json_files:
-            try:
-                self.process_single_case(
-                    case_json_folder_path, case_json_filename, cleaned_folder_path
+        start_time = perf_counter()
+        clean_manifest = self.load_clean_manifest(county)
+        self.pseudonymizer.load_attorney_dimension(self.get_attorney_dimension_path(county))
+        tasks = [
+            (
+                case_json_folder_path,
+                case_json_filename,
+                cleaned_folder_path,
+                None if force else clean_manifest.get(case_json_filename),
+            )
+            for case_json_filename in list_case_json_files
+        ]
+        function, worker_function = self.clean_file, clean_file_in_worker
+        if batch_size:
+            tasks = [
+                (
+                    case_json_folder_path,
+                    [task[1] for task in tasks[start : start + batch_size]],
+                    cleaned_folder_path,
+                    [task[3] for task in tasks[start : start + batch_size]],
                 )
-            except Exception as e:
-                logging.error(f"Error processing file {case_json_filename}. Error: {e}")
+                for start in range(0, len(tasks), batch_size)
+            ]
+            function, worker_function, chunksize = self.clean_files_batch, clean_files_batch_in_worker, 1
+        pool = None
+        if workers > 1 and len(tasks) > 1:
+            logging.info(f"Starting {workers} cleaner workers")
+            pool = multiprocessing.Pool(
+                workers,
+                initializer=init_clean_worker,
+                initargs=(self.fuzzy_charge_cutoff, self.pseudonymizer.key),
+            )
+            results = pool.imap_unordered(worker_function, tasks, chunksize)
+        else:
+            results = map(function, tasks)
+        if batch_size:
+            results = itertools.chain.from_iterable(results)
+
+        try:
+            for case_json_filename, status, input_hash, error, stats in results:
+                summary[status] += 1
+                if error is not None:
+                    summary["errors"][case_json_filename] = error
+                if stats is not None:
+                    self.report.record_case(case_json_filename, stats)
+                    self.pseudonymizer.add_attorneys(stats["attorneys"])
+                self.update_clean_manifest(clean_manifest, case_json_filename, status, input_hash)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+            self.write_clean_manifest(county, clean_manifest)
+            self.pseudonymizer.write_attorney_dimension(self.get_attorney_dimension_path(county))
+
+        elapsed = perf_counter() - start_time
+        logging.info(
+            f"Cleaned {summary['cleaned']} cases in {elapsed:.1f} seconds, {summary['skipped']} unchanged, "
+            f"{summary['failed']} failed ({summary['cleaned'] / elapsed if elapsed else 0:.1f} cases/s)"
+        )
+        self.log_report()
+        for case_json_filename, error in sorted(summary["errors"].items())[:10]:
+            logging.error(f"Failed to clean {case_json_filename}: {error}")
+        return summary
+
+    def log_report(self) -> None:
+        logging.info("Clean timings by stage:\n" + "\n".join(self.report.summary()))
+
+    def update_clean_manifest(
+        self, clean_manifest: dict, case_json_filename: str, status: str, input_hash: Optional[str]
+    ) -> None:
+        if status != "failed" and input_hash is not None:
+            clean_manifest[case_json_filename] = input_hash
+        else:
+            clean_manifest.pop(case_json_filename, None)
 
-    def clean(self, county: str) -> None:
+    def process_jsonl_shards(self, county: str, shard_folder_path: str, force: bool = False) -> dict:
+        """
+        Streams parsed cases out of the parser's JSONL shards and cleans each one,
+        skipping unchanged cases like process_json_files.
+        """
+        summary = {"cleaned": 0, "skipped": 0, "failed": 0, "errors": {}}
+        self.report = CleanReport()
+        cleaned_folder_path = self.get_or_create_folder_path(
+            county, "case_json_cleaned"
+        )
+        clean_manifest = self.load_clean_manifest(county)
+        self.pseudonymizer.load_attorney_dimension(self.get_attorney_dimension_path(county))
+
+        try:
+            load_start = perf_counter()
+            for case_number, input_dict in iter_shard_records(shard_folder_path):
+                case_json_filename = f"{case_number}.json"
+                status, input_hash = "failed", None
+                self.report.start_case(case_json_filename, {"load": perf_counter() - load_start})
+                try:
+                    output_filepath = os.path.join(cleaned_folder_path, case_json_filename)
+                    with self.report.stage("hashing"):
+                        input_hash = self.get_input_hash(input_dict)
+                    if (
+                        not force
+                        and input_hash is not None
+                        and clean_manifest.get(case_json_filename) == input_hash
+                        and os.path.exists(output_filepath)
+                    ):
+                        status = "skipped"
+                    else:
+                        output_json_data = self.clean_case_data(input_dict)
+                        with self.report.stage("write"):
+                            self.write_json_output(output_filepath, output_json_data)
+                        status = "cleaned"
+                except Exception as e:
+                    logging.error(f"Error processing case {case_number}. Error: {e}")
+                    summary["errors"][case_json_filename] = repr(e)
+                if status == "skipped":
+                    self.report.cancel_case()
+                else:
+                    self.report.end_case(case_json_filename)
+                summary[status] += 1
+                self.update_clean_manifest(clean_manifest, case_json_filename, status, input_hash)
+                load_start = perf_counter()
+        except OSError as e:
+            logging.error(f"Error reading shards in {shard_folder_path}: {e}")
+        finally:
+            self.write_clean_manifest(county, clean_manifest)
+            self.pseudonymizer.write_attorney_dimension(self.get_attorney_dimension_path(county))
+
+        logging.info(
+            f"Cleaned {summary['cleaned']} cases, {summary['skipped']} unchanged, {summary['failed']} failed"
+        )
+        self.log_report()
+        return summary
+
+    def process_jsonl_stream(
+        self,
+        input_path: str,
+        output_path: str,
+        compress: Optional[bool] = None,
+        batch_size: Optional[int] = None,
+    ) -> dict:
+        """
+        Cleans a JSONL stream of parsed cases into a JSONL stream of cleaned cases,
+        in input order, without writing a file per case. Either path can be "-" for
+        stdin or stdout (see streams.py); gzipped input is detected, and the output
+        is gzipped if compress is set or its path ends in .gz.
+
+        batch_size cleans the records that many at a time with clean_case_batch.
+        Returns the number of cases cleaned and failed, and the error of each failure
+        keyed by the case's code (or its position in the stream).
+        """
+        summary = {"cleaned": 0, "failed": 0, "errors": {}}
+        self.report = CleanReport()
+        start_time = perf_counter()
+        records = map(adapt_case, iter_jsonl_records(input_path))
+        if batch_size:
+            # pyarrow is only needed for batch cleaning
+            from .batch import clean_case_batch
+
+            def clean_records(batch: list[dict]) -> list[tuple[Optional[dict], Optional[str]]]:
+                with self.report.stage("batch"):
+                    return clean_case_batch(self, batch)
+
+        else:
+            batch_size = 1
+
+            def clean_records(batch: list[dict]) -> list[tuple[Optional[dict], Optional[str]]]:
+                try:
+                    return [(self.clean_case_data(batch[0]), None)]
+                except Exception as e:
+                    return [(None, repr(e))]
+
+        with JsonlWriter(output_path, compress) as writer:
+            while True:
+                load_start = perf_counter()
+                batch = list(itertools.islice(records, batch_size))
+                if not batch:
+                    break
+                self.report.start_case(
+                    str(batch[0].get("code", "")), {"load": perf_counter() - load_start}
+                )
+                cleaned_records = clean_records(batch)
+                with self.report.stage("write"):
+                    for output_json_data, error in cleaned_records:
+                        if error is None:
+                            writer.write(output_json_data)
+                batch_stats = split_batch_stats(self.report.finish_case(), len(batch))
+                for input_dict, (output_json_data, error), stats in zip(batch, cleaned_records, batch_stats):
+                    self.report.record_case(str(input_dict.get("code", "")), stats)
+                    if error is None:
+                        summary["cleaned"] += 1
+                    else:
+                        case_id = str(input_dict.get("code", summary["cleaned"] + summary["failed"]))
+                        logging.error(f"Error processing case {case_id}. Error: {error}")
+                        summary["failed"] += 1
+                        summary["errors"][case_id] = error
+
+        elapsed = perf_counter() - start_time
+        logging.info(
+            f"Cleaned {summary['cleaned']} cases from {input_path} to {output_path} in {elapsed:.1f} seconds, "
+            f"{summary['failed']} failed ({summary['cleaned'] / elapsed if elapsed else 0:.1f} cases/s)"
+        )
+        self.log_report()
+        return summary
+
+    def clean(
+        self,
+        county: str,
+        input_format: str = "json",
+        workers: int = 1,
+        force: bool = False,
+        batch_size: Optional[int] = None,
+    ) -> None:
         """
         Cleans and processes case data for a given county.
         This method performs the following steps:
@@ -244,13 +636,51 @@ class Cleaner:
         4. Hashes defense attorney information to anonymize but uniquely identify the attorney.
         5. Adds metadata, such as parsing date and case number, to the cleaned data.
         6. Writes the cleaned data to the 'case_json_cleaned' folder for the specified county.
+
+        With input_format="jsonl" the cases are streamed from the parser's 'case_jsonl'
+        shards instead of the per-case files in 'case_json'. workers > 1 cleans the
+        'case_json' files in that many processes, and batch_size cleans them that
+        many at a time in columnar batches.
+
+        Only cases whose html_hash, cleaner version or charge map changed since they
+        were last cleaned are rewritten, unless force is set. The run ends by logging
+        its time per stage and its unmapped charges by frequency (see report.py).
         """
         try:
-            case_json_folder_path = self.get_or_create_folder_path(county, "case_json")
             logging.info(f"Processing data for county: {county}")
-            self.process_json_files(county, case_json_folder_path)
+            if input_format == "jsonl":
+                shard_folder_path = self.get_or_create_folder_path(county, "case_jsonl")
+                self.process_jsonl_shards(county, shard_folder_path, force)
+            else:
+                case_json_folder_path = self.get_or_create_folder_path(
+                    county, "case_json"
+                )
+                self.process_json_files(
+                    county, case_json_folder_path, workers, force=force, batch_size=batch_size
+                )
             logging.info(f"Completed processing for county: {county}")
         except Exception as e:
             logging.error(
                 f"Error during cleaning process for county: {county}. Error: {e}"
             )
+
+
+# The Cleaner for clean_file_in_worker, set up once per worker process by init_clean_worker.
+_worker_state = {}
+
+
+def init_clean_worker(fuzzy_charge_cutoff: Optional[float], pseudonym_key: Optional[bytes]) -> None:
+    _worker_state["cleaner"] = Cleaner(fuzzy_charge_cutoff, pseudonym_key)
+    get_charge_index(fuzzy_cutoff=fuzzy_charge_cutoff)
+
+
+def clean_file_in_worker(
+    task: tuple[str, str, str, Optional[str]]
+) -> tuple[str, str, Optional[str], Optional[str], Optional[dict]]:
+    return _worker_state["cleaner"].clean_file(task)
+
+
+def clean_files_batch_in_worker(
+    task: tuple[str, list[str], str, list[Optional[str]]]
+) -> list[tuple[str, str, Optional[str], Optional[str], Optional[dict]]]:
+    return _worker_state["cleaner"].clean_files_batch(task)
@@ -0,0 +1,81 @@
+import argparse
+
+from . import Cleaner
+from .pseudonyms import load_pseudonym_key
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument(
+        "-county",
+        "-c",
+        type=str,
+        default="hays",
+        help="The name of the county.",
+    )
+    argparser.add_argument(
+        "-input_format",
+        type=str,
+        choices=["json", "jsonl"],
+        default="json",
+        help="Clean data/<county>/case_json files, or the parser's case_jsonl shards.",
+    )
+    argparser.add_argument(
+        "-input",
+        type=str,
+        default=None,
+        help="Clean this JSONL stream (gzipped or not, - for stdin) instead of the county's data.",
+    )
+    argparser.add_argument(
+        "-output",
+        type=str,
+        default="-",
+        help="With -input, where to write the cleaned JSONL (- for stdout, gzipped if it ends in .gz).",
+    )
+    argparser.add_argument(
+        "-compress",
+        action="store_true",
+        help="With -input, gzip the output even if its name doesn't end in .gz.",
+    )
+    argparser.add_argument(
+        "-workers",
+        type=int,
+        default=1,
+        help="Number of worker processes to clean case_json files with.",
+    )
+    argparser.add_argument(
+        "-batch_size",
+        type=int,
+        default=None,
+        help="Clean this many cases at a time in columnar batches.",
+    )
+    argparser.add_argument(
+        "-force",
+        action="store_true",
+        help="Re-clean every case, even those unchanged since they were last cleaned.",
+    )
+    argparser.add_argument(
+        "-fuzzy_charge_cutoff",
+        type=float,
+        default=None,
+        help="Map unknown charges to the closest UCCS charge name at least this similar (0.0 - 1.0).",
+    )
+    argparser.description = "Clean parsed case JSON for the specified county."
+    args = argparser.parse_args()
+
+    # PSEUDONYM_KEY, from the environment or .env, keys the attorney and cause number hashes
+    cleaner = Cleaner(fuzzy_charge_cutoff=args.fuzzy_charge_cutoff, pseudonym_key=load_pseudonym_key())
+    if args.input is not None:
+        cleaner.process_jsonl_stream(
+            args.input,
+            args.output,
+            compress=True if args.compress else None,
+            batch_size=args.batch_size,
+        )
+    else:
+        cleaner.clean(
+            args.county,
+            input_format=args.input_format,
+            workers=args.workers,
+            force=args.force,
+            batch_size=args.batch_size,
+        )
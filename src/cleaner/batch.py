@@ -0,0 +1,145 @@
+"""
+Batch cleaning for backfills, with the same output as Cleaner.clean_case_data.
+
+A batch of parsed cases is flattened into columns of charges (case, charge_id,
+level, name, statute, date). Charge dates and UCCS lookups
+are then resolved once per distinct value through dictionary encoding, rather
+than once per charge, the earliest charge date of every case comes from a
+single group_by, and the attorney and cause number pseudonyms are hashed
+together, once per distinct value. Only the assembly of the output dicts is
+per case.
+"""
+import datetime as dt
+import logging
+from typing import Callable, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from ..parser.dates import normalize_date
+from .schema import adapt_case
+
+CHARGE_FIELDS = ["level", "charges", "statute", "date"]
+
+
+def map_distinct(array: pa.Array, function: Callable) -> Tuple[list, pa.Array]:
+    """
+    function applied once per distinct value of array. Returns the mapped values
+    and, for every row, the index of its value in them (null for null rows).
+    """
+    encoded = pc.dictionary_encode(array)
+    return [function(value) for value in encoded.dictionary.to_pylist()], encoded.indices
+
+
+def clean_case_batch(cleaner, input_dicts: List[dict]) -> List[Tuple[Optional[dict], Optional[str]]]:
+    """
+    Cleans the parsed cases in one batch. Returns (cleaned case, None) for each,
+    or (None, error) for a case clean_case_data would have raised on.
+    """
+    charge_index = cleaner.get_charge_index()
+    parsing_date = dt.datetime.today().strftime("%Y-%m-%d")
+    results: List[Tuple[Optional[dict], Optional[str]]] = []
+    cases = []
+    columns = {"case": [], "charge_id": [], **{field: [] for field in CHARGE_FIELDS}}
+    for input_dict in input_dicts:
+        try:
+            input_dict = adapt_case(input_dict)
+            party_information = input_dict["party information"]
+            rows = [
+                [charge["level"], charge["charges"], charge["statute"], charge["date"]]
+                for charge in input_dict["charge information"]
+            ]
+            try:
+                attorney = (party_information["defense attorney"], party_information["defense attorney phone number"])
+            except KeyError as e:
+                logging.error(f"Missing defense attorney data: {e}")
+                attorney = None
+            case = {
+                "case_number": input_dict["code"],
+                "attorney_type": party_information["appointed or retained"],
+                "county": input_dict["county"],
+                "html_hash": input_dict["html_hash"],
+                "attorney": attorney,
+                "motion_events": cleaner.motion_matcher.find_hits(input_dict["other events and hearings"]),
+                "cause_number": str(input_dict["code"]),
+            }
+        except Exception as e:
+            results.append((None, repr(e)))
+            continue
+        case_position = len(cases)
+        cases.append(case)
+        results.append((case, None))
+        for charge_id, row in enumerate(rows):
+            columns["case"].append(case_position)
+            columns["charge_id"].append(charge_id)
+            for field, value in zip(CHARGE_FIELDS, row):
+                columns[field].append(value)
+
+    case_column = pa.array(columns["case"], pa.int64())
+    # names and dates that aren't strings are never matched or valid, so they are nulls here
+    names = pa.array([name if isinstance(name, str) else None for name in columns["charges"]], pa.string())
+    dates, date_indices = map_distinct(
+        pa.array([date if isinstance(date, str) else None for date in columns["date"]], pa.string()),
+        normalize_date,
+    )
+    charge_dates = pa.array(dates, pa.string()).take(date_indices)
+    items, item_indices = map_distinct(names, charge_index.get)
+    matched = pc.fill_null(pa.array([item is not None for item in items], pa.bool_()).take(item_indices), False)
+    dated = pc.is_valid(charge_dates)
+
+    earliest_charge_dates = {
+        row["case"]: row["charge_date_min"]
+        for row in pa.table({"case": case_column, "charge_date": charge_dates})
+        .filter(dated)
+        .group_by("case")
+        .aggregate([("charge_date", "min")])
+        .to_pylist()
+    }
+    # counted in the run report, like process_charges does per charge
+    cleaner.report.add_unparsed_date(len(dated) - pc.sum(dated).as_py() if len(dated) else 0)
+    for row in pc.indices_nonzero(pc.and_(dated, pc.invert(matched))).to_pylist():
+        cleaner.report.add_unmapped_charge(columns["charges"][row])
+
+    # the charges that have a date and a UCCS match, grouped by case
+    processed_charges = [[] for _ in cases]
+    kept_rows = pc.indices_nonzero(pc.and_(dated, matched))
+    for row, item_index, charge_date in zip(
+        kept_rows.to_pylist(),
+        item_indices.take(kept_rows).to_pylist(),
+        charge_dates.take(kept_rows).to_pylist(),
+    ):
+        processed_charges[columns["case"][row]].append((row, charge_date, items[item_index]))
+
+    pseudonymizer = cleaner.pseudonymizer
+    cause_numbers_redacted = pseudonymizer.hash_values([case.pop("cause_number") for case in cases])
+    for position, case in enumerate(cases):
+        attorney = case.pop("attorney")
+        defense_attorney = "" if attorney is None else pseudonymizer.attorney_id(*attorney)
+        motion_events = case.pop("motion_events")
+        cause_number_redacted = cause_numbers_redacted[position]
+        case_charges = []
+        for row, charge_date, item in processed_charges[position]:
+            charge_id = columns["charge_id"][row]
+            charge_dict = {
+                "charge_id": charge_id,
+                "charge_level": columns["level"][row],
+                "orignal_charge": columns["charges"][row],
+                "statute": columns["statute"][row],
+                "is_primary_charge": charge_id == 0,
+                "charge_date": charge_date,
+            }
+            charge_dict.update(item)
+            case_charges.append(charge_dict)
+        found_motions = {hit["motion"] for hit in motion_events}
+        motions = [motion for motion in cleaner.motion_matcher.motions if motion in found_motions]
+        case.update(
+            charges=case_charges,
+            earliest_charge_date=earliest_charge_dates.get(position, ""),
+            motions=motions,
+            motion_events=motion_events,
+            has_evidence_of_representation=len(motions) > 0,
+            defense_attorney=defense_attorney,
+            parsing_date=parsing_date,
+            cause_number_redacted=cause_number_redacted,
+        )
+    return results
@@ -0,0 +1,232 @@
+"""
+Lookup of charge names in the UMich UCCS charge map.
+
+The map is read from resources/umich-uccs-database.json once per process and
+indexed twice: by the exact charge name, and by a normalized name that ignores
+case, punctuation and spacing and spells out common abbreviations (INFO,
+POSS, AGG, W/ ...). The built index is pickled to the user's cache directory
+($XDG_CACHE_HOME, or ~/.cache), keyed on the JSON's size and modification
+time, so later runs skip the JSON parse and the normalization. Unpickling runs
+whatever the file says, so a cache is only read if it belongs to the user and
+no one else can write to it; otherwise it is rebuilt.
+
+Names that normalize alike but map to different UCCS codes are resolved to the
+one already spelled out in full, or left out of the normalized index when that
+doesn't settle it (see build_normalized).
+
+Names that match neither can fall back to the closest normalized name with
+difflib. Each fuzzy lookup, hit or miss, is cached for the rest of the run.
+"""
+import difflib
+import json
+import logging
+import os
+import pickle
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import xxhash
+
+CHARGE_MAP_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "..", "resources", "umich-uccs-database.json"
+)
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "odyssey-scraper"
+)
+CACHE_PATH = os.path.join(CACHE_DIR, "umich-uccs-database.index.pickle")
+# Bump when normalize_charge_name or the index layout changes, so stale caches are rebuilt.
+INDEX_VERSION = 2
+
+ABBREVIATIONS = {
+    "AGG": "AGGRAVATED",
+    "ASLT": "ASSAULT",
+    "ASSLT": "ASSAULT",
+    "ATT": "ATTEMPTED",
+    "ATTEMPT": "ATTEMPTED",
+    "BI": "BODILY INJURY",
+    "CONT": "CONTINUOUS",
+    "CS": "CONTROLLED SUBSTANCE",
+    "DL": "DRIVERS LICENSE",
+    "FV": "FAMILY VIOLENCE",
+    "ID": "IDENTIFYING",
+    "IDENT": "IDENTIFYING",
+    "INFO": "INFORMATION",
+    "INTOX": "INTOXICATED",
+    "MJ": "MARIJUANA",
+    "MARIHUANA": "MARIJUANA",
+    "MV": "MOTOR VEHICLE",
+    "OZ": "OUNCES",
+    "PG": "PENALTY GROUP",
+    "POSS": "POSSESSION",
+    "PROH": "PROHIBITED",
+    "SBI": "SERIOUS BODILY INJURY",
+    "VEH": "VEHICLE",
+    "W": "WITH",
+    "WO": "WITHOUT",
+}
+# Everything but letters, digits and the < > of amounts like 5<10 separates words.
+_SEPARATORS = re.compile(r"[^A-Z0-9<>]+")
+
+
+def is_private_file(file_handle) -> bool:
+    """Whether the open file is owned by this user and not writable by anyone else."""
+    if not hasattr(os, "getuid"):
+        # no owner to check on Windows, where the cache directory is per user anyway
+        return True
+    stat = os.fstat(file_handle.fileno())
+    return stat.st_uid == os.getuid() and not stat.st_mode & 0o022
+
+
+def normalize_charge_name(charge_name: str) -> str:
+    words = _SEPARATORS.split(charge_name.upper().replace("W/O", "WO "))
+    return " ".join(ABBREVIATIONS.get(word, word) for word in words if word)
+
+
+class ChargeIndex:
+    def __init__(self, charges: List[dict], fuzzy_cutoff: Optional[float] = None):
+        """
+        fuzzy_cutoff (0.0 - 1.0) turns on the difflib fallback, matching names whose
+        normalized similarity is at least that.
+        """
+        self.exact: Dict[str, dict] = {item["charge_name"]: item for item in charges}
+        self.normalized, self.ambiguous = self.build_normalized(self.exact)
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.fuzzy_matches: Dict[str, Optional[str]] = {}
+
+    @staticmethod
+    def build_normalized(exact: Dict[str, dict]) -> Tuple[Dict[str, dict], Dict[str, List[str]]]:
+        """
+        The index by normalized name, and the normalized names left out of it.
+
+        Names that normalize alike but map to different UCCS codes are resolved
+        to the one whose name is already the normalized name. If there isn't
+        exactly one such name, the normalized name is left out, so those charges
+        go unmapped (or to the fuzzy fallback) instead of to an arbitrary code.
+        """
+        groups: Dict[str, List[dict]] = {}
+        for name, item in exact.items():
+            groups.setdefault(normalize_charge_name(name), []).append(item)
+        normalized = {}
+        ambiguous = {}
+        for key, items in groups.items():
+            if len({item["uccs_code"] for item in items}) == 1:
+                normalized[key] = items[0]
+                continue
+            named_as_key = [item for item in items if item["charge_name"] == key]
+            if len(named_as_key) == 1:
+                normalized[key] = named_as_key[0]
+            else:
+                ambiguous[key] = [item["charge_name"] for item in items]
+        if ambiguous:
+            logging.warning(
+                f"Leaving {len(ambiguous)} ambiguous normalized charge names out of the charge index: "
+                + "; ".join(f"{key} ({', '.join(names)})" for key, names in sorted(ambiguous.items()))
+            )
+        return normalized, ambiguous
+
+    def __len__(self) -> int:
+        return len(self.exact)
+
+    def __contains__(self, charge_name: str) -> bool:
+        return self.get(charge_name) is not None
+
+    def __getitem__(self, charge_name: str) -> dict:
+        item = self.get(charge_name)
+        if item is None:
+            raise KeyError(charge_name)
+        return item
+
+    def get(self, charge_name: str, default: Optional[dict] = None) -> Optional[dict]:
+        item = self.exact.get(charge_name)
+        if item is not None or not isinstance(charge_name, str):
+            return default if item is None else item
+        key = normalize_charge_name(charge_name)
+        item = self.normalized.get(key)
+        if item is not None or self.fuzzy_cutoff is None:
+            return default if item is None else item
+        match = self.get_fuzzy_match(key)
+        return default if match is None else self.normalized[match]
+
+    def get_fuzzy_match(self, key: str) -> Optional[str]:
+        if key not in self.fuzzy_matches:
+            matches = difflib.get_close_matches(key, self.normalized, n=1, cutoff=self.fuzzy_cutoff)
+            self.fuzzy_matches[key] = matches[0] if matches else None
+            if matches:
+                logging.info(f"Matched charge {key!r} to {matches[0]!r}")
+        return self.fuzzy_matches[key]
+
+    @classmethod
+    def load(
+        cls,
+        file_path: str = CHARGE_MAP_PATH,
+        cache_path: Optional[str] = CACHE_PATH,
+        fuzzy_cutoff: Optional[float] = None,
+    ) -> "ChargeIndex":
+        """
+        Loads the index from cache_path if it was built from the current file_path,
+        otherwise builds it from the JSON and writes the cache. cache_path None
+        always builds from the JSON.
+        """
+        stat = os.stat(file_path)
+        signature = (INDEX_VERSION, stat.st_size, stat.st_mtime_ns)
+        if cache_path is not None:
+            try:
+                with open(cache_path, "rb") as file_handle:
+                    if is_private_file(file_handle):
+                        cached_signature, index = pickle.load(file_handle)
+                    else:
+                        logging.warning(f"Ignoring charge index cache {cache_path}, which others can write to")
+                        cached_signature = None
+                if cached_signature == signature:
+                    index.fuzzy_cutoff = fuzzy_cutoff
+                    return index
+            except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError):
+                pass
+
+        with open(file_path, "r") as file_handle:
+            charges = json.load(file_handle)
+        if not charges:
+            raise FileNotFoundError(f"File not found or is empty: {file_path}")
+        try:
+            index = cls(charges, fuzzy_cutoff)
+        except KeyError as e:
+            logging.error(f"Error in mapping charge names: {e}")
+            raise ValueError(f"Invalid data structure: {file_path}")
+
+        if cache_path is not None:
+            try:
+                os.makedirs(os.path.dirname(cache_path), mode=0o700, exist_ok=True)
+                # written aside and renamed, so a concurrent run never reads half a cache
+                temp_path = f"{cache_path}.{os.getpid()}.tmp"
+                with open(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as file_handle:
+                    pickle.dump((signature, index), file_handle, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_path, cache_path)
+            except OSError as e:
+                logging.warning(f"Could not write charge index cache {cache_path}: {e}")
+        return index
+
+
+# One index per (file, cutoff) for the life of the process.
+_charge_indexes: Dict[tuple, ChargeIndex] = {}
+
+
+def get_charge_index(
+    file_path: str = CHARGE_MAP_PATH,
+    cache_path: Optional[str] = CACHE_PATH,
+    fuzzy_cutoff: Optional[float] = None,
+) -> ChargeIndex:
+    key = (os.path.abspath(file_path), fuzzy_cutoff)
+    if key not in _charge_indexes:
+        _charge_indexes[key] = ChargeIndex.load(file_path, cache_path, fuzzy_cutoff)
+    return _charge_indexes[key]
+
+
+@lru_cache(maxsize=None)
+def get_charge_map_hash(file_path: str = CHARGE_MAP_PATH) -> str:
+    """
+    Hash of the charge map's contents and of how it is indexed, so cleaned output
+    can be tied to the mapping it used.
+    """
+    with open(file_path, "rb") as file_handle:
+        return xxhash.xxh64(f"{INDEX_VERSION}:".encode("utf-8") + file_handle.read()).hexdigest()
@@ -0,0 +1,88 @@
+"""
+Finding the evidentiary motions listed in resources/good_motions.json in a
+case's events.
+
+All the motions are compiled into one case-insensitive regex, longest first,
+inside a lookahead so it reports the longest motion starting at every
+position. Each event string is scanned once, whatever the number of motions.
+A motion that contains another ("Motion to Reduce Bond Hearing" contains
+"Motion to Reduce Bond") counts as a hit for both, as the old per-motion
+substring check did.
+"""
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Iterator, List, Sequence, Tuple
+
+import xxhash
+
+from ..parser.dates import normalize_date
+
+GOOD_MOTIONS_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "..", "resources", "good_motions.json"
+)
+_EVENT_DATE = re.compile(r"\d{1,2}/\d{1,2}/\d{4}$")
+
+
+def load_good_motions(file_path: str = GOOD_MOTIONS_PATH) -> List[str]:
+    with open(file_path, "r") as f:
+        return json.load(f)
+
+
+def iter_event_strings(events: list | str, date: str = "") -> Iterator[Tuple[str, str]]:
+    """Yields (string, date) for every string in the events, nested lists included,
+    with the date at the start of the row the string is in."""
+    if isinstance(events, str):
+        yield events, date
+        return
+    if events and isinstance(events[0], str) and _EVENT_DATE.match(events[0]):
+        date = events[0]
+    for item in events:
+        yield from iter_event_strings(item, date)
+
+
+class MotionMatcher:
+    def __init__(self, motions: Sequence[str]):
+        self.motions = list(dict.fromkeys(motions))
+        # ties cleaned output to the motion list it was searched for
+        self.motions_hash = xxhash.xxh64(json.dumps(self.motions)).hexdigest()
+        by_length = sorted(self.motions, key=len, reverse=True)
+        self.pattern = re.compile(
+            "(?=(" + "|".join(re.escape(motion) for motion in by_length) + "))",
+            re.IGNORECASE,
+        )
+        # every motion a match of the (lowercased) motion also contains
+        self.contained = {
+            motion.lower(): [other for other in self.motions if other.lower() in motion.lower()]
+            for motion in self.motions
+        }
+
+    def find_hits(self, events: list | str) -> List[dict]:
+        """The motion, event string and ISO date of every hit, in event order."""
+        hits = []
+        if not self.motions:
+            return hits
+        for event, date in iter_event_strings(events):
+            found = set()
+            for match in self.pattern.finditer(event):
+                found.update(self.contained.get(match.group(1).lower(), ()))
+            if not found:
+                continue
+            date = normalize_date(date) or date
+            hits.extend(
+                {"motion": motion, "event": event, "date": date}
+                for motion in self.motions
+                if motion in found
+            )
+        return hits
+
+    def find_motions(self, events: list | str) -> List[str]:
+        """The motions found anywhere in the events, in the order they are listed."""
+        found = {hit["motion"] for hit in self.find_hits(events)}
+        return [motion for motion in self.motions if motion in found]
+
+
+@lru_cache(maxsize=None)
+def get_motion_matcher(motions: Tuple[str, ...]) -> MotionMatcher:
+    return MotionMatcher(motions)
@@ -0,0 +1,109 @@
+"""
+Pseudonyms for the defense attorney and the cause number of cleaned cases.
+
+By default a value's pseudonym is its xxh64 hash, as it has always been. With a
+key (PSEUDONYM_KEY in the environment or .env, loaded once by the caller) it is
+a keyed BLAKE2b hash instead, of the same length, so the pseudonyms can't be
+reversed by hashing a list of attorney names. Only a key's fingerprint is ever
+written out, as the hash_scheme of the attorney table.
+
+The few hundred attorneys of a county recur in every case, so attorney IDs are
+memoized per (name, phone number). Those are also the rows of the attorney
+dimension table, data/<county>/attorneys.csv, which maps each ID back to the
+attorney so downstream tools can join on it without re-hashing anything. It
+names the attorneys, so it stays with the rest of the data.
+"""
+import csv
+import hashlib
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import xxhash
+from dotenv import load_dotenv
+
+PSEUDONYM_KEY_VARIABLE = "PSEUDONYM_KEY"
+ATTORNEY_DIMENSION_FILENAME = "attorneys.csv"
+ATTORNEY_DIMENSION_FIELDS = [
+    "attorney_id",
+    "defense_attorney",
+    "defense_attorney_phone_number",
+    "hash_scheme",
+]
+
+
+def load_pseudonym_key() -> Optional[bytes]:
+    load_dotenv()
+    key = os.getenv(PSEUDONYM_KEY_VARIABLE)
+    return key.encode("utf-8") if key else None
+
+
+class Pseudonymizer:
+    def __init__(self, key: Optional[bytes] = None):
+        if key is not None and len(key) > hashlib.blake2b.MAX_KEY_SIZE:
+            raise ValueError(f"{PSEUDONYM_KEY_VARIABLE} can be at most {hashlib.blake2b.MAX_KEY_SIZE} bytes")
+        self.key = key
+        if key is None:
+            self.hash_scheme = "xxh64"
+        else:
+            fingerprint = hashlib.blake2b(b"fingerprint", key=key, digest_size=4).hexdigest()
+            self.hash_scheme = f"blake2b-{fingerprint}"
+        self.attorney_ids: Dict[Tuple[str, str], str] = {}
+        # attorneys pseudonymized since the last take_new_attorneys, as dimension rows
+        self.new_attorneys: List[List[str]] = []
+
+    def hash_value(self, value: str) -> str:
+        if self.key is None:
+            return xxhash.xxh64(value).hexdigest()
+        return hashlib.blake2b(value.encode("utf-8"), key=self.key, digest_size=8).hexdigest()
+
+    def hash_values(self, values: Iterable[str]) -> List[str]:
+        """The pseudonym of each value, hashing every distinct value once."""
+        hashes: Dict[str, str] = {}
+        return [
+            hashes[value] if value in hashes else hashes.setdefault(value, self.hash_value(value))
+            for value in values
+        ]
+
+    def attorney_id(self, defense_attorney: str, phone_number: str) -> str:
+        attorney = (defense_attorney, phone_number)
+        attorney_id = self.attorney_ids.get(attorney)
+        if attorney_id is None:
+            attorney_id = self.attorney_ids[attorney] = self.hash_value(f"{defense_attorney}:{phone_number}")
+            self.new_attorneys.append([attorney_id, defense_attorney, phone_number])
+        return attorney_id
+
+    def take_new_attorneys(self) -> List[List[str]]:
+        """The attorneys first seen since the last call, e.g. to hand back from a worker."""
+        new_attorneys, self.new_attorneys = self.new_attorneys, []
+        return new_attorneys
+
+    def add_attorneys(self, rows: Iterable[List[str]]) -> None:
+        for attorney_id, defense_attorney, phone_number in rows:
+            self.attorney_ids[(defense_attorney, phone_number)] = attorney_id
+
+    def load_attorney_dimension(self, path: str) -> None:
+        """Seeds the memo from a dimension table written with the same hash scheme."""
+        try:
+            with open(path, "r", newline="") as f:
+                self.add_attorneys(
+                    [row["attorney_id"], row["defense_attorney"], row["defense_attorney_phone_number"]]
+                    for row in csv.DictReader(f)
+                    if row["hash_scheme"] == self.hash_scheme
+                )
+        except FileNotFoundError:
+            pass
+        except (csv.Error, KeyError) as e:
+            logging.warning(f"Ignoring unreadable attorney table {path}: {e}")
+
+    def write_attorney_dimension(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so an interrupted run can't truncate the table.
+        with open(path + ".tmp", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(ATTORNEY_DIMENSION_FIELDS)
+            for (defense_attorney, phone_number), attorney_id in sorted(
+                self.attorney_ids.items(), key=lambda item: item[1]
+            ):
+                writer.writerow([attorney_id, defense_attorney, phone_number, self.hash_scheme])
+        os.replace(path + ".tmp", path)
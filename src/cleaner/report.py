@@ -0,0 +1,95 @@
+"""
+Run report for the cleaner: where the time goes and which charges don't map.
+
+Every cleaned case is timed as a whole and per stage (load, hashing, charges,
+motions, write) with the parser's StageTimer, so a run ends with the p50/p95/max
+of each and the slowest cases. Charges that aren't in the UCCS map and charge
+dates that can't be parsed are counted instead of logged one by one, and the
+summary ranks the unmapped charge names by how often they came up.
+
+A case's stats are plain data (see finish_case), so workers can hand them back
+with their results and the report in the main process adds them up.
+"""
+from collections import Counter
+from typing import Dict, List, Optional
+
+from ..parser.timing import StageTimer
+
+
+class CleanReport:
+    def __init__(self, n_slowest: int = 5, n_unmapped: int = 20):
+        self.timer = StageTimer(n_slowest)
+        self.n_unmapped = n_unmapped
+        self.unmapped_charges: Counter = Counter()
+        self.unparsed_dates = 0
+        self.current_unmapped: List[str] = []
+        self.current_unparsed = 0
+        self.current_offset = 0.0
+
+    def start_case(self, case_id: str, stages: Optional[Dict[str, float]] = None) -> None:
+        """stages are times already spent on the case, e.g. reading it from a stream."""
+        self.timer.start_case(case_id, stages)
+        self.current_unmapped = []
+        self.current_unparsed = 0
+        self.current_offset = sum(stages.values()) if stages else 0.0
+
+    def stage(self, stage_name: str):
+        return self.timer.stage(stage_name)
+
+    def add_unmapped_charge(self, charge_name: str) -> None:
+        self.current_unmapped.append(charge_name)
+
+    def add_unparsed_date(self, count: int = 1) -> None:
+        self.current_unparsed += count
+
+    def finish_case(self) -> dict:
+        """Stops the current case and returns its stats without recording them."""
+        elapsed, stages = self.timer.finish_case()
+        return {
+            "elapsed": elapsed + self.current_offset,
+            "stages": stages,
+            "unmapped_charges": self.current_unmapped,
+            "unparsed_dates": self.current_unparsed,
+        }
+
+    def cancel_case(self) -> None:
+        """Drops the current case's stats, e.g. when it is skipped as unchanged."""
+        self.timer.cancel_case()
+
+    def record_case(self, case_id: str, stats: dict) -> None:
+        self.timer.record_case(case_id, stats["elapsed"], stats["stages"])
+        self.unmapped_charges.update(stats["unmapped_charges"])
+        self.unparsed_dates += stats["unparsed_dates"]
+
+    def end_case(self, case_id: str) -> None:
+        self.record_case(case_id, self.finish_case())
+
+    def summary(self) -> List[str]:
+        lines = self.timer.summary()
+        total = sum(self.unmapped_charges.values())
+        lines.append(
+            f"Unmapped charges: {total} ({len(self.unmapped_charges)} distinct), "
+            f"unparseable charge dates: {self.unparsed_dates}"
+        )
+        for charge_name, count in self.unmapped_charges.most_common(self.n_unmapped):
+            lines.append(f"{count:>8}  {charge_name}")
+        return lines
+
+
+def split_batch_stats(stats: dict, case_count: int) -> List[dict]:
+    """
+    Stats for each of the case_count cases cleaned together in a batch: the time is
+    shared evenly, and everything the batch counted or collected goes with its
+    first case, the others getting empty ones of the same type.
+    """
+    shares = []
+    for position in range(case_count):
+        share = {
+            name: value if position == 0 else type(value)()
+            for name, value in stats.items()
+            if name not in ("elapsed", "stages")
+        }
+        share["elapsed"] = stats["elapsed"] / case_count
+        share["stages"] = {name: seconds / case_count for name, seconds in stats["stages"].items()}
+        shares.append(share)
+    return shares
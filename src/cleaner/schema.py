@@ -0,0 +1,145 @@
+"""
+The cleaner's view of a parsed case, whatever parser version wrote it.
+
+The cleaner reads a flat, lowercase set of fields ("code", "party information",
+"charge information" ...), the layout cases had before the parser grouped them
+into sections ("Case Metadata", "Defendent Information" ...). FIELD_PATHS says
+where each of those fields lives for every parser_version. The paths are
+compiled into accessors once per version, and adapt_case wraps a case in a
+CaseView that reads through them, so no case dict is copied or rebuilt.
+
+Cases without a parser_version are recognized by their layout: flat ones are
+legacy, and sectioned ones were written by the parser before it stamped its
+version, in the layout of the first versioned one. A version with no entry here
+falls back to the newest one, since the layout rarely changes between versions.
+Fields in FIELD_DEFAULTS may be missing from older cases and read as empty.
+
+Kept free of relative imports so the tools can import it from this directory.
+"""
+import logging
+import operator
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+LEGACY_VERSION = "legacy"
+
+# Path of every field the cleaner reads, per parser_version.
+FIELD_PATHS: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    LEGACY_VERSION: {
+        "code": ("code",),
+        "odyssey id": ("odyssey id",),
+        "county": ("county",),
+        "html_hash": ("html_hash",),
+        "party information": ("party information",),
+        "charge information": ("charge information",),
+        "other events and hearings": ("other events and hearings",),
+    },
+    "1.0.0": {
+        "code": ("Case Metadata", "code"),
+        "odyssey id": ("Case Metadata", "odyssey id"),
+        "county": ("Case Metadata", "county"),
+        "html_hash": ("html_hash",),
+        "parser_version": ("parser_version",),
+        "party information": ("Defendent Information",),
+        "charge information": ("Charge Information",),
+        "other events and hearings": ("Other Events and Hearings",),
+    },
+}
+# 1.1.0 only narrowed Other Events and Hearings to the rows under the page's events heading.
+FIELD_PATHS["1.1.0"] = FIELD_PATHS["1.0.0"]
+SECTIONS_VERSION = "1.0.0"
+LATEST_VERSION = "1.1.0"
+
+# Fields older parser output may not have, and the factory of the value they read as.
+# The events section was only added to the parser's output in 1.0.0.
+FIELD_DEFAULTS: Dict[str, Callable[[], object]] = {
+    "other events and hearings": list,
+}
+
+
+def compile_path(path: Tuple[str, ...], default: Optional[Callable[[], object]] = None) -> Callable[[dict], object]:
+    """
+    A function that looks up path in a case. If any key is missing it returns
+    default() when there is a default, and raises KeyError otherwise.
+    """
+    if len(path) == 1:
+        get = operator.itemgetter(path[0])
+    else:
+        getters = [operator.itemgetter(key) for key in path]
+
+        def get(case: dict):
+            for getter in getters:
+                case = getter(case)
+            return case
+
+    if default is None:
+        return get
+
+    def get_or_default(case: dict):
+        try:
+            return get(case)
+        except KeyError:
+            return default()
+
+    return get_or_default
+
+
+@lru_cache(maxsize=None)
+def get_accessors(schema_version: str) -> Dict[str, Callable[[dict], object]]:
+    return {
+        field: compile_path(path, FIELD_DEFAULTS.get(field))
+        for field, path in FIELD_PATHS[schema_version].items()
+    }
+
+
+# Parser versions already warned about, so the warning comes once per run rather than per case.
+_unknown_versions = set()
+
+
+def get_schema_version(case: dict) -> str:
+    parser_version = case.get("parser_version")
+    if parser_version in FIELD_PATHS:
+        return parser_version
+    if "Case Metadata" not in case:
+        return LEGACY_VERSION
+    if parser_version is None:
+        return SECTIONS_VERSION
+    if parser_version not in _unknown_versions:
+        _unknown_versions.add(parser_version)
+        logging.warning(f"No cleaner schema for parser version {parser_version!r}, using {LATEST_VERSION}")
+    return LATEST_VERSION
+
+
+class CaseView(Mapping):
+    """Read-only mapping of the cleaner's field names to their values in case."""
+
+    __slots__ = ("case", "schema_version", "accessors")
+
+    def __init__(self, case: dict, schema_version: str):
+        self.case = case
+        self.schema_version = schema_version
+        self.accessors = get_accessors(schema_version)
+
+    def __getitem__(self, field: str):
+        try:
+            accessor = self.accessors[field]
+        except KeyError:
+            raise KeyError(field) from None
+        return accessor(self.case)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.accessors)
+
+    def __len__(self) -> int:
+        return len(self.accessors)
+
+    def __repr__(self) -> str:
+        return f"CaseView({self.schema_version!r}, {self.case!r})"
+
+
+def adapt_case(case: Mapping) -> CaseView:
+    """case as the cleaner reads it. Already adapted cases are returned as they are."""
+    if isinstance(case, CaseView):
+        return case
+    return CaseView(case, get_schema_version(case))
@@ -0,0 +1,78 @@
+"""
+JSON Lines streams for the cleaner, one compact case record per line.
+
+A path of "-" is stdin or stdout, so the cleaner can sit in a pipeline:
+
+    zcat data/hays/case_jsonl/part-*.jsonl.gz | python -m src.cleaner -input - -output - | ...
+
+Input is gunzipped when it starts with the gzip magic bytes, whatever its
+name, which also covers the parser's shards (concatenated gzip members).
+Output is gzipped when its path ends in .gz, or when compress is set.
+"""
+import gzip
+import io
+import json
+import logging
+import sys
+from typing import IO, Iterator, Optional
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def decompress_jsonl_input(raw: IO[bytes]) -> IO[bytes]:
+    """raw, gunzipped if it starts with the gzip magic bytes."""
+    # peek doesn't consume, so plain input is read from the start
+    buffered = raw if hasattr(raw, "peek") else io.BufferedReader(raw)
+    if buffered.peek(2)[:2] == GZIP_MAGIC:
+        return gzip.GzipFile(fileobj=buffered, mode="rb")
+    return buffered
+
+
+def iter_jsonl_records(path: str) -> Iterator[dict]:
+    """Yields every record in the stream, logging and skipping lines that aren't JSON objects."""
+    raw = sys.stdin.buffer if path == "-" else open(path, "rb")
+    try:
+        for line_number, line in enumerate(decompress_jsonl_input(raw), 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                logging.error(f"Skipping line {line_number} of {path}: {e}")
+                continue
+            if not isinstance(record, dict):
+                logging.error(f"Skipping line {line_number} of {path}: not a JSON object")
+                continue
+            yield record
+    finally:
+        if path != "-":
+            raw.close()
+
+
+class JsonlWriter:
+    def __init__(self, path: str, compress: Optional[bool] = None):
+        self.path = path
+        raw = sys.stdout.buffer if path == "-" else open(path, "wb")
+        self.raw = raw
+        if compress is None:
+            compress = path.endswith(".gz")
+        self.file_handle = gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) if compress else raw
+        self.records_written = 0
+
+    def write(self, record: dict) -> None:
+        self.file_handle.write((json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8"))
+        self.records_written += 1
+
+    def close(self) -> None:
+        if self.file_handle is not self.raw:
+            self.file_handle.close()
+        if self.path == "-":
+            self.raw.flush()
+        else:
+            self.raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -1,39 +1,83 @@
+import io
 import logging
+import multiprocessing.util
+import queue
+import tarfile
+import zipfile
+import zlib
+from functools import partial
+from logging.handlers import QueueHandler, QueueListener
 import os
 import csv
 import json
 import traceback
+import cProfile
 import xxhash
-from time import time
-import sys
+from time import perf_counter, sleep, time
+from datetime import datetime
 import importlib
 from bs4 import BeautifulSoup
-from typing import Tuple, List, Optional
+from typing import Callable, Iterator, Tuple, List, Optional, TextIO
+from .shards import ShardWriter, load_shard_index
+from .memory import MemoryMonitor
+from .spec import SpecParser, load_spec
+from .timing import StageTimer
+from .watch import DirectoryWatcher
+from .workers import RecyclingPool
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 project_root = os.path.dirname(parent_dir)
 
+# Bump when a county parser's output changes, so ledger entries and outputs can be traced to it.
+PARSER_VERSION = "1.1.0"
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
 
 class Parser:
     def __init__(self):
-        pass
-
-    def configure_logger(self):
-        logger = logging.getLogger(name="pid: " + str(os.getpid()))
-        logging.basicConfig(
-            level=logging.INFO,
-            format="%(asctime)s - %(levelname)s - %(message)s",
-            handlers=[logging.FileHandler("parser_log.txt"), logging.StreamHandler()],
-        )
-        logger.info("Logger configured")
+        # county -> county parser instance, for parse_html
+        self.county_parsers = {}
+
+    def configure_logger(self, level: int = logging.INFO):
+        logger = logging.getLogger(name="parser pid: " + str(os.getpid()))
+        logger.setLevel(level)
+        # Only attach handlers the first time, repeated parse() calls reuse them.
+        if not any(isinstance(handler, QueueHandler) for handler in logger.handlers):
+            # The parse loop only enqueues records; formatting to disk and console
+            # happens on the listener's thread.
+            log_queue = queue.SimpleQueue()
+            formatter = logging.Formatter(LOG_FORMAT)
+            file_handler = logging.FileHandler("parser_log.txt")
+            stream_handler = logging.StreamHandler()
+            for handler in (file_handler, stream_handler):
+                handler.setFormatter(formatter)
+            listener = QueueListener(log_queue, file_handler, stream_handler)
+            listener.start()
+            # Unlike atexit, this also runs when a multiprocessing worker exits.
+            multiprocessing.util.Finalize(None, listener.stop, exitpriority=10)
+            logger.addHandler(QueueHandler(log_queue))
+            logger.propagate = False
+            logger.info("Logger configured")
         return logger
 
+    def is_case_sampled(self, case_number: str, log_sample_rate: float) -> bool:
+        # Deterministic per case number, so a rerun logs the same cases.
+        return zlib.crc32(case_number.encode()) % 10000 < log_sample_rate * 10000
+
     def get_class_and_method(
-        self, logger, county: str, test=False
+        self, logger, county: str, test=False, use_spec: bool = False
     ) -> Tuple[Optional[object], Optional[callable]]:
+        """
+        Finds the county's Parser<County> class in the <county> module. Counties
+        without one (or all counties with use_spec) are parsed by a SpecParser from
+        resources/parser_specs/<county>.json when that exists.
+        """
         if test:
             logger.info(f"Test mode is on")
+        if use_spec:
+            return self.get_spec_parser(logger, county)
         # Construct the module, class, and method names
         module_name = county  # ex: 'hays'
         class_name = f"Parser{county.capitalize()}"  # ex: 'ParserHays'
@@ -43,12 +87,10 @@ class Parser:
             f"Module: {module_name}\nClass: {class_name}\nMethod: {method_name}\n"
         )
 
-        # Add the current directory to the system path
-        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-
         try:
-            # Dynamically import the module
-            module = importlib.import_module(module_name)
+            # Import the module from this package, so it shares its helper modules
+            # (and their caches) with the rest of the parser
+            module = importlib.import_module(f".{module_name}", __name__)
 
             logger.info(f"Module '{module_name}' imported successfully.")
 
@@ -79,18 +121,30 @@ class Parser:
             return instance, method
         except ModuleNotFoundError as e:
             logger.info(f"Module '{module_name}' not found: {e}")
+            return self.get_spec_parser(logger, county)
         except AttributeError as e:
             logger.info(f"Error retrieving class or method: {e}")
         except Exception as e:
             logger.info(f"Unexpected error: {e}")
         return None, None
 
+    def get_spec_parser(
+        self, logger, county: str
+    ) -> Tuple[Optional[object], Optional[callable]]:
+        spec = load_spec(county)
+        if spec is None:
+            logger.info(f"No extraction spec found for {county} county.")
+            return None, None
+        instance = SpecParser(spec)
+        logger.info(f"Parsing {county} county from its extraction spec.")
+        return instance, instance.parse_case
+
     def get_directories(
         self, county: str, logger, parse_single_file: bool = False
     ) -> Tuple[str, str]:
         # Determine the base directory of your project
         base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-        logger.info(f"get_directories function called\nbase_dir: {base_dir}\n")
+        logger.debug("get_directories function called\nbase_dir: %s\n", base_dir)
         try:
             if parse_single_file:
                 case_html_path = os.path.join(base_dir, "resources", "test_files")
@@ -100,7 +154,7 @@ class Parser:
                 case_json_path = os.path.join(base_dir, "data", county, "case_json")
                 if not os.path.exists(case_json_path):
                     os.makedirs(case_json_path, exist_ok=True)
-            logger.info(
+            logger.debug(
                 f"Returning case_html_path: {case_html_path}\nReturning case_json_path: {case_json_path}\n"
             )
             return case_html_path, case_json_path
@@ -116,10 +170,10 @@ class Parser:
         logger,
         parse_single_file: bool = False,
     ) -> List[str]:
-        logger.info(f"get_list_of_html function called\n")
+        logger.debug("get_list_of_html function called\n")
         try:
             if parse_single_file:
-                logger.info(f"parse_single_file is True\n")
+                logger.debug("parse_single_file is True\n")
                 relative_path = os.path.join(project_root, "resources", "test_files")
                 return [os.path.join(relative_path, f"test_{case_number}.html")]
             # This will loop through the html in the folder they were scraped to.
@@ -132,7 +186,8 @@ class Parser:
             case_html_list = [
                 os.path.join(case_html_path, file_name) for file_name in case_html_list
             ]
-            logger.info(f"Returning case_html_list: {case_html_list}\n")
+            logger.info(f"Returning {len(case_html_list)} case HTML files\n")
+            logger.debug("Returning case_html_list: %s\n", case_html_list)
             return case_html_list
         except Exception as e:
             logger.info(f"Error in get_list_of_html: {e}")
@@ -141,10 +196,10 @@ class Parser:
     def get_html_path(
         self, case_html_path: str, case_html_file_name: str, case_number: str, logger
     ) -> str:
-        logger.info(f"get_html_path function called\n")
+        logger.debug("get_html_path function called\n")
         try:
             case_html_file_path = os.path.join(case_html_path, case_html_file_name)
-            logger.info(f"Constructed path: {case_html_file_path}")
+            logger.debug("Constructed path: %s", case_html_file_path)
             return case_html_file_path
         except Exception as e:
             logger.info(f"Error in get_html_path: {e}")
@@ -155,7 +210,7 @@ class Parser:
     ) -> None:
         try:
             indent_level = 4
-            logger.info(f"Writing JSON to: {case_json_path}")
+            logger.debug("Writing JSON to: %s", case_json_path)
             with open(
                 os.path.join(case_json_path, case_number + ".json"), "w"
             ) as file_handle:
@@ -164,6 +219,106 @@ class Parser:
             logger.info(f"Error in write_json_data: {e}")
             raise
 
+    def read_case_html(self, case_html_file_path: str) -> bytes:
+        with open(case_html_file_path, "rb") as file_handle:
+            return file_handle.read()
+
+    def decode_case_html(self, case_html: bytes) -> str:
+        # Matches what a text-mode open(..., errors="ignore") used to hand BeautifulSoup,
+        # including the universal newline translation.
+        return (
+            case_html.decode("utf-8", errors="ignore")
+            .replace("\r\n", "\n")
+            .replace("\r", "\n")
+        )
+
+    def open_case_html(self, case_html: bytes) -> TextIO:
+        """The same text as decode_case_html, decoded as it is read."""
+        return io.TextIOWrapper(io.BytesIO(case_html), encoding="utf-8", errors="ignore")
+
+    def get_html_hash(self, case_html: bytes) -> str:
+        """
+        Hashes the <body> of the raw case HTML without building a soup.
+
+        Why balance table is dropped before hashing:
+        The balance table is excluded from the hashing because
+        balance is updated as any costs are paid off. Otherwise,
+        the hash would change frequently and multiple versions
+        of the case would be captured that we don't want.
+
+        The last table opened in the body is the one BeautifulSoup would report as
+        tables[-1], and since nothing opens after it, its end is the next </table>.
+        """
+        lowered = case_html.lower()
+        body_start = lowered.find(b"<body")
+        body_start = 0 if body_start == -1 else body_start
+        body_end = lowered.rfind(b"</body>", body_start)
+        body_end = len(case_html) if body_end == -1 else body_end
+
+        body = case_html[body_start:body_end]
+        table_start = lowered.rfind(b"<table", body_start, body_end)
+        if table_start != -1:
+            table_end = lowered.find(b"</table>", table_start, body_end)
+            if table_end != -1:
+                table_end += len(b"</table>")
+                if b"Balance Due" in case_html[table_start:table_end]:
+                    body = (
+                        case_html[body_start:table_start]
+                        + case_html[table_end:body_end]
+                    )
+        return xxhash.xxh64(body).hexdigest()
+
+    def get_html_hash_manifest_path(self, county: str) -> str:
+        base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+        return os.path.join(base_dir, "data", county, "html_hash_manifest.json")
+
+    def get_html_hash_manifest_entry(self, html_hash: str) -> dict:
+        """
+        What the manifest records for a parsed case. A case is unchanged only if its
+        entry is the same, so a new parser version re-parses everything once.
+        """
+        return {"html_hash": html_hash, "parser_version": PARSER_VERSION}
+
+    def load_html_hash_manifest(self, county: str, logger) -> dict:
+        manifest_path = self.get_html_hash_manifest_path(county)
+        try:
+            with open(manifest_path, "r") as file_handle:
+                return json.load(file_handle)
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError as e:
+            logger.info(f"Ignoring unreadable hash manifest {manifest_path}: {e}")
+            return {}
+
+    def write_html_hash_manifest(self, county: str, manifest: dict, logger) -> None:
+        manifest_path = self.get_html_hash_manifest_path(county)
+        try:
+            os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+            # Write to a temporary file first so an interrupted run can't truncate the manifest.
+            with open(manifest_path + ".tmp", "w") as file_handle:
+                json.dump(manifest, file_handle)
+            os.replace(manifest_path + ".tmp", manifest_path)
+        except Exception as e:
+            logger.info(f"Error in write_html_hash_manifest: {e}")
+            raise
+
+    def get_shard_directory(self, county: str) -> str:
+        base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+        return os.path.join(base_dir, "data", county, "case_jsonl")
+
+    def get_columnar_directory(self) -> str:
+        base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+        return os.path.join(base_dir, "data", "columnar")
+
+    def write_jsonl_data(
+        self, shard_writer: ShardWriter, case_number: str, case_data: dict, logger
+    ) -> None:
+        try:
+            shard_writer.write(case_number, case_data)
+        except Exception as e:
+            logger.info(f"Error in write_jsonl_data: {e}")
+            raise
+
     def write_error_log(self, county: str, case_number: str) -> None:
         try:
             base_dir = os.path.abspath(
@@ -174,22 +329,392 @@ class Parser:
             )
             with open(
                 error_log_path,
-                "w",
+                "a",
             ) as file_handle:
                 file_handle.write(case_number + "\n")
         except Exception as e:
             print(f"Error in write_error_log: {e}")
             raise
 
+    def get_error_ledger_path(self, county: str) -> str:
+        base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+        return os.path.join(base_dir, "data", county, "parse_error_ledger.jsonl")
+
+    def write_error_ledger(self, county: str, entry: dict, logger) -> None:
+        """Appends one JSON line to the county's parse error ledger. Entries are never rewritten."""
+        ledger_path = self.get_error_ledger_path(county)
+        try:
+            os.makedirs(os.path.dirname(ledger_path), exist_ok=True)
+            entry = {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "parser_version": PARSER_VERSION,
+                **entry,
+            }
+            with open(ledger_path, "a") as file_handle:
+                file_handle.write(json.dumps(entry) + "\n")
+        except Exception as e:
+            logger.info(f"Error in write_error_ledger: {e}")
+            raise
+
+    def get_failed_cases(self, county: str, logger) -> List[str]:
+        """Case numbers whose latest ledger entry is a failure, in the order they first failed."""
+        latest_status = {}
+        try:
+            with open(self.get_error_ledger_path(county), "r") as file_handle:
+                for line in file_handle:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.info(f"Skipping unreadable ledger line: {line!r}")
+                        continue
+                    # re-inserting keeps first-failure order but updates the status
+                    latest_status[entry["case_number"]] = entry["status"]
+        except FileNotFoundError:
+            return []
+        return [
+            case_number
+            for case_number, status in latest_status.items()
+            if status == "failed"
+        ]
+
+    def get_case_sources(
+        self, case_html_list: List[str]
+    ) -> Iterator[Tuple[str, Callable[[], bytes]]]:
+        """Yields (case_number, reader) for each HTML file, the reader returns its raw bytes."""
+        for case_html_file_path in case_html_list:
+            case_number = os.path.basename(case_html_file_path).split(".")[0]
+            yield case_number, partial(self.read_case_html, case_html_file_path)
+
+    def get_archive_sources(
+        self, archive_path: str, logger, case_numbers: Optional[set] = None
+    ) -> Iterator[Tuple[str, Callable[[], bytes]]]:
+        """
+        Yields (case_number, reader) for each .html member of a zip or tar archive,
+        without extracting anything to disk.
+
+        Tar archives (optionally gzip/bz2/xz compressed) are read as a stream, so a
+        member's reader has to be called before the next member is requested.
+        case_numbers limits the members to those cases.
+        """
+        logger.info(f"Reading case HTML from archive {archive_path}")
+        if zipfile.is_zipfile(archive_path):
+            with zipfile.ZipFile(archive_path) as archive:
+                for member in archive.infolist():
+                    if member.is_dir() or not member.filename.endswith(".html"):
+                        continue
+                    case_number = os.path.basename(member.filename).split(".")[0]
+                    if case_numbers is None or case_number in case_numbers:
+                        yield case_number, partial(archive.read, member)
+        else:
+            with tarfile.open(archive_path, "r|*") as archive:
+                for member in archive:
+                    if not member.isfile() or not member.name.endswith(".html"):
+                        continue
+                    case_number = os.path.basename(member.name).split(".")[0]
+                    if case_numbers is None or case_number in case_numbers:
+                        yield case_number, archive.extractfile(member).read
+
+    def describe_parse_error(self, e: Exception, section: Optional[str]) -> dict:
+        # Must be called from the except block handling e, for the traceback.
+        return {
+            "exception_type": type(e).__name__,
+            "message": str(e),
+            "section": section or "unknown",
+            "traceback": traceback.format_exc(),
+        }
+
+    def get_parse_tasks(
+        self,
+        case_sources: Iterator[Tuple[str, Callable[[], bytes]]],
+        skip_unchanged: bool,
+        html_hash_manifest: dict,
+        cached_case_json_list,
+        run_counts: dict,
+        logger,
+    ) -> Iterator[tuple]:
+        """
+        Reads and hashes each case, dropping the ones unchanged since their last parse.
+
+        Yields (case_number, case_html, html_hash, stages, elapsed, error) tuples that
+        parse_case can run in this process or in a worker. A case that couldn't be
+        read is passed on with its error instead of raising, so it still gets recorded.
+        """
+        timer = StageTimer()
+        for case_number, read_case in case_sources:
+            timer.start_case(case_number)
+            case_html = html_hash = error = None
+            try:
+                with timer.stage("read"):
+                    case_html = read_case()
+                with timer.stage("hash"):
+                    html_hash = self.get_html_hash(case_html)
+            except Exception as e:
+                error = self.describe_parse_error(e, timer.failed_stage)
+            else:
+                if (
+                    skip_unchanged
+                    and html_hash_manifest.get(case_number) == self.get_html_hash_manifest_entry(html_hash)
+                    and case_number in cached_case_json_list
+                ):
+                    logger.debug("%s - unchanged since last parse, skipping", case_number)
+                    run_counts["skipped"] += 1
+                    timer.cancel_case()
+                    continue
+            elapsed, stages = timer.finish_case()
+            yield case_number, case_html, html_hash, stages, elapsed, error
+
+    def set_case_log_level(
+        self, logger, case_number: str, log_level: int, log_sample_rate: float
+    ) -> None:
+        if log_sample_rate and log_level > logging.DEBUG:
+            level = (
+                logging.DEBUG
+                if self.is_case_sampled(case_number, log_sample_rate)
+                else log_level
+            )
+            # setLevel clears the logger caches, so only call it when the level changes
+            if logger.level != level:
+                logger.setLevel(level)
+
+    def parse_case(
+        self,
+        county: str,
+        task: tuple,
+        parser_function: callable,
+        timer: StageTimer,
+        logger,
+        log_level: int = logging.INFO,
+        log_sample_rate: float = 0.0,
+        release_soup: bool = False,
+    ) -> dict:
+        """
+        Builds the soup for one task from get_parse_tasks and runs the county parser on it.
+
+        Returns a dict with case_number, html_hash, case_data (None on failure), error
+        (None on success), stages and elapsed. Never raises, and only returns plain
+        data, so it can run in a worker process.
+
+        release_soup decomposes the soup once the parser is done with it. A soup is
+        full of reference cycles, so otherwise it's only freed by the cycle collector.
+        """
+        case_number, case_html, html_hash, stages, elapsed, error = task
+        result = {"case_number": case_number, "html_hash": html_hash, "case_data": None}
+        timer.start_case(case_number, stages)
+        if error is None:
+            self.set_case_log_level(logger, case_number, log_level, log_sample_rate)
+            logger.debug("%s - parsing", case_number)
+            case_soup = None
+            try:
+                with timer.stage("soup"):
+                    case_soup = BeautifulSoup(self.decode_case_html(case_html), "html.parser")
+                with timer.stage(f"parser_{county}"):
+                    case_data = parser_function(county, case_number, logger, case_soup)
+                case_data["html_hash"] = html_hash
+                case_data["parser_version"] = PARSER_VERSION
+                result["case_data"] = case_data
+            except Exception as e:
+                error = self.describe_parse_error(e, timer.failed_stage)
+            finally:
+                if release_soup and case_soup is not None:
+                    case_soup.decompose()
+        parse_elapsed, result["stages"] = timer.finish_case()
+        result["elapsed"] = elapsed + parse_elapsed
+        result["error"] = error
+        return result
+
+    def parse_html(
+        self,
+        county: str,
+        case_number: str,
+        case_html: bytes,
+        sections: Optional[List[str]] = None,
+        logger=None,
+    ) -> dict:
+        """
+        Parses one case's raw HTML in memory and returns its case data, writing nothing.
+
+        sections limits the result to those top-level sections, or "Section.field"
+        for single fields, e.g. ["Charge Information", "Case Details.date filed"].
+        Only the tables and handlers those need are run, and html_hash and
+        parser_version are set.
+
+        Asking for nothing but Case Metadata, when the county parser has a
+        parser_<county>_metadata method, skips the soup, decodes the page only up
+        to the case code and doesn't hash it: the result is just Case Metadata
+        (code, odyssey id, county) and parser_version, without html_hash.
+        """
+        logger = logger or self.configure_logger()
+        county = county.lower()
+        if county not in self.county_parsers:
+            self.county_parsers[county] = self.get_class_and_method(logger, county)
+        parser_instance, parser_function = self.county_parsers[county]
+        if parser_function is None:
+            raise ValueError(f"No parser found for {county} county")
+
+        metadata_function = getattr(parser_instance, f"parser_{county}_metadata", None)
+        if (
+            sections is not None
+            and metadata_function is not None
+            and {section.split(".")[0] for section in sections} <= {"Case Metadata"}
+        ):
+            case_data = metadata_function(county, case_number, logger, self.open_case_html(case_html))
+            case_data["parser_version"] = PARSER_VERSION
+            return case_data
+
+        kwargs = {"sections": sections} if sections is not None else {}
+        case_soup = BeautifulSoup(self.decode_case_html(case_html), "html.parser")
+        try:
+            case_data = parser_function(county, case_number, logger, case_soup, **kwargs)
+        finally:
+            case_soup.decompose()
+        case_data["html_hash"] = self.get_html_hash(case_html)
+        case_data["parser_version"] = PARSER_VERSION
+        return case_data
+
+    def record_parse_result(
+        self,
+        county: str,
+        result: dict,
+        case_json_path: str,
+        shard_writer: Optional[ShardWriter],
+        columnar_writer,
+        html_hash_manifest: dict,
+        failed_cases: set,
+        run_counts: dict,
+        timer: StageTimer,
+        logger,
+    ) -> bool:
+        """
+        Writes out one parse_case result, or records its failure in the error ledger.
+        Returns whether the case was written.
+        """
+        case_number = result["case_number"]
+        case_data = result["case_data"]
+        error = result["error"]
+        stages = result["stages"]
+        elapsed = result["elapsed"]
+        if error is None:
+            write_start = perf_counter()
+            try:
+                if shard_writer is not None:
+                    self.write_jsonl_data(shard_writer, case_number, case_data, logger)
+                else:
+                    self.write_json_data(case_json_path, case_number, case_data, logger)
+                if columnar_writer is not None:
+                    columnar_writer.add_case(case_data)
+            except Exception as e:
+                error = self.describe_parse_error(e, "write")
+            stages["write"] = perf_counter() - write_start
+            elapsed += stages["write"]
+
+        if error is None:
+            html_hash_manifest[case_number] = self.get_html_hash_manifest_entry(result["html_hash"])
+            run_counts["parsed"] += 1
+            if case_number in failed_cases:
+                self.write_error_ledger(
+                    county, {"case_number": case_number, "status": "resolved"}, logger
+                )
+        else:
+            run_counts["failed"] += 1
+            logger.error(
+                f"{case_number} - failed in {error['section']}: "
+                f"{error['exception_type']}({error['message']!r})"
+            )
+            self.write_error_ledger(
+                county,
+                {"case_number": case_number, "status": "failed", **error},
+                logger,
+            )
+            self.write_error_log(county, case_number)
+        timer.record_case(case_number, elapsed, stages)
+        return error is None
+
+    def get_instrumented_parser(
+        self, county: str, timer: StageTimer, logger, test=False, use_spec: bool = False
+    ) -> Optional[callable]:
+        parser_instance, parser_function = self.get_class_and_method(
+            county=county, logger=logger, test=test, use_spec=use_spec
+        )
+        if parser_instance is None or parser_function is None:
+            return None
+        # Failures here go to the error ledger, so let them out of the section handlers.
+        if hasattr(parser_instance, "raise_section_errors"):
+            parser_instance.raise_section_errors = True
+        timer.instrument(parser_instance)
+        return getattr(parser_instance, parser_function.__name__)
+
     def parse(
-        self, county: str, case_number: str, parse_single_file: bool = False, test=False
+        self,
+        county: str,
+        case_number: str,
+        parse_single_file: bool = False,
+        test=False,
+        skip_unchanged: bool = False,
+        output_format: str = "json",
+        compress_shards: bool = True,
+        columnar_format: Optional[str] = None,
+        profile_output: Optional[str] = None,
+        log_level: int = logging.INFO,
+        log_sample_rate: float = 0.0,
+        only_failed: bool = False,
+        archive_path: Optional[str] = None,
+        workers: int = 1,
+        memory_check_every: int = 0,
+        memory_report: Optional[str] = None,
+        max_cases_per_worker: Optional[int] = None,
+        worker_memory_limit_mb: Optional[float] = None,
+        use_spec: bool = False,
     ) -> None:
-        logger = self.configure_logger()
+        """
+        Parses the county's case HTML into JSON.
+
+        output_format "json" writes one indented file per case to case_json.
+        output_format "jsonl" appends compact records to rotating shards in
+        data/<county>/case_jsonl (gzip-compressed unless compress_shards is False),
+        with index.csv mapping each case number to its shard and offset.
+
+        columnar_format "parquet" or "arrow" additionally writes the cases, charges,
+        dispositions and events tables to data/columnar, partitioned by county and
+        filing month, as the cases are parsed.
+
+        Every case is timed per stage and a p50/p95/max summary with the slowest
+        case IDs is logged at the end. profile_output also dumps cProfile stats
+        for the parsing loop to that path (view with python -m pstats).
+
+        Per-case messages are logged at DEBUG. log_sample_rate (0.0 - 1.0) turns on
+        DEBUG logging for that fraction of cases when log_level is above DEBUG.
+
+        Cases that raise are appended to data/<county>/parse_error_ledger.jsonl with
+        the exception and the section they failed in. A county parser section handler
+        that would fill in "Unknown"s on an error raises instead, so the case fails.
+        only_failed re-parses just the cases whose latest ledger entry is a failure;
+        successes are recorded as resolved.
+
+        archive_path reads the case HTML from a zip or tar archive (such as the one
+        tools/zip_folder.py builds) instead of case_html, streaming the members without
+        extracting them. case_number and only_failed filter the members the same way.
+
+        workers > 1 builds the soups and runs the county parser in that many worker
+        processes. Reading, hashing and writing stay in this process, so outputs, the
+        hash manifest and the ledger have a single writer; cases finish out of order.
+        cProfile stats only cover this process. A worker is replaced with a fresh one
+        after max_cases_per_worker cases or once its RSS passes worker_memory_limit_mb.
+
+        memory_check_every > 0 decomposes every soup once it's parsed and logs the RSS
+        of each process every that many cases. memory_report additionally traces
+        allocations with tracemalloc, logs the sites that grew the most at each check
+        and writes the largest allocation sites of this process to that path at the end.
+        Tracing slows parsing down considerably.
+
+        use_spec parses with the county's extraction spec in resources/parser_specs
+        even when it has a hand-written parser class.
+        """
+        logger = self.configure_logger(log_level)
 
         # For simple testing purposes
         # Comment out for larger scale testing
         # Case number is from /resources/test_files/test_{case_number}.html
-        if not case_number:
+        if parse_single_file and not case_number:
             case_number = "51652356"
 
         logger.info(
@@ -203,68 +728,317 @@ class Parser:
             # start
             START_TIME_PARSER = time()
             logger.info(f"Time started: {START_TIME_PARSER}")
-            # creating a list of json files already parsed
-            cached_case_json_list = [
-                file_name.split(".")[0] for file_name in os.listdir(case_json_path)
-            ]
 
-            # Get a list of the HTML files that it needs to parse.
-            case_html_list = self.get_list_of_html(
-                case_html_path, case_number, county, logger, parse_single_file
+            timer = StageTimer()
+            parser_function = self.get_instrumented_parser(county, timer, logger, test, use_spec)
+            if parser_function is None:
+                logger.info("Error: Could not obtain parser instance or function.")
+                return
+
+            shard_writer = None
+            if output_format == "jsonl":
+                shard_dir = self.get_shard_directory(county)
+                shard_writer = ShardWriter(shard_dir, compress=compress_shards)
+                # cases already parsed into the shards
+                cached_case_json_list = set(load_shard_index(shard_dir))
+            else:
+                # the json files already parsed
+                cached_case_json_list = {
+                    file_name.split(".")[0] for file_name in os.listdir(case_json_path)
+                }
+
+            columnar_writer = None
+            if columnar_format:
+                # pyarrow is only needed when a columnar export is requested
+                from .columnar import ColumnarWriter
+
+                columnar_writer = ColumnarWriter(
+                    self.get_columnar_directory(), file_format=columnar_format
+                )
+
+            # Get the HTML that it needs to parse.
+            failed_cases = self.get_failed_cases(county, logger)
+            if only_failed:
+                logger.info(f"Re-parsing {len(failed_cases)} cases from the error ledger")
+            if archive_path:
+                case_numbers = None
+                if only_failed:
+                    case_numbers = set(failed_cases)
+                elif case_number:
+                    case_numbers = {case_number}
+                case_sources = self.get_archive_sources(archive_path, logger, case_numbers)
+            elif only_failed:
+                case_sources = self.get_case_sources(
+                    [
+                        os.path.join(case_html_path, f"{failed_case}.html")
+                        for failed_case in failed_cases
+                    ]
+                )
+            else:
+                case_sources = self.get_case_sources(
+                    self.get_list_of_html(
+                        case_html_path, case_number, county, logger, parse_single_file
+                    )
+                )
+            failed_cases = set(failed_cases)
+            # hashes of the HTML each case was last parsed from, so unchanged cases can skip the soup
+            html_hash_manifest = (
+                self.load_html_hash_manifest(county, logger) if skip_unchanged else {}
             )
-            logger.info(f"Starting for loop to parse {len(case_html_list)} cases")
-            for case_html_file_path in case_html_list:
-                try:
-                    case_number = os.path.basename(case_html_file_path).split(".")[0]
+            run_counts = {"parsed": 0, "skipped": 0, "failed": 0}
 
-                    logger.info(f"{case_number} - parsing")
+            release_soup = memory_check_every > 0 or memory_report is not None
+            memory_monitor = MemoryMonitor(
+                check_every=memory_check_every, trace=memory_report is not None
+            )
+            memory_monitor.start()
 
-                    with open(
-                        case_html_file_path, "r", encoding="utf-8", errors="ignore"
-                    ) as file:
-                        case_soup = BeautifulSoup(file, "html.parser")
+            profiler = cProfile.Profile() if profile_output else None
+            if profiler is not None:
+                profiler.enable()
 
-                    parser_instance, parser_function = self.get_class_and_method(
-                        county=county, logger=logger, test=test
+            tasks = self.get_parse_tasks(
+                case_sources,
+                skip_unchanged,
+                html_hash_manifest,
+                cached_case_json_list,
+                run_counts,
+                logger,
+            )
+            if workers > 1:
+                logger.info(f"Starting {workers} parser workers")
+                pool = RecyclingPool(
+                    workers,
+                    initializer=init_parse_worker,
+                    initargs=(
+                        county,
+                        test,
+                        log_level,
+                        log_sample_rate,
+                        release_soup,
+                        memory_check_every,
+                        memory_report is not None,
+                        use_spec,
+                    ),
+                    max_tasks_per_worker=max_cases_per_worker,
+                    memory_limit_mb=worker_memory_limit_mb,
+                    logger=logger,
+                )
+                results = pool.imap_unordered(parse_case_in_worker, tasks)
+            else:
+                results = (
+                    self.parse_case(
+                        county,
+                        task,
+                        parser_function,
+                        timer,
+                        logger,
+                        log_level,
+                        log_sample_rate,
+                        release_soup,
                     )
+                    for task in tasks
+                )
 
-                    if parser_instance is not None and parser_function is not None:
-                        case_data = parser_function(
-                            county, case_number, logger, case_soup
-                        )
-                    else:
-                        logger.info(
-                            "Error: Could not obtain parser instance or function."
-                        )
-                        continue
+            logger.info("Starting loop to parse cases")
+            for result in results:
+                self.record_parse_result(
+                    county,
+                    result,
+                    case_json_path,
+                    shard_writer,
+                    columnar_writer,
+                    html_hash_manifest,
+                    failed_cases,
+                    run_counts,
+                    timer,
+                    logger,
+                )
+                memory_monitor.case_done(logger)
 
-                    body = case_soup.find("body")
-                    tables = body.find_all("table")
-                    if tables:
-                        """
-                        Why balance table is dropped before hashing:
-                        The balance table is excluded from the hashing because
-                        balance is updated as any costs are paid off. Otherwise,
-                        the hash would change frequently and multiple versions 
-                        of the case would be captured that we don't want.
-                        """
-                        balance_table = tables[-1]
-                        if "Balance Due" in balance_table.text:
-                            balance_table.decompose()
-                    case_data["html_hash"] = xxhash.xxh64(str(body)).hexdigest()
+            logger.setLevel(log_level)
 
-                    self.write_json_data(case_json_path, case_number, case_data, logger)
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(profile_output)
+                logger.info(f"Wrote cProfile stats to {profile_output}")
+
+            if memory_report is not None:
+                with open(memory_report, "w") as file_handle:
+                    file_handle.write("\n".join(memory_monitor.report()) + "\n")
+                logger.info(f"Wrote memory report to {memory_report}")
+            memory_monitor.stop()
 
-                except Exception:
-                    print(traceback.format_exc())
-                    self.write_error_log(county, case_number)
+            if shard_writer is not None:
+                shard_writer.close()
+            if columnar_writer is not None:
+                columnar_writer.close()
+            if skip_unchanged:
+                self.write_html_hash_manifest(county, html_hash_manifest, logger)
+                logger.info(f"Skipped {run_counts['skipped']} unchanged cases")
 
+            logger.info("Parse timings by stage:\n" + "\n".join(timer.summary()))
             RUN_TIME_PARSER = time() - START_TIME_PARSER
-            logger.info(f"Parsing took {RUN_TIME_PARSER} seconds")
+            logger.info(
+                f"Parsing took {RUN_TIME_PARSER} seconds: {run_counts['parsed']} parsed, "
+                f"{run_counts['skipped']} skipped, {run_counts['failed']} failed "
+                f"({run_counts['parsed'] / RUN_TIME_PARSER if RUN_TIME_PARSER else 0:.1f} cases/s)"
+            )
         except Exception as e:
             logger.info(f"Error in parse: {e}")
             raise
-        
-if __name__ == "__main__":
+
+    def watch(
+        self,
+        county: str,
+        poll_interval: float = 1.0,
+        settle_seconds: float = 2.0,
+        clean: bool = False,
+        catch_up: bool = False,
+        log_level: int = logging.INFO,
+        use_spec: bool = False,
+        max_polls: Optional[int] = None,
+    ) -> None:
+        """
+        Parses each case as it lands in data/<county>/case_html, until interrupted.
+
+        The directory is polled every poll_interval seconds, and a file is parsed once
+        its size and modification time have held for settle_seconds, so a page still
+        being written, or rewritten several times in a row, is parsed once, after the
+        last write. A rewrite with the same HTML as the last parse is skipped.
+
+        clean also runs the cleaner on each case as soon as its JSON is written.
+        catch_up parses the files already in the directory too, except those the
+        hash manifest shows were parsed from the same HTML. max_polls stops after
+        that many polls.
+
+        Failures go to the error ledger like in parse, and the scrape-to-parse latency
+        of every case is logged.
+        """
+        logger = self.configure_logger(log_level)
+        county = county.lower()
+        case_html_path, case_json_path = self.get_directories(county, logger)
+        os.makedirs(case_html_path, exist_ok=True)
+
+        timer = StageTimer()
+        parser_function = self.get_instrumented_parser(county, timer, logger, use_spec=use_spec)
+        if parser_function is None:
+            logger.info("Error: Could not obtain parser instance or function.")
+            return
+
+        cleaner_instance = None
+        if clean:
+            # imported here, the cleaner imports from this package
+            from ..cleaner import Cleaner
+
+            cleaner_instance = Cleaner()
+            cleaned_folder_path = cleaner_instance.get_or_create_folder_path(county, "case_json_cleaned")
+
+        html_hash_manifest = self.load_html_hash_manifest(county, logger)
+        cached_case_json_list = {
+            file_name.split(".")[0] for file_name in os.listdir(case_json_path)
+        }
+        failed_cases = set(self.get_failed_cases(county, logger))
+        run_counts = {"parsed": 0, "skipped": 0, "failed": 0}
+        watcher = DirectoryWatcher(case_html_path, settle_seconds, include_existing=catch_up)
+        logger.info(f"Watching {case_html_path}")
+
+        polls = 0
+        try:
+            while max_polls is None or polls < max_polls:
+                ready = watcher.poll()
+                case_sources = self.get_case_sources(
+                    [os.path.join(case_html_path, file_name) for file_name in ready]
+                )
+                for task in self.get_parse_tasks(
+                    case_sources, True, html_hash_manifest, cached_case_json_list, run_counts, logger
+                ):
+                    case_number = task[0]
+                    result = self.parse_case(county, task, parser_function, timer, logger, log_level)
+                    if not self.record_parse_result(
+                        county,
+                        result,
+                        case_json_path,
+                        None,
+                        None,
+                        html_hash_manifest,
+                        failed_cases,
+                        run_counts,
+                        timer,
+                        logger,
+                    ):
+                        failed_cases.add(case_number)
+                        continue
+                    cached_case_json_list.add(case_number)
+                    failed_cases.discard(case_number)
+                    if cleaner_instance is not None:
+                        try:
+                            cleaner_instance.process_single_case(
+                                case_json_path, f"{case_number}.json", cleaned_folder_path
+                            )
+                        except Exception as e:
+                            logger.error(f"{case_number} - cleaning failed: {e!r}")
+                    written_at = watcher.done[f"{case_number}.html"][1] / 1e9
+                    logger.info(
+                        f"{case_number} - {'cleaned' if clean else 'parsed'} {time() - written_at:.1f}s after it was written"
+                    )
+                polls += 1
+                if max_polls is None or polls < max_polls:
+                    sleep(poll_interval)
+        except KeyboardInterrupt:
+            logger.info("Stopped watching")
+        finally:
+            self.write_html_hash_manifest(county, html_hash_manifest, logger)
+            logger.setLevel(log_level)
+            logger.info(
+                f"Watched {polls} polls: {run_counts['parsed']} parsed, "
+                f"{run_counts['skipped']} unchanged, {run_counts['failed']} failed"
+            )
+
+
+# State for parse_case_in_worker, set up once per worker process by init_parse_worker.
+_worker_state = {}
+
+
+def init_parse_worker(
+    county: str,
+    test: bool,
+    log_level: int,
+    log_sample_rate: float,
+    release_soup: bool = False,
+    memory_check_every: int = 0,
+    trace_memory: bool = False,
+    use_spec: bool = False,
+) -> None:
     parser = Parser()
-    parser.parse(county="hays", case_number=None, parse_single_file=True)
+    logger = parser.configure_logger(log_level)
+    timer = StageTimer()
+    memory_monitor = MemoryMonitor(check_every=memory_check_every, trace=trace_memory)
+    memory_monitor.start()
+    _worker_state.update(
+        parser=parser,
+        county=county,
+        logger=logger,
+        timer=timer,
+        parser_function=parser.get_instrumented_parser(county, timer, logger, test, use_spec),
+        log_level=log_level,
+        log_sample_rate=log_sample_rate,
+        release_soup=release_soup,
+        memory_monitor=memory_monitor,
+    )
+
+
+def parse_case_in_worker(task: tuple) -> dict:
+    state = _worker_state
+    result = state["parser"].parse_case(
+        state["county"],
+        task,
+        state["parser_function"],
+        state["timer"],
+        state["logger"],
+        state["log_level"],
+        state["log_sample_rate"],
+        state["release_soup"],
+    )
+    state["memory_monitor"].case_done(state["logger"])
+    return result
@@ -0,0 +1,176 @@
+import argparse
+import logging
+
+from . import Parser
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument(
+        "-county",
+        "-c",
+        type=str,
+        default="hays",
+        help="The name of the county.",
+    )
+    argparser.add_argument(
+        "-case_number",
+        type=str,
+        default=None,
+        help="Only parse this case number.",
+    )
+    argparser.add_argument(
+        "-all",
+        action="store_true",
+        help="Parse the scraped HTML in data/<county>/case_html instead of the test file.",
+    )
+    argparser.add_argument(
+        "--only-failed",
+        action="store_true",
+        help="Only re-parse the cases whose latest entry in the parse error ledger is a failure.",
+    )
+    argparser.add_argument(
+        "-archive",
+        type=str,
+        default=None,
+        help="Read the case HTML from this zip or tar archive instead of data/<county>/case_html.",
+    )
+    argparser.add_argument(
+        "-skip_unchanged",
+        action="store_true",
+        help="Skip cases whose HTML is unchanged since they were last parsed.",
+    )
+    argparser.add_argument(
+        "-output_format",
+        type=str,
+        choices=["json", "jsonl"],
+        default="json",
+        help="Write one JSON file per case to case_json, or append to the JSONL shards in case_jsonl.",
+    )
+    argparser.add_argument(
+        "-uncompressed_shards",
+        action="store_true",
+        help="With -output_format jsonl, write the shards without gzip.",
+    )
+    argparser.add_argument(
+        "-columnar_format",
+        type=str,
+        choices=["parquet", "arrow"],
+        default=None,
+        help="Also write the cases, charges, dispositions and events tables to data/columnar.",
+    )
+    argparser.add_argument(
+        "-profile_output",
+        type=str,
+        default=None,
+        help="Dump cProfile stats for the parsing loop to this file.",
+    )
+    argparser.add_argument(
+        "-log_level",
+        type=str,
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        default="INFO",
+        help="Level of the parser's log. Per-case messages are logged at DEBUG.",
+    )
+    argparser.add_argument(
+        "-log_sample_rate",
+        type=float,
+        default=0.0,
+        help="Log this fraction of cases (0.0 - 1.0) at DEBUG when -log_level is above it.",
+    )
+    argparser.add_argument(
+        "-workers",
+        type=int,
+        default=1,
+        help="Number of worker processes to parse with.",
+    )
+    argparser.add_argument(
+        "-max_cases_per_worker",
+        type=int,
+        default=None,
+        help="Replace a worker process after it has parsed this many cases.",
+    )
+    argparser.add_argument(
+        "-worker_memory_limit_mb",
+        type=float,
+        default=None,
+        help="Replace a worker process once its RSS passes this many MB.",
+    )
+    argparser.add_argument(
+        "-memory_check_every",
+        type=int,
+        default=0,
+        help="Free each soup explicitly and log the RSS every this many cases.",
+    )
+    argparser.add_argument(
+        "-memory_report",
+        type=str,
+        default=None,
+        help="Trace allocations and write the largest allocation sites to this file.",
+    )
+    argparser.add_argument(
+        "-use_spec",
+        action="store_true",
+        help="Parse with the county's extraction spec in resources/parser_specs, even if it has a parser class.",
+    )
+    argparser.add_argument(
+        "-watch",
+        action="store_true",
+        help="Keep running and parse each case as soon as it lands in data/<county>/case_html.",
+    )
+    argparser.add_argument(
+        "-poll_interval",
+        type=float,
+        default=1.0,
+        help="Seconds between polls of case_html in watch mode.",
+    )
+    argparser.add_argument(
+        "-settle_seconds",
+        type=float,
+        default=2.0,
+        help="Seconds a file has to stay unchanged before it is parsed in watch mode.",
+    )
+    argparser.add_argument(
+        "-clean",
+        action="store_true",
+        help="In watch mode, also clean each case once it is parsed.",
+    )
+    argparser.add_argument(
+        "-catch_up",
+        action="store_true",
+        help="In watch mode, also parse the files already in case_html.",
+    )
+    argparser.description = "Parse case HTML into JSON for the specified county."
+    args = argparser.parse_args()
+
+    parser = Parser()
+    if args.watch:
+        parser.watch(
+            county=args.county,
+            poll_interval=args.poll_interval,
+            settle_seconds=args.settle_seconds,
+            clean=args.clean,
+            catch_up=args.catch_up,
+            log_level=getattr(logging, args.log_level),
+            use_spec=args.use_spec,
+        )
+    else:
+        parser.parse(
+            county=args.county,
+            case_number=args.case_number,
+            parse_single_file=not (args.all or args.only_failed or args.archive),
+            only_failed=args.only_failed,
+            archive_path=args.archive,
+            skip_unchanged=args.skip_unchanged,
+            output_format=args.output_format,
+            compress_shards=not args.uncompressed_shards,
+            columnar_format=args.columnar_format,
+            profile_output=args.profile_output,
+            log_level=getattr(logging, args.log_level),
+            log_sample_rate=args.log_sample_rate,
+            workers=args.workers,
+            max_cases_per_worker=args.max_cases_per_worker,
+            worker_memory_limit_mb=args.worker_memory_limit_mb,
+            memory_check_every=args.memory_check_every,
+            memory_report=args.memory_report,
+            use_spec=args.use_spec,
+        )
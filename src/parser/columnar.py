@@ -0,0 +1,279 @@
+"""
+Columnar (Parquet / Arrow IPC) export of parsed cases.
+
+Each parsed case is flattened into rows for four normalized tables:
+
+- cases: one row per case with its details, defendant demographics and top charge
+- charges: one row per entry in "Charge Information"
+- dispositions: one row per disposition detail
+- events: one row per entry in "Other Events and Hearings"
+
+Rows are buffered per partition, and each partition's rows go to one part file
+per run,
+
+    <columnar_dir>/<table>/county=<county>/filing_month=<YYYY-MM>/part-<run>-<n>.<ext>
+
+kept open for the run and written a row group at a time: whenever a partition
+has row_group_size rows buffered, and for the largest partitions whenever more
+than max_buffered_rows are buffered in all. So a backfill across many filing
+months writes one file per partition, not one per partition per flush. At most
+max_open_files part files are open at once; a partition whose file had to be
+closed continues in a new part file (n + 1).
+
+The tables can be read back as a hive partitioned dataset
+(e.g. pyarrow.dataset.dataset(path, partitioning="hive")) once the writer is closed.
+county and filing_month only live in the partition paths, not in the files.
+A case that is parsed again gets new rows; use html_hash in the cases table to
+pick the latest version.
+"""
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet as pq
+
+from .dates import parse_date
+
+FILE_EXTENSIONS = {"parquet": "parquet", "arrow": "arrow"}
+
+SCHEMAS = {
+    "cases": pa.schema(
+        [
+            ("odyssey_id", pa.string()),
+            ("code", pa.string()),
+            ("case_name", pa.string()),
+            ("case_type", pa.string()),
+            ("date_filed", pa.date32()),
+            ("location", pa.string()),
+            ("sex", pa.string()),
+            ("race", pa.string()),
+            ("defense_attorney", pa.string()),
+            ("appointed_or_retained", pa.string()),
+            ("prosecuting_attorney", pa.string()),
+            ("top_charge_name", pa.string()),
+            ("top_charge_level", pa.string()),
+            ("dismissed_charges_count", pa.int32()),
+            ("charge_count", pa.int32()),
+            ("disposition_count", pa.int32()),
+            ("event_count", pa.int32()),
+            ("html_hash", pa.string()),
+            ("parser_version", pa.string()),
+        ]
+    ),
+    "charges": pa.schema(
+        [
+            ("odyssey_id", pa.string()),
+            ("charge_id", pa.int32()),
+            ("charge", pa.string()),
+            ("statute", pa.string()),
+            ("level", pa.string()),
+            ("charge_date", pa.date32()),
+        ]
+    ),
+    "dispositions": pa.schema(
+        [
+            ("odyssey_id", pa.string()),
+            ("disposition_id", pa.int32()),
+            ("disposition_date", pa.date32()),
+            ("event", pa.string()),
+            ("judicial_officer", pa.string()),
+            ("charge", pa.string()),
+            ("outcome", pa.string()),
+            ("additional_info", pa.string()),
+        ]
+    ),
+    "events": pa.schema(
+        [
+            ("odyssey_id", pa.string()),
+            ("event_id", pa.int32()),
+            ("event_date", pa.date32()),
+            ("event", pa.string()),
+            ("details", pa.string()),
+        ]
+    ),
+}
+
+
+def get_filing_month(case_data: dict) -> str:
+    date_filed = parse_date(case_data.get("Case Details", {}).get("date filed"))
+    return date_filed.strftime("%Y-%m") if date_filed else "unknown"
+
+
+def flatten_case(case_data: dict) -> Dict[str, List[dict]]:
+    """Splits one parsed case into rows for each of the columnar tables."""
+    metadata = case_data.get("Case Metadata", {})
+    details = case_data.get("Case Details", {})
+    defendant = case_data.get("Defendent Information", {})
+    state = case_data.get("State Information", {})
+    top_charge = case_data.get("Top Charge") or {}
+    charges = case_data.get("Charge Information", [])
+    dispositions = case_data.get("Disposition Information", [])
+    events = case_data.get("Other Events and Hearings", [])
+    odyssey_id = metadata.get("odyssey id")
+
+    dismissed_charges_count = case_data.get("Dismissed Charges Count")
+    if not isinstance(dismissed_charges_count, int):
+        dismissed_charges_count = None
+
+    rows = {
+        "cases": [
+            {
+                "odyssey_id": odyssey_id,
+                "code": metadata.get("code"),
+                "case_name": details.get("name"),
+                "case_type": details.get("case type"),
+                "date_filed": parse_date(details.get("date filed")),
+                "location": details.get("location"),
+                "sex": defendant.get("sex"),
+                "race": defendant.get("race"),
+                "defense_attorney": defendant.get("defense attorney"),
+                "appointed_or_retained": defendant.get("appointed or retained"),
+                "prosecuting_attorney": state.get("prosecuting attorney"),
+                "top_charge_name": top_charge.get("charge name"),
+                "top_charge_level": top_charge.get("charge level"),
+                "dismissed_charges_count": dismissed_charges_count,
+                "charge_count": len(charges),
+                "disposition_count": len(dispositions),
+                "event_count": len(events),
+                "html_hash": case_data.get("html_hash"),
+                "parser_version": case_data.get("parser_version"),
+            }
+        ],
+        "charges": [
+            {
+                "odyssey_id": odyssey_id,
+                "charge_id": i,
+                "charge": charge.get("charges"),
+                "statute": charge.get("statute"),
+                "level": charge.get("level"),
+                "charge_date": parse_date(charge.get("date")),
+            }
+            for i, charge in enumerate(charges)
+        ],
+        "dispositions": [
+            {
+                "odyssey_id": odyssey_id,
+                "disposition_id": i,
+                "disposition_date": parse_date(disposition.get("date")),
+                "event": disposition.get("event"),
+                "judicial_officer": disposition.get("judicial officer"),
+                "charge": detail.get("charge"),
+                "outcome": detail.get("outcome"),
+                "additional_info": "; ".join(detail.get("additional_info", [])) or None,
+            }
+            for i, disposition in enumerate(dispositions)
+            for detail in disposition.get("details", [])
+        ],
+        "events": [
+            {
+                "odyssey_id": odyssey_id,
+                "event_id": i,
+                "event_date": parse_date(event[0]),
+                "event": event[1] if len(event) > 1 else None,
+                "details": "; ".join(event[2:]) or None,
+            }
+            for i, event in enumerate(events)
+        ],
+    }
+    return rows
+
+
+# (table, county, filing_month)
+Partition = Tuple[str, str, str]
+
+
+class ColumnarWriter:
+    """Buffers flattened case rows and writes them to one open part file per partition."""
+
+    def __init__(
+        self,
+        columnar_dir: str,
+        file_format: str = "parquet",
+        row_group_size: int = 10000,
+        max_buffered_rows: int = 200000,
+        max_open_files: int = 256,
+    ):
+        if file_format not in FILE_EXTENSIONS:
+            raise ValueError(f"Unsupported columnar format: {file_format}")
+        self.columnar_dir = columnar_dir
+        self.file_format = file_format
+        self.row_group_size = row_group_size
+        self.max_buffered_rows = max_buffered_rows
+        self.max_open_files = max_open_files
+        # Part files from different runs must not collide.
+        self.run_id = datetime.now().strftime("%Y%m%d%H%M%S") + f"-{os.getpid()}"
+        self.buffers: Dict[Partition, List[dict]] = {}
+        self.buffered_rows = 0
+        # open part file writers, least recently written first
+        self.writers: "OrderedDict[Partition, object]" = OrderedDict()
+        self.part_numbers: Dict[Partition, int] = {}
+
+    def add_case(self, case_data: dict) -> None:
+        county = case_data.get("Case Metadata", {}).get("county") or "unknown"
+        filing_month = get_filing_month(case_data)
+        for table, rows in flatten_case(case_data).items():
+            if not rows:
+                continue
+            partition = (table, county, filing_month)
+            buffer = self.buffers.setdefault(partition, [])
+            buffer.extend(rows)
+            self.buffered_rows += len(rows)
+            if len(buffer) >= self.row_group_size:
+                self.flush_partition(partition)
+        if self.buffered_rows > self.max_buffered_rows:
+            # the largest buffers first, until at most half the limit is left
+            for partition in sorted(self.buffers, key=lambda key: len(self.buffers[key]), reverse=True):
+                if self.buffered_rows <= self.max_buffered_rows // 2:
+                    break
+                self.flush_partition(partition)
+
+    def open_writer(self, partition: Partition):
+        table_name, county, filing_month = partition
+        partition_dir = os.path.join(
+            self.columnar_dir,
+            table_name,
+            f"county={county}",
+            f"filing_month={filing_month}",
+        )
+        os.makedirs(partition_dir, exist_ok=True)
+        part_number = self.part_numbers.get(partition, 0)
+        self.part_numbers[partition] = part_number + 1
+        file_path = os.path.join(
+            partition_dir,
+            f"part-{self.run_id}-{part_number:05d}.{FILE_EXTENSIONS[self.file_format]}",
+        )
+        if self.file_format == "parquet":
+            return pq.ParquetWriter(file_path, SCHEMAS[table_name])
+        return pa.ipc.new_file(file_path, SCHEMAS[table_name])
+
+    def flush_partition(self, partition: Partition) -> None:
+        """Writes the partition's buffered rows to its part file as a row group."""
+        rows = self.buffers.pop(partition)
+        self.buffered_rows -= len(rows)
+        writer = self.writers.pop(partition, None)
+        if writer is None:
+            if len(self.writers) >= self.max_open_files:
+                _, least_recent = self.writers.popitem(last=False)
+                least_recent.close()
+            writer = self.open_writer(partition)
+        self.writers[partition] = writer
+        writer.write_table(pa.Table.from_pylist(rows, schema=SCHEMAS[partition[0]]))
+
+    def flush(self) -> None:
+        for partition in list(self.buffers):
+            self.flush_partition(partition)
+
+    def close(self) -> None:
+        self.flush()
+        while self.writers:
+            _, writer = self.writers.popitem(last=False)
+            writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
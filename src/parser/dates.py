@@ -0,0 +1,41 @@
+"""
+Date parsing shared by the parser, the cleaner and the tools.
+
+Odyssey dates are always MM/DD/YYYY, sometimes behind a label as in
+"DOB: 02/15/1997". A corpus has only a few thousand distinct dates but
+millions of date strings, so both functions are memoized, with a bound on the
+cache so a stream of unusual strings can't grow it without limit. The regex
+fast path avoids strptime, which is several times slower than constructing
+the date directly.
+
+Kept free of relative imports so the tools can import it from this directory.
+"""
+import re
+from datetime import date
+from functools import lru_cache
+from typing import Optional
+
+DATE_CACHE_SIZE = 8192
+_DATE = re.compile(r"(?:[A-Za-z][A-Za-z ]*:\s*)?(\d{1,2})/(\d{1,2})/(\d{4})")
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date(date_str: str) -> Optional[date]:
+    """Return a `date` from e.g. '01/30/2021' or 'DOB: 01/30/2021', or None if it isn't one."""
+    if not isinstance(date_str, str):
+        return None
+    match = _DATE.fullmatch(date_str)
+    if match is None:
+        return None
+    month, day, year = match.groups()
+    try:
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def normalize_date(date_str: str) -> Optional[str]:
+    """The ISO form (YYYY-MM-DD) of a date parse_date accepts, otherwise None."""
+    parsed = parse_date(date_str)
+    return parsed.isoformat() if parsed is not None else None
@@ -1,5 +1,9 @@
-from typing import Dict, List
+from datetime import date
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Optional, TextIO
 from bs4 import BeautifulSoup
+from .dates import parse_date
+from .sections import count_outcome, get_charge_severity, select_fields, top_charge
 
 CHARGE_SEVERITY = {
     "First Degree Felony": 1,
@@ -10,10 +14,80 @@ CHARGE_SEVERITY = {
     "Misdemeanor B": 6,
 }
 
+DISPOSITION_EVENTS = ["disposition", "amended disposition", "deferred adjudication", "punishment hearing"]
+# Sub-title row of the Events & Orders table the non-disposition events are listed under.
+OTHER_EVENTS_HEADING = "OTHER EVENTS AND HEARINGS"
+
+# Output sections filled in from each kind of root table.
+TABLE_SECTIONS = {
+    "Case Details": ["Case Details"],
+    "Related Cases": ["Related Cases"],
+    "Party Information": ["Defendent Information", "State Information"],
+    "Charge Information": ["Charge Information"],
+    "Events & Orders of the Court": [
+        "Other Events and Hearings",
+        "Disposition Information",
+        "Top Charge",
+        "Dismissed Charges Count",
+    ],
+}
+SECTIONS = ["Case Metadata"] + [section for sections in TABLE_SECTIONS.values() for section in sections]
+# Sections computed from other sections.
+SECTION_DEPENDENCIES = {
+    "Top Charge": ["Charge Information", "Disposition Information"],
+    "Dismissed Charges Count": ["Disposition Information"],
+}
+# Characters of HTML fed to the metadata scanner at a time.
+METADATA_CHUNK_SIZE = 4096
+# Elements that never get an end tag.
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"}
+
+
+class CaseCodeScanner(HTMLParser):
+    """
+    Streams through case HTML looking for the case code, the text of the first
+    span directly inside div.ssCaseDetailCaseNbr. `code` is set as soon as the
+    span closes, so the caller can stop feeding the rest of the page.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.code: Optional[str] = None
+        # Depth relative to the case number div, None until it is found.
+        self.div_depth: Optional[int] = None
+        self.in_span = False
+        self.span_text: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if self.div_depth is None:
+            if tag == "div" and dict(attrs).get("class") == "ssCaseDetailCaseNbr":
+                self.div_depth = 0
+            return
+        if tag in VOID_TAGS:
+            return
+        self.div_depth += 1
+        if tag == "span" and self.div_depth == 1 and self.code is None:
+            self.in_span = True
+
+    def handle_endtag(self, tag):
+        if self.div_depth is None or tag in VOID_TAGS:
+            return
+        if self.in_span and tag == "span" and self.div_depth == 1:
+            self.in_span = False
+            self.code = "".join(self.span_text)
+        self.div_depth -= 1
+
+    def handle_data(self, data):
+        if self.in_span:
+            self.span_text.append(data)
+
+
 class ParserHays:
 
     def __init__(self):
-        pass
+        # Set while the error ledger is on, so a failing section fails the case
+        # instead of leaving "Unknown"s behind.
+        self.raise_section_errors = False
 
     def extract_rows(self, table: BeautifulSoup, logger) -> List[List[str]]:
         try:
@@ -28,57 +102,35 @@ class ParserHays:
             return [row for row in rows if row]
         except Exception as e:
             logger.info(f"Error extracting rows: {e}")
+            if self.raise_section_errors:
+                raise
             return []
     
     def get_charge_severity(self, charge: str, logger) -> int:
         try:
-            for charge_name, severity in CHARGE_SEVERITY.items():
-                if charge_name in charge:
-                    return severity
-            return float('inf')
+            return get_charge_severity(charge, CHARGE_SEVERITY)
         except Exception as e:
             logger.info(f"Error getting charge severity: {e}")
+            if self.raise_section_errors:
+                raise
             return float('inf')
 
     def count_dismissed_charges(self, dispositions: List[Dict], logger) -> int:
         try:
-            return sum(
-                1 for disposition in dispositions
-                for detail in disposition.get("details", [])
-                if detail.get("outcome", "").lower() == 'dismissed'
-            )
+            return count_outcome(dispositions, "dismissed")
         except Exception as e:
             logger.info(f"Error counting dismissed charges: {e}")
+            if self.raise_section_errors:
+                raise
             return "Unknown"
 
     def get_top_charge(self, dispositions: List[Dict], charge_information: List[Dict], logger) -> Dict:
         try:
-            top_charge = None
-            min_severity = float('inf')
-
-            charge_map = {info['charges']: info['level'] for info in charge_information}
-
-            for disposition in dispositions:
-                if isinstance(disposition, dict):
-                    for detail in disposition.get("details", []):
-                        if isinstance(detail, dict):
-                            charge_text = detail.get("charge", "").strip()
-                            charge_name = charge_text.split(" >=")[0].strip().lstrip("0123456789. ").strip()
-                            charge_level = charge_map.get(charge_name, "Unknown")
-
-                            severity = self.get_charge_severity(charge_level, logger)
-                            if severity < min_severity:
-                                min_severity = severity
-                                top_charge = {
-                                    "charge name": charge_name,
-                                    "charge level": charge_level
-                                }
-                else:
-                    logger.info(f"Unexpected type for disposition: {type(disposition)}")
-
-            return top_charge
+            return top_charge(dispositions, charge_information, CHARGE_SEVERITY)
         except Exception as e:
             logger.info(f"Error getting top charge: {e}")
+            if self.raise_section_errors:
+                raise
             return {
                 "charge name": "Unknown",
                 "charge level": "Unknown"
@@ -86,7 +138,7 @@ class ParserHays:
 
     def get_case_metadata(self, county: str, case_number: str, case_soup: BeautifulSoup, logger) -> Dict[str, str]:
         try:
-            logger.info(f"Getting case metadata for {county} case {case_number}")
+            logger.debug("Getting case metadata for %s case %s", county, case_number)
             return {
                 "code": case_soup.select('div[class="ssCaseDetailCaseNbr"] > span')[0].text,
                 "odyssey id": case_number,
@@ -94,6 +146,8 @@ class ParserHays:
             }  
         except Exception as e:
             logger.info(f"Error getting case metadata: {e}")
+            if self.raise_section_errors:
+                raise
             return {
                 "code": "Unknown",
                 "odyssey id": case_number,
@@ -103,7 +157,7 @@ class ParserHays:
     def get_case_details(self, table: BeautifulSoup, logger) -> Dict[str, str]:
         try:
             table_values = table.select("b")
-            logger.info(f"Getting case details")
+            logger.debug("Getting case details")
             return {
                 "name": table_values[0].text,
                 "case type": table_values[1].text,
@@ -112,6 +166,8 @@ class ParserHays:
             }
         except Exception as e:
             logger.info(f"Error getting case details: {e}")
+            if self.raise_section_errors:
+                raise
             return {
                 "name": "Unknown",
                 "case type": "Unknown",
@@ -121,7 +177,7 @@ class ParserHays:
     
     def parse_defendant_rows(self, defendant_rows: List[List[str]], logger) -> Dict[str, str]:
         try:
-            logger.info(f"Parsing defendant rows")
+            logger.debug("Parsing defendant rows")
             return {
                 "defendant": defendant_rows[1][1],
                 "sex": defendant_rows[1][2].split(" ")[0],
@@ -137,6 +193,8 @@ class ParserHays:
             }
         except Exception as e:
             logger.info(f"Error parsing defendant rows: {e}")
+            if self.raise_section_errors:
+                raise
             return {
                 "defendant": "Unknown",
                 "sex": "Unknown",  
@@ -153,13 +211,15 @@ class ParserHays:
         
     def parse_state_rows(self, state_rows: List[List[str]], logger) -> Dict[str, str]:
         try:
-            logger.info(f"Parsing state rows")
+            logger.debug("Parsing state rows")
             return {
                 "prosecuting attorney": state_rows[3][2],
                 "prosectuing attorney phone number": state_rows[3][3],
             }
         except Exception as e:
             logger.info(f"Error parsing state rows: {e}")
+            if self.raise_section_errors:
+                raise
             return {
                 "prosecuting attorney": "Unknown",
                 "prosectuing attorney phone number": "Unknown",
@@ -167,7 +227,7 @@ class ParserHays:
         
     def get_charge_information(self, table: BeautifulSoup, logger) -> List[Dict]:
         try:
-            logger.info(f"Getting charge information")
+            logger.debug("Getting charge information")
             table_rows = [
                 tag.strip().replace("\xa0", " ")
                 for tag in table.find_all(text=True)
@@ -188,11 +248,13 @@ class ParserHays:
             return charge_information
         except Exception as e:
             logger.info(f"Error getting charge information: {e}")
+            if self.raise_section_errors:
+                raise
             return []
         
     def format_events_and_orders_of_the_court(self, table: BeautifulSoup, case_soup: BeautifulSoup, logger) -> List:
         try:
-            logger.info(f"Formatting events and orders of the court")
+            logger.debug("Formatting events and orders of the court")
             table_rows = [
                 [
                     tag.strip().replace("\xa0", " ")
@@ -211,8 +273,12 @@ class ParserHays:
             disposition_rows = []
             other_event_rows = []
 
-            SECTION = "event"
+            # Rows start a section at the first Disposition row, or at the other events heading.
+            SECTION = None
             for row in table_rows:
+                if row == [OTHER_EVENTS_HEADING]:
+                    SECTION = "event"
+                    continue
                 if len(row) >= 4:
                     if row[1] in ["Disposition", "Disposition:"]:
                         SECTION = "disposition"
@@ -228,12 +294,14 @@ class ParserHays:
             return (disposition_rows, other_event_rows)
         except Exception as e:
             logger.info(f"Error formatting events and orders of the court: {e}")
+            if self.raise_section_errors:
+                raise
             return ([], [])
         
     def get_disposition_information(self, row, dispositions, case_data, table, county, case_soup, logger) -> List[Dict]:
         try:
             if not row:
-                logger.info(f"No dispositions to process.")
+                logger.debug("No dispositions to process.")
                 return dispositions 
             
             if len(row) >= 5:
@@ -251,7 +319,7 @@ class ParserHays:
                 }
 
                 # Check if this row is a disposition
-                if row[1].lower() in ["disposition", "amended disposition", "deferred adjudication", "punishment hearing"]:
+                if row[1].lower() in DISPOSITION_EVENTS:
                     details = {
                         "charge": row[3],
                         "outcome": row[4]
@@ -262,15 +330,67 @@ class ParserHays:
                     dispositions.append(disposition)
                     dispositions.reverse()
                 else:
-                    logger.info("Row is not a disposition: %s", row)
+                    logger.debug("Row is not a disposition: %s", row)
 
             return dispositions
         except Exception as e:
             logger.info(f"Error getting disposition information: {e}")
+            if self.raise_section_errors:
+                raise
             return dispositions
         
-    def parser_hays(self, county: str, case_number: str, logger, case_soup: BeautifulSoup) -> Dict[str, Dict]:
+    def get_table_kind(self, table_text: str) -> Optional[str]:
+        if "Case Type:" in table_text and "Date Filed:" in table_text:
+            return "Case Details"
+        elif "Related Case Information" in table_text:
+            return "Related Cases"
+        elif "Party Information" in table_text:
+            return "Party Information"
+        elif "Charge Information" in table_text:
+            return "Charge Information"
+        elif "Events & Orders of the Court" in table_text:
+            return "Events & Orders of the Court"
+        return None
+
+    def get_needed_sections(self, sections: Iterable[str]) -> set:
+        """The sections that have to be parsed to produce the requested sections or "Section.field"s."""
+        needed = set()
+        for section in sections:
+            section_name = section.split(".")[0]
+            if section_name not in SECTIONS:
+                raise ValueError(f"Unknown section: {section_name}")
+            needed.add(section_name)
+            needed.update(SECTION_DEPENDENCIES.get(section_name, []))
+        return needed
+
+    def parser_hays_metadata(self, county: str, case_number: str, logger, case_html: TextIO) -> Dict[str, Dict]:
+        """
+        Case Metadata only, without building a soup. The HTML is read from the text
+        stream in chunks and the scan stops as soon as the case code has been seen.
+        """
+        scanner = CaseCodeScanner()
+        for chunk in iter(lambda: case_html.read(METADATA_CHUNK_SIZE), ""):
+            scanner.feed(chunk)
+            if scanner.code is not None:
+                break
+        if scanner.code is None:
+            logger.info(f"Error getting case metadata: no case code found for {case_number}")
+        return {
+            "Case Metadata": {
+                "code": scanner.code if scanner.code is not None else "Unknown",
+                "odyssey id": case_number,
+                "county": county
+            }
+        }
+
+    def parser_hays(self, county: str, case_number: str, logger, case_soup: BeautifulSoup, sections: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        """
+        sections limits parsing to those output sections (or "Section.field"s) plus
+        Case Metadata: only the matching root tables are parsed, and only with the
+        handlers those sections need.
+        """
         try:
+            needed = self.get_needed_sections(sections) if sections is not None else set(SECTIONS)
             root_tables = case_soup.select("body>table")
 
             case_data = {
@@ -278,35 +398,51 @@ class ParserHays:
             }
 
             for table in root_tables:
+                table_kind = self.get_table_kind(table.text)
+                if table_kind is None or needed.isdisjoint(TABLE_SECTIONS[table_kind]):
+                    continue
 
-                if "Case Type:" in table.text and "Date Filed:" in table.text:
+                if table_kind == "Case Details":
                     case_data["Case Details"] = self.get_case_details(table, logger)
 
-                elif "Related Case Information" in table.text:
+                elif table_kind == "Related Cases":
                     case_data["Related Cases"] = [
                         case.text.strip().replace("\xa0", " ") for case in table.select("td")]
 
-                elif "Party Information" in table.text:
-                    case_data["Defendent Information"] = self.parse_defendant_rows(self.extract_rows(table, logger), logger)
-                    case_data["State Information"] = self.parse_state_rows(self.extract_rows(table, logger), logger)
+                elif table_kind == "Party Information":
+                    if "Defendent Information" in needed:
+                        case_data["Defendent Information"] = self.parse_defendant_rows(self.extract_rows(table, logger), logger)
+                    if "State Information" in needed:
+                        case_data["State Information"] = self.parse_state_rows(self.extract_rows(table, logger), logger)
 
-                elif "Charge Information" in table.text:
+                elif table_kind == "Charge Information":
                     case_data["Charge Information"] = self.get_charge_information(table, logger)
 
-                elif "Events & Orders of the Court" in table.text:
+                elif table_kind == "Events & Orders of the Court":
                     disposition_rows, other_event_rows = self.format_events_and_orders_of_the_court(table, case_soup, logger)
 
+                    if "Other Events and Hearings" in needed:
+                        # The rows under the other events heading, oldest first; undated rows go last.
+                        case_data["Other Events and Hearings"] = sorted(
+                            other_event_rows[::-1], key=lambda row: parse_date(row[0]) or date.max
+                        )
+
+                    if "Disposition Information" not in needed:
+                        continue
                     dispositions = []
-                    logger.info(f"For Loop started\nGetting disposition information")
+                    logger.debug("For Loop started\nGetting disposition information")
                     for row in disposition_rows:
                         case_data["Disposition Information"] = self.get_disposition_information(row, dispositions, case_data, table, county, case_soup, logger)
-                    logger.info(f"For Loop ended\n")
-                    if case_data["Disposition Information"]:
+                    logger.debug("For Loop ended\n")
+                    if case_data.get("Disposition Information"):
                         case_data["Top Charge"] = self.get_top_charge(dispositions, case_data.get("Charge Information", []), logger)
 
                         case_data["Dismissed Charges Count"] = self.count_dismissed_charges(case_data["Disposition Information"], logger)
-                    
+
+            if sections is not None:
+                return select_fields(case_data, sections)
             return case_data
         except Exception as e:
             logger.info(f"Error parsing Hays case: {e}")
-            return {}
+            # Re-raise so the case lands in the error ledger instead of being written out empty.
+            raise
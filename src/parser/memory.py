@@ -0,0 +1,92 @@
+"""
+Memory tracking for long Parser.parse runs.
+
+MemoryMonitor logs the process RSS every `check_every` cases. With tracing on
+it also takes a tracemalloc snapshot at each check and logs the allocation
+sites that grew the most since the first one, which is where a leak shows up,
+and can report the largest allocation sites at the end of the run.
+"""
+import os
+import sys
+import tracemalloc
+from typing import List, Optional
+
+# Allocations made by the tracing machinery itself aren't interesting.
+TRACE_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def get_rss_mb() -> float:
+    """Current resident set size of this process in MB."""
+    try:
+        with open("/proc/self/statm", "r") as file_handle:
+            resident_pages = int(file_handle.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / 1024**2
+    except (OSError, ValueError):
+        # No procfs (e.g. macOS), fall back to the peak RSS.
+        import resource
+
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kB on Linux, bytes on macOS
+        return max_rss / 1024**2 if sys.platform == "darwin" else max_rss / 1024
+
+
+class MemoryMonitor:
+    def __init__(self, check_every: int = 1000, trace: bool = False, top_n: int = 10):
+        self.check_every = check_every
+        self.trace = trace
+        self.top_n = top_n
+        self.case_count = 0
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+        self.started_tracing = False
+
+    def start(self) -> None:
+        if self.trace:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.started_tracing = True
+            self.baseline = self.take_snapshot()
+
+    def stop(self) -> None:
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+    def take_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+
+    def case_done(self, logger) -> None:
+        self.case_count += 1
+        if self.check_every and self.case_count % self.check_every == 0:
+            self.check(logger)
+
+    def check(self, logger) -> None:
+        message = f"Memory after {self.case_count} cases: RSS {get_rss_mb():.1f} MB"
+        if self.trace and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            message += f", traced {current / 1024**2:.1f} MB (peak {peak / 1024**2:.1f} MB)"
+            growth = self.take_snapshot().compare_to(self.baseline, "lineno")[: self.top_n]
+            message += "\nLargest growth since the start of the run:\n" + "\n".join(
+                str(stat) for stat in growth if stat.size_diff > 0
+            )
+        logger.info(message)
+
+    def report(self) -> List[str]:
+        """The largest allocation sites still alive, one line each. Empty if not tracing."""
+        if not (self.trace and tracemalloc.is_tracing()):
+            return []
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [
+            f"Cases: {self.case_count}",
+            f"RSS: {get_rss_mb():.1f} MB",
+            f"Traced: {current / 1024**2:.1f} MB (peak {peak / 1024**2:.1f} MB)",
+            f"Top {self.top_n} allocation sites:",
+        ]
+        lines += [
+            str(stat) for stat in self.take_snapshot().statistics("lineno")[: self.top_n]
+        ]
+        return lines
@@ -0,0 +1,135 @@
+"""
+In-process handoff from the scraper to the parser.
+
+The scraper still writes every page to case_html, which stays the archive a
+later parse can start over from, but it also submits the page's bytes to a
+ParsePipeline. The pipeline parses them on a background thread (or in worker
+processes) while the scraper waits on the network for the next page, so the
+JSON is written without listing or re-reading case_html.
+
+submit() blocks once queue_size pages are waiting, so a scraper faster than
+the parser holds a bounded number of pages in memory instead of all of them.
+"""
+import logging
+import queue
+import threading
+from typing import Callable, Iterator, Tuple
+
+from . import Parser, init_parse_worker, parse_case_in_worker
+from .timing import StageTimer
+from .workers import RecyclingPool
+
+
+class ParsePipeline:
+    def __init__(
+        self,
+        parser: Parser,
+        county: str,
+        workers: int = 1,
+        queue_size: int = 64,
+        log_level: int = logging.INFO,
+        use_spec: bool = False,
+    ):
+        self.parser = parser
+        self.county = county.lower()
+        self.workers = workers
+        self.log_level = log_level
+        self.use_spec = use_spec
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.run_counts = {"parsed": 0, "skipped": 0, "failed": 0}
+        self.thread = None
+        self.error = None
+
+    def __enter__(self) -> "ParsePipeline":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def start(self) -> "ParsePipeline":
+        self.logger = self.parser.configure_logger(self.log_level)
+        _, self.case_json_path = self.parser.get_directories(self.county, self.logger)
+        self.timer = StageTimer()
+        self.parser_function = self.parser.get_instrumented_parser(
+            self.county, self.timer, self.logger, use_spec=self.use_spec
+        )
+        if self.parser_function is None:
+            raise ValueError(f"No parser found for {self.county} county")
+        self.failed_cases = set(self.parser.get_failed_cases(self.county, self.logger))
+        self.html_hash_manifest = self.parser.load_html_hash_manifest(self.county, self.logger)
+        self.thread = threading.Thread(target=self.run, name="parse-pipeline", daemon=True)
+        self.thread.start()
+        return self
+
+    def submit(self, case_number: str, case_html: bytes) -> None:
+        """Queues a fetched page for parsing, waiting while the queue is full."""
+        while True:
+            if not self.thread.is_alive():
+                raise RuntimeError("Parse pipeline has stopped") from self.error
+            try:
+                self.queue.put((case_number, case_html), timeout=1)
+                return
+            except queue.Full:
+                continue
+
+    def close(self) -> dict:
+        """Waits for the queued pages to be parsed and returns the run counts."""
+        if self.thread.is_alive():
+            self.queue.put(None)
+        self.thread.join()
+        self.parser.write_html_hash_manifest(self.county, self.html_hash_manifest, self.logger)
+        self.logger.setLevel(self.log_level)
+        self.logger.info("Parse timings by stage:\n" + "\n".join(self.timer.summary()))
+        self.logger.info(
+            f"Pipeline parsed {self.run_counts['parsed']} cases, {self.run_counts['failed']} failed"
+        )
+        if self.error is not None:
+            raise RuntimeError("Parse pipeline failed") from self.error
+        return self.run_counts
+
+    def get_case_sources(self) -> Iterator[Tuple[str, Callable[[], bytes]]]:
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            case_number, case_html = item
+            yield case_number, (lambda case_html=case_html: case_html)
+
+    def run(self) -> None:
+        try:
+            # every submitted page is freshly scraped, so nothing is skipped as unchanged
+            tasks = self.parser.get_parse_tasks(
+                self.get_case_sources(), False, {}, (), self.run_counts, self.logger
+            )
+            if self.workers > 1:
+                self.logger.info(f"Starting {self.workers} parser workers")
+                pool = RecyclingPool(
+                    self.workers,
+                    initializer=init_parse_worker,
+                    initargs=(self.county, False, self.log_level, 0.0, False, 0, False, self.use_spec),
+                    logger=self.logger,
+                )
+                results = pool.imap_unordered(parse_case_in_worker, tasks)
+            else:
+                results = (
+                    self.parser.parse_case(
+                        self.county, task, self.parser_function, self.timer, self.logger, self.log_level
+                    )
+                    for task in tasks
+                )
+            for result in results:
+                self.parser.record_parse_result(
+                    self.county,
+                    result,
+                    self.case_json_path,
+                    None,
+                    None,
+                    self.html_hash_manifest,
+                    self.failed_cases,
+                    self.run_counts,
+                    self.timer,
+                    self.logger,
+                )
+        except Exception as e:
+            self.logger.exception("Parse pipeline stopped")
+            self.error = e
@@ -0,0 +1,59 @@
+"""
+Section helpers shared by the hand-written county parsers and the spec parser:
+the sections computed from other sections (the top charge, outcome counts) and
+trimming parsed case data down to the requested sections and fields.
+"""
+from typing import Dict, Iterable, List, Optional
+
+
+def get_charge_severity(charge_level: str, severity: Dict[str, int]) -> float:
+    """The rank of the first severity level named in charge_level, lower is more severe."""
+    for level_name, rank in severity.items():
+        if level_name in charge_level:
+            return rank
+    return float("inf")
+
+
+def top_charge(dispositions: List[Dict], charges: List[Dict], severity: Dict[str, int]) -> Optional[Dict]:
+    """The most severe disposed charge, with its level looked up in the charge list."""
+    charge_map = {charge["charges"]: charge["level"] for charge in charges}
+    result = None
+    min_severity = float("inf")
+    for disposition in dispositions:
+        if not isinstance(disposition, dict):
+            continue
+        for detail in disposition.get("details", []):
+            if not isinstance(detail, dict):
+                continue
+            charge_text = detail.get("charge", "").strip()
+            charge_name = charge_text.split(" >=")[0].strip().lstrip("0123456789. ").strip()
+            charge_level = charge_map.get(charge_name, "Unknown")
+            charge_severity = get_charge_severity(charge_level, severity)
+            if charge_severity < min_severity:
+                min_severity = charge_severity
+                result = {"charge name": charge_name, "charge level": charge_level}
+    return result
+
+
+def count_outcome(dispositions: List[Dict], outcome: str) -> int:
+    return sum(
+        1
+        for disposition in dispositions
+        for detail in disposition.get("details", [])
+        if detail.get("outcome", "").lower() == outcome
+    )
+
+
+def select_fields(case_data: Dict, sections: Iterable[str]) -> Dict:
+    """Trims case data down to the requested sections and "Section.field"s. Case Metadata is always kept."""
+    selected = {"Case Metadata": case_data["Case Metadata"]}
+    for section in sections:
+        section_name, _, field = section.partition(".")
+        if section_name not in case_data or section_name == "Case Metadata":
+            continue
+        if not field:
+            selected[section_name] = case_data[section_name]
+        elif isinstance(case_data[section_name], dict) and field in case_data[section_name]:
+            if selected.get(section_name) is not case_data[section_name]:
+                selected.setdefault(section_name, {})[field] = case_data[section_name][field]
+    return selected
@@ -0,0 +1,147 @@
+"""
+JSON Lines shard storage for parsed cases.
+
+Instead of one pretty-printed file per case, cases are appended as compact
+JSON records to rotating shard files (part-00000.jsonl, part-00001.jsonl, ...).
+When compression is on, every record is written as its own gzip member, so a
+shard is still a valid .jsonl.gz file for zcat/gzip tools while any single
+record can be decompressed on its own.
+
+index.csv maps each case number to the shard, byte offset and byte length of
+its record. The index is append-only: if a case is parsed again, the newer row
+wins when the index is loaded.
+"""
+import csv
+import gzip
+import json
+import os
+from typing import Dict, Iterator, Optional, Tuple
+
+INDEX_FILE_NAME = "index.csv"
+INDEX_FIELDS = ["case_number", "shard", "offset", "length"]
+
+
+def get_shard_name(shard_number: int, compress: bool) -> str:
+    return f"part-{shard_number:05d}.jsonl" + (".gz" if compress else "")
+
+
+def load_shard_index(shard_dir: str) -> Dict[str, Tuple[str, int, int]]:
+    """Returns {case_number: (shard file name, offset, length)}, latest entry wins."""
+    index = {}
+    index_path = os.path.join(shard_dir, INDEX_FILE_NAME)
+    if not os.path.exists(index_path):
+        return index
+    with open(index_path, "r", newline="") as file_handle:
+        for row in csv.DictReader(file_handle):
+            index[row["case_number"]] = (
+                row["shard"],
+                int(row["offset"]),
+                int(row["length"]),
+            )
+    return index
+
+
+def decode_record(shard_name: str, record: bytes) -> dict:
+    if shard_name.endswith(".gz"):
+        record = gzip.decompress(record)
+    return json.loads(record)
+
+
+def read_case_from_shards(
+    shard_dir: str, case_number: str, index: Optional[dict] = None
+) -> Optional[dict]:
+    """Fetches a single case by seeking straight to its record. Returns None if unknown."""
+    index = index if index is not None else load_shard_index(shard_dir)
+    if case_number not in index:
+        return None
+    shard_name, offset, length = index[case_number]
+    with open(os.path.join(shard_dir, shard_name), "rb") as file_handle:
+        file_handle.seek(offset)
+        return decode_record(shard_name, file_handle.read(length))
+
+
+def iter_shard_records(shard_dir: str) -> Iterator[Tuple[str, dict]]:
+    """
+    Streams (case_number, case_data) for the latest version of every case in the shards.
+
+    Records are read shard by shard in file order, so each shard is read sequentially once.
+    """
+    records_by_shard = {}
+    for case_number, (shard_name, offset, length) in load_shard_index(shard_dir).items():
+        records_by_shard.setdefault(shard_name, []).append((offset, length, case_number))
+
+    for shard_name in sorted(records_by_shard):
+        with open(os.path.join(shard_dir, shard_name), "rb") as file_handle:
+            for offset, length, case_number in sorted(records_by_shard[shard_name]):
+                file_handle.seek(offset)
+                yield case_number, decode_record(shard_name, file_handle.read(length))
+
+
+class ShardWriter:
+    """Appends parsed cases to rotating JSONL shards and records each one in the index."""
+
+    def __init__(
+        self,
+        shard_dir: str,
+        max_records_per_shard: int = 10000,
+        compress: bool = True,
+    ):
+        self.shard_dir = shard_dir
+        self.max_records_per_shard = max_records_per_shard
+        self.compress = compress
+        os.makedirs(shard_dir, exist_ok=True)
+
+        # Each run starts a fresh shard after whatever is already on disk.
+        existing_shards = [
+            int(file_name.split("-")[1].split(".")[0])
+            for file_name in os.listdir(shard_dir)
+            if file_name.startswith("part-")
+        ]
+        self.shard_number = max(existing_shards) + 1 if existing_shards else 0
+        self.shard_handle = None
+        self.records_in_shard = 0
+
+        index_path = os.path.join(shard_dir, INDEX_FILE_NAME)
+        write_header = not os.path.exists(index_path)
+        self.index_handle = open(index_path, "a", newline="")
+        self.index_writer = csv.writer(self.index_handle)
+        if write_header:
+            self.index_writer.writerow(INDEX_FIELDS)
+
+    def open_next_shard(self) -> None:
+        if self.shard_handle is not None:
+            self.shard_handle.close()
+            self.shard_number += 1
+        self.shard_name = get_shard_name(self.shard_number, self.compress)
+        self.shard_handle = open(os.path.join(self.shard_dir, self.shard_name), "ab")
+        self.records_in_shard = 0
+
+    def write(self, case_number: str, case_data: dict) -> None:
+        if self.shard_handle is None or self.records_in_shard >= self.max_records_per_shard:
+            self.open_next_shard()
+
+        record = (json.dumps(case_data, separators=(",", ":")) + "\n").encode("utf-8")
+        if self.compress:
+            record = gzip.compress(record, mtime=0)
+
+        offset = self.shard_handle.tell()
+        self.shard_handle.write(record)
+        self.records_in_shard += 1
+        self.index_writer.writerow([case_number, self.shard_name, offset, len(record)])
+
+    def flush(self) -> None:
+        if self.shard_handle is not None:
+            self.shard_handle.flush()
+        self.index_handle.flush()
+
+    def close(self) -> None:
+        if self.shard_handle is not None:
+            self.shard_handle.close()
+            self.shard_handle = None
+        self.index_handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,426 @@
+"""
+Declarative extraction specs for county parsers.
+
+A county without a hand-written Parser<County> class can be parsed from a JSON
+spec in resources/parser_specs/<county>.json. compile_spec turns the spec into
+precompiled CSS selectors and plain closures once, and SpecParser applies them
+to every case soup. resources/parser_specs/hays.json reproduces ParserHays.
+
+Spec layout:
+
+    county        county name
+    default       value for fields that can't be read, e.g. "Unknown"
+    metadata      {field: {"select": css, "index": n}}, read from the whole page into
+                  "Case Metadata" ahead of "odyssey id" and "county"
+    root_tables   css selector for the tables to classify, e.g. "body>table"
+    tables        list of table specs; the first whose "match" strings all occur
+                  in a root table's text handles it
+        extract     how the table is turned into text, see compile_extractor
+        groups      optional, splits extracted rows into named groups, see compile_grouper
+        sections    {output section: section spec}, see compile_section
+    derived       sections computed from other sections by a function in
+                  DERIVE_FUNCTIONS, see compile_derived
+
+Cells and rows are addressed by position: a field spec is an index, a
+[row, cell] pair, or a dict with "cell", "cells" (joined with "join") or
+"cells_from" plus optional "split"/"part", "prefix"/"trim_end" and "strip".
+A "fields" section falls back to the default for every field if any one of
+them can't be read, like the hand-written handlers do.
+"""
+import json
+import os
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional
+
+import soupsieve
+from bs4 import BeautifulSoup
+
+from .dates import parse_date
+from .sections import count_outcome, select_fields, top_charge
+
+# Returned by a section reader when the section shouldn't be set at all.
+MISSING = object()
+
+SPEC_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "resources", "parser_specs"
+)
+
+
+def get_spec_path(county: str) -> str:
+    return os.path.join(SPEC_DIR, f"{county}.json")
+
+
+def load_spec(county: str) -> Optional[dict]:
+    """The county's extraction spec, or None if it doesn't have one."""
+    try:
+        with open(get_spec_path(county), "r", encoding="utf-8") as file_handle:
+            return json.load(file_handle)
+    except FileNotFoundError:
+        return None
+
+
+DERIVE_FUNCTIONS = {
+    "top_charge": top_charge,
+    "count_outcome": count_outcome,
+}
+
+
+def compile_text_cleaner(extract_spec: dict) -> Callable[[str], str]:
+    replacements = [tuple(pair) for pair in extract_spec.get("replace", [])]
+    strip = extract_spec.get("strip", True)
+    collapse_whitespace = extract_spec.get("collapse_whitespace", False)
+
+    def clean(text: str) -> str:
+        if strip:
+            text = text.strip()
+        for old, new in replacements:
+            text = text.replace(old, new)
+        if collapse_whitespace:
+            text = " ".join(text.split())
+        return text
+
+    return clean
+
+
+def compile_extractor(extract_spec: dict) -> Callable:
+    """
+    Returns a function from a table to its text:
+
+    "elements"  the text of each element matched by "select" (not stripped unless "strip")
+    "strings"   every non-blank text node in the table, flat
+    "rows"      the non-blank text nodes of each "select" row, skipping rows without
+                a "require" element and rows with no text
+    """
+    mode = extract_spec["mode"]
+    if mode == "elements":
+        pattern = soupsieve.compile(extract_spec["select"])
+        clean = compile_text_cleaner({"strip": False, **extract_spec})
+        return lambda table: [clean(element.text) for element in pattern.select(table)]
+
+    clean = compile_text_cleaner(extract_spec)
+    if mode == "strings":
+        return lambda table: [clean(text) for text in table.find_all(string=True) if text.strip()]
+    if mode == "rows":
+        pattern = soupsieve.compile(extract_spec["select"])
+        required = soupsieve.compile(extract_spec["require"]) if "require" in extract_spec else None
+
+        def extract_rows(table) -> List[List[str]]:
+            rows = []
+            for tr in pattern.select(table):
+                if required is not None and not required.select_one(tr):
+                    continue
+                row = [clean(text) for text in tr.find_all(string=True) if text.strip()]
+                if row:
+                    rows.append(row)
+            return rows
+
+        return extract_rows
+    raise ValueError(f"Unknown extract mode: {mode}")
+
+
+def compile_condition(condition: Optional[dict]) -> Callable[[List[str]], bool]:
+    if not condition:
+        return lambda row: True
+    min_cells = condition.get("min_cells", 0)
+    cell = condition.get("cell")
+    values = set(condition["in"]) if "in" in condition else None
+    lower_values = set(condition["lower_in"]) if "lower_in" in condition else None
+
+    def matches(row: List[str]) -> bool:
+        if len(row) < min_cells:
+            return False
+        if values is not None and row[cell] not in values:
+            return False
+        if lower_values is not None and row[cell].lower() not in lower_values:
+            return False
+        return True
+
+    return matches
+
+
+def compile_grouper(groups_spec: dict) -> Callable[[List[List[str]]], Dict[str, List[List[str]]]]:
+    """
+    Splits rows into groups in document order: rows start in "start" (or in no group
+    if it is null) and every row matching a "switch" condition moves it and the rows
+    after it to that rule's "to" group. A single-cell row that is one of "headings"
+    moves the rows after it to the heading's group and is dropped itself. Rows with
+    fewer than "min_cells" cells are dropped, as are rows in no group.
+    """
+    names = groups_spec["names"]
+    start = groups_spec["start"]
+    min_cells = groups_spec.get("min_cells", 0)
+    switches = [(compile_condition(rule), rule["to"]) for rule in groups_spec.get("switch", [])]
+    headings = groups_spec.get("headings", {})
+
+    def group_rows(rows: List[List[str]]) -> Dict[str, List[List[str]]]:
+        groups = {name: [] for name in names}
+        current = start
+        for row in rows:
+            if len(row) == 1 and row[0] in headings:
+                current = headings[row[0]]
+                continue
+            if len(row) < min_cells:
+                continue
+            for matches, group_name in switches:
+                if matches(row):
+                    current = group_name
+            if current is not None:
+                groups[current].append(row)
+        return groups
+
+    return group_rows
+
+
+def compile_cell_ref(ref) -> Callable:
+    if isinstance(ref, int):
+        return lambda rows: rows[ref]
+    row_index, cell_index = ref
+    return lambda rows: rows[row_index][cell_index]
+
+
+def compile_field(field_spec) -> Callable:
+    if not isinstance(field_spec, dict):
+        return compile_cell_ref(field_spec)
+
+    if "cells" in field_spec:
+        getters = [compile_cell_ref(ref) for ref in field_spec["cells"]]
+        separator = field_spec.get("join", " ")
+        get_value = lambda rows: separator.join(getter(rows) for getter in getters)
+    elif "cells_from" in field_spec:
+        start = field_spec["cells_from"]
+        get_value = lambda row: row[start:]
+    else:
+        get_value = compile_cell_ref(field_spec["cell"])
+
+    split = field_spec.get("split")
+    part = field_spec.get("part", 0)
+    prefix = field_spec.get("prefix")
+    trim_end = field_spec.get("trim_end", 0)
+    strip = field_spec.get("strip", False)
+    default = field_spec.get("default")
+
+    def read_field(rows):
+        value = get_value(rows)
+        if prefix is not None:
+            if not (len(value) > len(prefix) and value.startswith(prefix)):
+                return default
+            value = value[len(prefix) : len(value) - trim_end]
+        if split is not None:
+            value = value.split(split)[part]
+        if strip:
+            value = value.strip()
+        return value
+
+    return read_field
+
+
+def compile_record(record_spec: dict) -> Callable[[List[str]], dict]:
+    """A record is a dict of fields read from one row; a list value holds nested records."""
+    builders = []
+    for key, value_spec in record_spec.items():
+        if isinstance(value_spec, list) and all(isinstance(nested_spec, dict) for nested_spec in value_spec):
+            nested = [compile_record(nested_spec) for nested_spec in value_spec]
+            builders.append((key, lambda row, nested=nested: [build(row) for build in nested], False))
+        else:
+            omit_if_empty = isinstance(value_spec, dict) and value_spec.get("omit_if_empty", False)
+            builders.append((key, compile_field(value_spec), omit_if_empty))
+
+    def build_record(row: List[str]) -> dict:
+        record = {}
+        for key, build, omit_if_empty in builders:
+            value = build(row)
+            if omit_if_empty and not value:
+                continue
+            record[key] = value
+        return record
+
+    return build_record
+
+
+def compile_section(section_spec: dict, default) -> Callable:
+    """
+    Returns a function from (extracted text, groups) to the section's value, or to
+    MISSING when the section shouldn't be set at all.
+
+    {"fields": {...}}   a dict of fields read from the extracted rows
+    {"list": true}      the extracted text as is
+    {"records": {...}}  dicts of "keys" zipped with a flat list, one every "stride" items
+                        from "start", skipping "offset" items
+    {"rows_from": [...]} the rows of the named groups, optionally filtered by "include"
+                        and "exclude", taken in "order" ("reversed", or "date" to sort by
+                        the MM/DD/YYYY date in "date_cell", undated rows last) and built
+                        into "record"s
+    """
+    if "fields" in section_spec:
+        fields = {key: compile_field(field_spec) for key, field_spec in section_spec["fields"].items()}
+
+        def read_fields(extracted, groups):
+            try:
+                return {key: read_field(extracted) for key, read_field in fields.items()}
+            except Exception:
+                return {key: default for key in fields}
+
+        return read_fields
+
+    if section_spec.get("list"):
+        return lambda extracted, groups: list(extracted)
+
+    if "records" in section_spec:
+        records_spec = section_spec["records"]
+        keys = records_spec["keys"]
+        start = records_spec.get("start", 0)
+        stride = records_spec.get("stride", len(keys))
+        offset = records_spec.get("offset", 0)
+        return lambda extracted, groups: [
+            dict(zip(keys, extracted[i + offset : i + offset + len(keys)]))
+            for i in range(start, len(extracted), stride)
+        ]
+
+    if "rows_from" in section_spec:
+        group_names = section_spec["rows_from"]
+        include = compile_condition(section_spec.get("include"))
+        exclude = compile_condition(section_spec["exclude"]) if "exclude" in section_spec else None
+        reverse = section_spec.get("order") == "reversed"
+        date_cell = section_spec.get("date_cell", 0) if section_spec.get("order") == "date" else None
+        build_record = compile_record(section_spec["record"]) if "record" in section_spec else None
+        reverse_after_append = section_spec.get("reverse_after_append", False)
+        skip_if_no_rows = section_spec.get("skip_if_no_rows", False)
+
+        def read_rows(extracted, groups):
+            rows = [row for group_name in group_names for row in groups[group_name]]
+            if skip_if_no_rows and not rows:
+                return MISSING
+            if reverse:
+                rows = rows[::-1]
+            elif date_cell is not None:
+                rows = sorted(rows, key=lambda row: parse_date(row[date_cell]) or date.max)
+            values = []
+            for row in rows:
+                if not include(row) or (exclude is not None and exclude(row)):
+                    continue
+                if build_record is None:
+                    values.append(row)
+                    continue
+                try:
+                    values.append(build_record(row))
+                except Exception:
+                    continue
+                if reverse_after_append:
+                    # Reproduces ParserHays.get_disposition_information's ordering.
+                    values.reverse()
+            return values
+
+        return read_rows
+
+    raise ValueError(f"Unknown section spec: {section_spec}")
+
+
+def compile_derived(derived_spec: dict) -> Callable[[dict], object]:
+    function = DERIVE_FUNCTIONS[derived_spec["function"]]
+    inputs = derived_spec["inputs"]
+    params = derived_spec.get("params", {})
+    default = derived_spec.get("default")
+
+    def derive(case_data: dict):
+        try:
+            return function(*(case_data.get(name, []) for name in inputs), **params)
+        except Exception:
+            return default
+
+    return derive
+
+
+class CompiledTable:
+    def __init__(self, table_spec: dict, default):
+        self.match = table_spec["match"]
+        self.extract = compile_extractor(table_spec["extract"])
+        self.group_rows = compile_grouper(table_spec["groups"]) if "groups" in table_spec else None
+        self.sections = {
+            section_name: compile_section(section_spec, default)
+            for section_name, section_spec in table_spec["sections"].items()
+        }
+
+    def matches(self, table_text: str) -> bool:
+        return all(text in table_text for text in self.match)
+
+
+class CompiledSpec:
+    def __init__(self, spec: dict):
+        self.county = spec["county"]
+        self.default = spec.get("default", "Unknown")
+        self.metadata = {
+            field: (soupsieve.compile(field_spec["select"]), field_spec.get("index", 0))
+            for field, field_spec in spec.get("metadata", {}).items()
+        }
+        self.root_tables = soupsieve.compile(spec["root_tables"])
+        self.tables = [CompiledTable(table_spec, self.default) for table_spec in spec["tables"]]
+        self.derived = []
+        for derived_spec in spec.get("derived", []):
+            self.derived.append(
+                (derived_spec["section"], derived_spec.get("when"), derived_spec["inputs"], compile_derived(derived_spec))
+            )
+        self.sections = ["Case Metadata"] + [
+            section_name for table in self.tables for section_name in table.sections
+        ] + [section_name for section_name, _, _, _ in self.derived]
+
+
+def compile_spec(spec: dict) -> CompiledSpec:
+    return CompiledSpec(spec)
+
+
+class SpecParser:
+    """County parser driven by a compiled extraction spec instead of a hand-written class."""
+
+    def __init__(self, spec: dict):
+        self.compiled = compile_spec(spec)
+
+    def get_needed_sections(self, sections: Iterable[str]) -> set:
+        dependencies = {section_name: inputs for section_name, _, inputs, _ in self.compiled.derived}
+        needed = set()
+        for section in sections:
+            section_name = section.split(".")[0]
+            if section_name not in self.compiled.sections:
+                raise ValueError(f"Unknown section: {section_name}")
+            needed.add(section_name)
+            needed.update(dependencies.get(section_name, []))
+        return needed
+
+    def get_case_metadata(self, county: str, case_number: str, case_soup: BeautifulSoup, logger) -> Dict:
+        metadata = {}
+        try:
+            for field, (pattern, index) in self.compiled.metadata.items():
+                metadata[field] = pattern.select(case_soup)[index].text
+        except Exception as e:
+            logger.info(f"Error getting case metadata: {e}")
+            metadata = {field: self.compiled.default for field in self.compiled.metadata}
+        return {**metadata, "odyssey id": case_number, "county": county}
+
+    def parse_case(
+        self, county: str, case_number: str, logger, case_soup: BeautifulSoup, sections: Optional[Iterable[str]] = None
+    ) -> Dict:
+        needed = self.get_needed_sections(sections) if sections is not None else set(self.compiled.sections)
+        case_data = {"Case Metadata": self.get_case_metadata(county, case_number, case_soup, logger)}
+
+        for table in self.compiled.root_tables.select(case_soup):
+            table_text = table.text
+            compiled_table = next(
+                (compiled_table for compiled_table in self.compiled.tables if compiled_table.matches(table_text)),
+                None,
+            )
+            if compiled_table is None or needed.isdisjoint(compiled_table.sections):
+                continue
+            extracted = compiled_table.extract(table)
+            groups = compiled_table.group_rows(extracted) if compiled_table.group_rows is not None else {}
+            for section_name, read_section in compiled_table.sections.items():
+                if section_name in needed:
+                    value = read_section(extracted, groups)
+                    if value is not MISSING:
+                        case_data[section_name] = value
+
+        for section_name, when, _, derive in self.compiled.derived:
+            if section_name in needed and (when is None or case_data.get(when)):
+                case_data[section_name] = derive(case_data)
+
+        if sections is not None:
+            return select_fields(case_data, sections)
+        return case_data
@@ -0,0 +1,142 @@
+"""
+Per-case, per-stage timers for Parser.parse.
+
+Every case is timed as a whole and per stage (file read, hashing, soup
+construction, each county parser section handler, write). Times are kept in
+compact arrays per stage so a run over a large corpus stays cheap, and only
+the slowest cases are remembered by ID.
+"""
+import heapq
+import math
+from array import array
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+# ParserHays section handlers that get their own stage in the timing summary.
+SECTION_HANDLERS = [
+    "get_case_metadata",
+    "get_case_details",
+    "parse_defendant_rows",
+    "parse_state_rows",
+    "get_charge_information",
+    "format_events_and_orders_of_the_court",
+    "get_disposition_information",
+]
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class StageTimer:
+    def __init__(self, n_slowest: int = 5):
+        self.n_slowest = n_slowest
+        self.stage_times: Dict[str, array] = {}
+        self.case_times = array("d")
+        self.slowest_cases: List[tuple] = []
+        self.current_case: Optional[str] = None
+        self.current_stages: Dict[str, float] = {}
+        self.current_start = 0.0
+        self.failed_stage: Optional[str] = None
+
+    def start_case(self, case_number: str, stages: Optional[Dict[str, float]] = None) -> None:
+        self.current_case = case_number
+        self.current_stages = dict(stages) if stages else {}
+        self.failed_stage = None
+        self.current_start = perf_counter()
+
+    def finish_case(self) -> Tuple[float, Dict[str, float]]:
+        """Stops the current case and returns (elapsed seconds, stage seconds) without recording it."""
+        elapsed = perf_counter() - self.current_start
+        self.current_case = None
+        return elapsed, self.current_stages
+
+    def record_case(self, case_number: str, elapsed: float, stages: Dict[str, float]) -> None:
+        self.case_times.append(elapsed)
+        for stage_name, seconds in stages.items():
+            self.stage_times.setdefault(stage_name, array("d")).append(seconds)
+        # min-heap holding the n slowest cases seen so far
+        if len(self.slowest_cases) < self.n_slowest:
+            heapq.heappush(self.slowest_cases, (elapsed, case_number))
+        else:
+            heapq.heappushpop(self.slowest_cases, (elapsed, case_number))
+
+    def end_case(self) -> None:
+        if self.current_case is None:
+            return
+        case_number = self.current_case
+        elapsed, stages = self.finish_case()
+        self.record_case(case_number, elapsed, stages)
+
+    def cancel_case(self) -> None:
+        """Drops the current case's timings, e.g. when it is skipped."""
+        self.current_case = None
+
+    def mark_failed(self, stage_name: str) -> None:
+        # The innermost stage sees the exception first, so it's the one that sticks.
+        if self.failed_stage is None:
+            self.failed_stage = stage_name
+
+    def add(self, stage_name: str, seconds: float) -> None:
+        self.current_stages[stage_name] = self.current_stages.get(stage_name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, stage_name: str):
+        start = perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.mark_failed(stage_name)
+            raise
+        finally:
+            self.add(stage_name, perf_counter() - start)
+
+    def time_function(self, stage_name: str, function):
+        @wraps(function)
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            except BaseException:
+                self.mark_failed(stage_name)
+                raise
+            finally:
+                self.add(stage_name, perf_counter() - start)
+
+        return timed
+
+    def instrument(self, instance: object, method_names: List[str] = SECTION_HANDLERS) -> None:
+        """Replaces the named methods on a parser instance with timed wrappers."""
+        for method_name in method_names:
+            method = getattr(instance, method_name, None)
+            if method is not None:
+                setattr(instance, method_name, self.time_function(method_name, method))
+
+    def summary(self) -> List[str]:
+        lines = [
+            f"{'stage':<40}{'cases':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'total s':>10}"
+        ]
+        for stage_name, times in [("case total", self.case_times)] + list(self.stage_times.items()):
+            sorted_times = sorted(times)
+            lines.append(
+                f"{stage_name:<40}{len(sorted_times):>8}"
+                f"{percentile(sorted_times, 0.50) * 1000:>10.2f}"
+                f"{percentile(sorted_times, 0.95) * 1000:>10.2f}"
+                f"{(sorted_times[-1] if sorted_times else 0.0) * 1000:>10.2f}"
+                f"{sum(sorted_times):>10.2f}"
+            )
+        if self.slowest_cases:
+            lines.append(
+                "Slowest cases: "
+                + ", ".join(
+                    f"{case_number} ({seconds * 1000:.1f} ms)"
+                    for seconds, case_number in sorted(self.slowest_cases, reverse=True)
+                )
+            )
+        return lines
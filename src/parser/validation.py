@@ -0,0 +1,262 @@
+"""
+Corpus-wide validation of parsed cases against field_validation_list.json.
+
+Cases are streamed in batches. Each batch is flattened into one Arrow column
+per field (charge fields get one row per charge), and the checks run on whole
+columns with pyarrow.compute before being summed per county and parser
+version, so a run over the full corpus costs little more than reading it.
+
+For every field, the report gives the share of rows where it is missing (or
+null), "Unknown", shorter than its estimated_min_length, or of the wrong type.
+
+field_validation_list.json predates the current output layout, so a field is
+looked up in the sections that hold its logical level today (see
+LEVEL_SECTIONS), and renamed fields are mapped in FIELD_ALIASES.
+"""
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+FIELD_VALIDATION_LIST_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..",
+    "..",
+    "resources",
+    "test_files",
+    "field_validation_list.json",
+)
+
+# Where each logical level's fields live in the parser output, in lookup order.
+# None means the top level of the case itself.
+LEVEL_SECTIONS = {
+    "top": [None, "Case Metadata", "Case Details"],
+    "party": ["Defendent Information", "State Information"],
+}
+# Charge fields are checked once per entry in this list.
+CHARGE_SECTION = "Charge Information"
+
+FIELD_ALIASES = {
+    "party information": "Defendent Information",
+    "charge information": "Charge Information",
+    "prosecuting attorney phone number": "prosectuing attorney phone number",
+}
+
+CHECKS = ["missing", "unknown", "too_short", "wrong_type"]
+GROUP_COLUMNS = ["county", "parser_version"]
+
+
+class FieldRule(NamedTuple):
+    name: str
+    level: str
+    type: str
+    min_length: int
+    importance: str
+    key: str
+
+
+def load_field_rules(path: str = FIELD_VALIDATION_LIST_PATH) -> List[FieldRule]:
+    with open(path, "r") as file_handle:
+        return [
+            FieldRule(
+                name=field["name"],
+                level=field["logical_level"],
+                type=field["type"],
+                min_length=field.get("estimated_min_length", 0),
+                importance=field.get("importance", "low"),
+                key=FIELD_ALIASES.get(field["name"], field["name"]),
+            )
+            for field in json.load(file_handle)
+        ]
+
+
+def find_field(record: dict, sections: List[Optional[str]], key: str):
+    for section in sections:
+        container = record if section is None else record.get(section)
+        if isinstance(container, dict) and key in container:
+            return container[key]
+    return None
+
+
+def append_value(rule: FieldRule, value, values: list, wrong_types: list) -> None:
+    """Stores a string as is and an array as its length, so both can be checked as one column."""
+    if rule.type == "array":
+        # The party sections used to be an array and are now dicts, both count.
+        is_right_type = isinstance(value, (list, dict))
+        values.append(len(value) if is_right_type else None)
+    else:
+        is_right_type = isinstance(value, str)
+        values.append(value if is_right_type else None)
+    wrong_types.append(value is not None and not is_right_type)
+
+
+def flatten_batch(cases: List[dict], rules: List[FieldRule]) -> Tuple[pa.Table, pa.Table]:
+    """One table with a row per case and one with a row per charge, with a column per field."""
+    case_rules = [rule for rule in rules if rule.level != "charge"]
+    charge_rules = [rule for rule in rules if rule.level == "charge"]
+    case_columns = {column: [] for column in GROUP_COLUMNS}
+    charge_columns = {column: [] for column in GROUP_COLUMNS}
+    # Field columns are prefixed, the "county" field would clash with the county column.
+    for rule in case_rules:
+        case_columns[f"field:{rule.name}"], case_columns[f"wrong_type:{rule.name}"] = [], []
+    for rule in charge_rules:
+        charge_columns[f"field:{rule.name}"], charge_columns[f"wrong_type:{rule.name}"] = [], []
+
+    for case_data in cases:
+        metadata = case_data.get("Case Metadata") or {}
+        county = metadata.get("county") or "unknown"
+        parser_version = case_data.get("parser_version") or "unknown"
+        case_columns["county"].append(county)
+        case_columns["parser_version"].append(parser_version)
+        for rule in case_rules:
+            append_value(
+                rule,
+                find_field(case_data, LEVEL_SECTIONS.get(rule.level, [None]), rule.key),
+                case_columns[f"field:{rule.name}"],
+                case_columns[f"wrong_type:{rule.name}"],
+            )
+        charges = case_data.get(CHARGE_SECTION)
+        for charge in charges if isinstance(charges, list) else []:
+            charge = charge if isinstance(charge, dict) else {}
+            charge_columns["county"].append(county)
+            charge_columns["parser_version"].append(parser_version)
+            for rule in charge_rules:
+                append_value(
+                    rule,
+                    charge.get(rule.key),
+                    charge_columns[f"field:{rule.name}"],
+                    charge_columns[f"wrong_type:{rule.name}"],
+                )
+    return (
+        pa.table(case_columns, schema=get_schema(case_rules)),
+        pa.table(charge_columns, schema=get_schema(charge_rules)),
+    )
+
+
+def get_schema(rules: List[FieldRule]) -> pa.Schema:
+    # Explicit, so a field that is missing from a whole batch isn't typed as null.
+    fields = [(column, pa.string()) for column in GROUP_COLUMNS]
+    for rule in rules:
+        fields.append((f"field:{rule.name}", pa.int64() if rule.type == "array" else pa.string()))
+        fields.append((f"wrong_type:{rule.name}", pa.bool_()))
+    return pa.schema(fields)
+
+
+def check_table(table: pa.Table, rules: List[FieldRule]) -> pa.Table:
+    """Counts the rows failing each check per county and parser version."""
+    checks = {column: table[column] for column in GROUP_COLUMNS}
+    checks["rows"] = pa.array([1] * table.num_rows, pa.int64())
+    for rule in rules:
+        column = table[f"field:{rule.name}"]
+        wrong_type = table[f"wrong_type:{rule.name}"]
+        checks[f"{rule.name}:missing"] = pc.and_(pc.is_null(column), pc.invert(wrong_type))
+        if rule.type == "array":
+            length = column
+            checks[f"{rule.name}:unknown"] = pa.array([False] * table.num_rows)
+        else:
+            length = pc.utf8_length(column)
+            checks[f"{rule.name}:unknown"] = pc.fill_null(pc.equal(column, "Unknown"), False)
+        checks[f"{rule.name}:too_short"] = pc.fill_null(pc.less(length, rule.min_length), False)
+        checks[f"{rule.name}:wrong_type"] = wrong_type
+    checked = pa.table(
+        {
+            name: pc.cast(values, pa.int64()) if name not in GROUP_COLUMNS else values
+            for name, values in checks.items()
+        }
+    )
+    counts = checked.group_by(GROUP_COLUMNS).aggregate(
+        [(name, "sum") for name in checked.column_names if name not in GROUP_COLUMNS]
+    )
+    return counts.rename_columns(
+        [name[: -len("_sum")] if name.endswith("_sum") else name for name in counts.column_names]
+    )
+
+
+def iter_batches(cases: Iterable[dict], batch_size: int) -> Iterator[List[dict]]:
+    batch = []
+    for case_data in cases:
+        batch.append(case_data)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def sum_counts(count_tables: List[pa.Table]) -> List[dict]:
+    if not count_tables:
+        return []
+    combined = pa.concat_tables(count_tables).group_by(GROUP_COLUMNS)
+    names = [name for name in count_tables[0].column_names if name not in GROUP_COLUMNS]
+    totals = combined.aggregate([(name, "sum") for name in names])
+    return totals.rename_columns(
+        [name[: -len("_sum")] if name.endswith("_sum") else name for name in totals.column_names]
+    ).to_pylist()
+
+
+def validate_cases(
+    cases: Iterable[dict],
+    rules: Optional[List[FieldRule]] = None,
+    batch_size: int = 50000,
+) -> List[Dict]:
+    """
+    Streams parsed cases through the checks and returns one report row per county,
+    parser version and field, with the number of rows checked and the rate of each check.
+    """
+    rules = rules if rules is not None else load_field_rules()
+    case_rules = [rule for rule in rules if rule.level != "charge"]
+    charge_rules = [rule for rule in rules if rule.level == "charge"]
+    case_counts, charge_counts = [], []
+    for batch in iter_batches(cases, batch_size):
+        case_table, charge_table = flatten_batch(batch, rules)
+        case_counts.append(check_table(case_table, case_rules))
+        if charge_table.num_rows:
+            charge_counts.append(check_table(charge_table, charge_rules))
+
+    report = []
+    for level_rules, totals in [
+        (case_rules, sum_counts(case_counts)),
+        (charge_rules, sum_counts(charge_counts)),
+    ]:
+        for group in totals:
+            for rule in level_rules:
+                row = {
+                    "county": group["county"],
+                    "parser_version": group["parser_version"],
+                    "level": rule.level,
+                    "field": rule.name,
+                    "importance": rule.importance,
+                    "rows": group["rows"],
+                }
+                for check in CHECKS:
+                    row[f"{check}_rate"] = group[f"{rule.name}:{check}"] / group["rows"]
+                report.append(row)
+    return report
+
+
+def format_report(report: List[Dict]) -> List[str]:
+    lines = [
+        f"{'county':<12}{'version':<10}{'field':<36}{'importance':<12}{'rows':>10}"
+        + "".join(f"{check:>12}" for check in CHECKS)
+    ]
+    for row in report:
+        lines.append(
+            f"{row['county']:<12}{row['parser_version']:<10}{row['field']:<36}{row['importance']:<12}{row['rows']:>10}"
+            + "".join(f"{row[f'{check}_rate']:>12.2%}" for check in CHECKS)
+        )
+    return lines
+
+
+def get_gate_failures(
+    report: List[Dict], importance: Iterable[str] = ("necessary",), max_rate: float = 0.0
+) -> List[Dict]:
+    """Report rows for fields of the given importance where any check's rate is above max_rate."""
+    importance = set(importance)
+    return [
+        row
+        for row in report
+        if row["importance"] in importance
+        and any(row[f"{check}_rate"] > max_rate for check in CHECKS)
+    ]
@@ -0,0 +1,63 @@
+"""
+Polling for Parser.watch.
+
+A scraped page is ready once its size and modification time have stayed the
+same for settle_seconds. Any change before then restarts the clock, so a file
+that is still being written, or rewritten several times in a row, is handed
+over once, after the last write. Polling rather than inotify keeps this
+dependency free and working on network and container filesystems.
+"""
+import os
+from time import monotonic
+from typing import Dict, List, Optional, Tuple
+
+
+class DirectoryWatcher:
+    def __init__(
+        self,
+        path: str,
+        settle_seconds: float = 2.0,
+        suffix: str = ".html",
+        include_existing: bool = False,
+    ):
+        self.path = path
+        self.settle_seconds = settle_seconds
+        self.suffix = suffix
+        # name -> (signature, when that signature was first seen)
+        self.pending: Dict[str, Tuple[Tuple[int, int], float]] = {}
+        # name -> signature it was last handed over with
+        self.done: Dict[str, Tuple[int, int]] = {} if include_existing else self.scan()
+
+    def scan(self) -> Dict[str, Tuple[int, int]]:
+        """(size, mtime_ns) of every matching file in the directory."""
+        signatures = {}
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                if not entry.name.endswith(self.suffix):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                signatures[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return signatures
+
+    def poll(self, now: Optional[float] = None) -> List[str]:
+        """Names of the files that have settled since the last poll, oldest first."""
+        now = monotonic() if now is None else now
+        signatures = self.scan()
+        ready = []
+        for name, signature in signatures.items():
+            if self.done.get(name) == signature:
+                continue
+            pending = self.pending.get(name)
+            if pending is None or pending[0] != signature:
+                self.pending[name] = (signature, now)
+            elif now - pending[1] >= self.settle_seconds:
+                del self.pending[name]
+                self.done[name] = signature
+                ready.append((signature[1], name))
+        # forget files deleted while pending
+        for name in set(self.pending) - set(signatures):
+            del self.pending[name]
+        return [name for _, name in sorted(ready)]
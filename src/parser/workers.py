@@ -0,0 +1,143 @@
+"""
+A process pool for Parser.parse that recycles its workers.
+
+multiprocessing.Pool can only retire a worker after a fixed number of tasks.
+Here each worker also retires once its RSS passes a ceiling, right after
+handing back the case it was on, and a fresh worker takes its place, so
+memory a worker leaks or fragments is given back to the OS without losing
+any cases.
+"""
+import multiprocessing
+import os
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, Optional
+
+from .memory import get_rss_mb
+
+RESULT = "result"
+RETIRED = "retired"
+DONE = "done"
+
+
+def worker_loop(
+    initializer: Callable,
+    initargs: tuple,
+    function: Callable,
+    task_queue,
+    result_queue,
+    max_tasks: Optional[int],
+    memory_limit_mb: Optional[float],
+) -> None:
+    initializer(*initargs)
+    completed = 0
+    while True:
+        task = task_queue.get()
+        if task is None:
+            result_queue.put((DONE, os.getpid(), None))
+            return
+        result_queue.put((RESULT, os.getpid(), function(task)))
+        completed += 1
+        if max_tasks and completed >= max_tasks:
+            reason = f"after {completed} cases"
+        elif memory_limit_mb and get_rss_mb() > memory_limit_mb:
+            reason = f"at {get_rss_mb():.1f} MB RSS after {completed} cases"
+        else:
+            continue
+        result_queue.put((RETIRED, os.getpid(), reason))
+        return
+
+
+class RecyclingPool:
+    def __init__(
+        self,
+        processes: int,
+        initializer: Callable,
+        initargs: tuple = (),
+        max_tasks_per_worker: Optional[int] = None,
+        memory_limit_mb: Optional[float] = None,
+        logger=None,
+    ):
+        self.processes = processes
+        self.initializer = initializer
+        self.initargs = initargs
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.memory_limit_mb = memory_limit_mb
+        self.logger = logger
+        self.recycled_count = 0
+
+    def start_worker(self, function: Callable, task_queue, result_queue):
+        process = multiprocessing.Process(
+            target=worker_loop,
+            args=(
+                self.initializer,
+                self.initargs,
+                function,
+                task_queue,
+                result_queue,
+                self.max_tasks_per_worker,
+                self.memory_limit_mb,
+            ),
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    def imap_unordered(self, function: Callable, tasks: Iterable) -> Iterator:
+        """Yields function(task) for every task, in completion order."""
+        # Bounded so a fast reader can't queue up the whole corpus in memory.
+        task_queue = multiprocessing.Queue(maxsize=self.processes * 4)
+        result_queue = multiprocessing.Queue()
+        feeder_errors = []
+
+        def feed():
+            try:
+                for task in tasks:
+                    task_queue.put(task)
+            except BaseException as e:
+                feeder_errors.append(e)
+            finally:
+                # One sentinel per worker slot, a replacement worker picks up a retiree's.
+                for _ in range(self.processes):
+                    task_queue.put(None)
+
+        workers = {}
+        for _ in range(self.processes):
+            process = self.start_worker(function, task_queue, result_queue)
+            workers[process.pid] = process
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+
+        try:
+            running = self.processes
+            while running:
+                try:
+                    kind, pid, payload = result_queue.get(timeout=1)
+                except queue.Empty:
+                    for process in workers.values():
+                        if not process.is_alive() and process.exitcode != 0:
+                            raise RuntimeError(
+                                f"Parser worker {process.pid} died with exit code {process.exitcode}"
+                            )
+                    continue
+                if kind == RESULT:
+                    yield payload
+                elif kind == RETIRED:
+                    workers.pop(pid).join()
+                    self.recycled_count += 1
+                    if self.logger is not None:
+                        self.logger.info(f"Recycling parser worker {pid} {payload}")
+                    process = self.start_worker(function, task_queue, result_queue)
+                    workers[process.pid] = process
+                else:
+                    workers.pop(pid).join()
+                    running -= 1
+            feeder.join()
+            if feeder_errors:
+                raise feeder_errors[0]
+        finally:
+            for process in workers.values():
+                process.terminate()
+                process.join()
+            # Don't block on tasks nobody is going to read any more.
+            task_queue.cancel_join_thread()
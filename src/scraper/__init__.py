@@ -431,7 +431,8 @@ class Scraper:
         case_html_path: str,
         session: requests.sessions.Session,
         logger: logging.Logger,
-        ms_wait: int
+        ms_wait: int,
+        parse_pipeline=None
     ) -> None:
 
         results_soup = self.get_search_results(session, search_url, logger, ms_wait, hidden_values, case_number)
@@ -456,10 +457,7 @@ class Scraper:
             
             logger.info(f"{len(case_html)} response string length")
 
-            with open(
-                os.path.join(case_html_path, f"{case_id}.html"), "w"
-            ) as file_handle:
-                file_handle.write(case_html)
+            save_case_html(case_html_path, case_id, case_html, parse_pipeline)
         else:
             logger.warning("No case URLs found.")
 
@@ -563,7 +561,8 @@ class Scraper:
         session: requests.Session,
         ms_wait: int,
         start_date: str,
-        end_date: str
+        end_date: str,
+        parse_pipeline=None
     ) -> None:
         start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
         end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
@@ -583,8 +582,8 @@ class Scraper:
                     odyssey_version, base_url, search_url, hidden_values, jo_id, date_string, session, logger, ms_wait
                 )
                 
-                scraper_function = self.get_class_and_method(county, logger)
-                scraper_function(base_url, results_soup, case_html_path, logger, session, ms_wait)
+                _, scraper_function = self.get_class_and_method(county, logger)
+                scraper_function(base_url, results_soup, case_html_path, logger, session, ms_wait, parse_pipeline)
 
     def scrape(
         self,
@@ -595,8 +594,13 @@ class Scraper:
         end_date: str,
         court_calendar_link_text: Optional[str],
         case_number: Optional[str],
-        case_html_path: Optional[str]
+        case_html_path: Optional[str],
+        parse_pipeline=None
     ) -> None:
+        """
+        parse_pipeline, a started src.parser.pipeline.ParsePipeline, parses each
+        case page as soon as it's fetched, alongside writing it to case_html.
+        """
         ms_wait, start_date, end_date, court_calendar_link_text, case_number, ssl, county, case_html_path = self.set_defaults(
             ms_wait, start_date, end_date, court_calendar_link_text, case_number, ssl, county, case_html_path
         )
@@ -618,7 +622,8 @@ class Scraper:
         
         if case_number:
             self.scrape_individual_case(
-                base_url, search_url, hidden_values, case_number, case_html_path, session, logger, ms_wait
+                base_url, search_url, hidden_values, case_number, case_html_path, session, logger, ms_wait,
+                parse_pipeline
             )
         else:
             judicial_officers, judicial_officer_to_ID = self.scrape_jo_list(
@@ -627,6 +632,6 @@ class Scraper:
             scraper_start_time = time()
             self.scrape_multiple_cases(
                 county, odyssey_version, base_url, search_url, hidden_values, judicial_officers, judicial_officer_to_ID,
-                case_html_path, logger, session, ms_wait, start_date, end_date
+                case_html_path, logger, session, ms_wait, start_date, end_date, parse_pipeline
             )
             logger.info(f"\nTime to run script: {round(time() - scraper_start_time, 2)} seconds")
@@ -0,0 +1,96 @@
+import argparse
+import contextlib
+
+from . import Scraper
+from ..parser import Parser
+from ..parser.pipeline import ParsePipeline
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument(
+        "-county",
+        "-c",
+        type=str,
+        default="hays",
+        help="The name of the county.",
+    )
+    argparser.add_argument(
+        "-case_number",
+        type=str,
+        default=None,
+        help="Only scrape this case number.",
+    )
+    argparser.add_argument(
+        "-start_date",
+        type=str,
+        default=None,
+        help="First day to scrape the judicial officers' calendars for, as YYYY-MM-DD.",
+    )
+    argparser.add_argument(
+        "-end_date",
+        type=str,
+        default=None,
+        help="Last day to scrape the judicial officers' calendars for, as YYYY-MM-DD.",
+    )
+    argparser.add_argument(
+        "-judicial_officers",
+        type=str,
+        nargs="*",
+        default=[],
+        help="Only scrape the calendars of these judicial officers.",
+    )
+    argparser.add_argument(
+        "-ms_wait",
+        type=int,
+        default=None,
+        help="Milliseconds to wait between requests.",
+    )
+    argparser.add_argument(
+        "-court_calendar_link_text",
+        type=str,
+        default=None,
+        help="Text of the link to the court calendar search on the county's main page.",
+    )
+    argparser.add_argument(
+        "-case_html_path",
+        type=str,
+        default=None,
+        help="Write the case HTML here instead of data/<county>/case_html.",
+    )
+    argparser.add_argument(
+        "-parse",
+        action="store_true",
+        help="Also parse each case page into data/<county>/case_json as soon as it is scraped.",
+    )
+    argparser.add_argument(
+        "-parse_workers",
+        type=int,
+        default=1,
+        help="With -parse, number of worker processes to parse with.",
+    )
+    argparser.add_argument(
+        "-use_spec",
+        action="store_true",
+        help="With -parse, parse with the county's extraction spec in resources/parser_specs.",
+    )
+    argparser.description = "Scrape case HTML from Odyssey for the specified county."
+    args = argparser.parse_args()
+
+    # The pipeline is closed on the way out, once the pages it was handed are parsed.
+    parse_pipeline = (
+        ParsePipeline(Parser(), args.county, workers=args.parse_workers, use_spec=args.use_spec)
+        if args.parse
+        else contextlib.nullcontext()
+    )
+    with parse_pipeline as started_pipeline:
+        Scraper().scrape(
+            county=args.county,
+            judicial_officers=args.judicial_officers,
+            ms_wait=args.ms_wait,
+            start_date=args.start_date,
+            end_date=args.end_date,
+            court_calendar_link_text=args.court_calendar_link_text,
+            case_number=args.case_number,
+            case_html_path=args.case_html_path,
+            parse_pipeline=started_pipeline,
+        )
@@ -6,7 +6,7 @@ class ScraperHays():
     def __init__(self):
         pass
 
-    def scraper_hays(self, base_url, results_soup, case_html_path, logger, session, ms_wait):
+    def scraper_hays(self, base_url, results_soup, case_html_path, logger, session, ms_wait, parse_pipeline=None):
         case_urls = [
             base_url + anchor["href"]
             for anchor in results_soup.select('a[href^="CaseDetail"]')
@@ -29,7 +29,4 @@ class ScraperHays():
             # write html case data
             logger.info(f"{len(case_html)} response string length")
 
-            with open(
-                os.path.join(case_html_path, f"{case_id}.html"), "w"
-            ) as file_handle:
-                file_handle.write(case_html)
+            save_case_html(case_html_path, case_id, case_html, parse_pipeline)
@@ -22,6 +22,18 @@ def write_debug_and_quit(
         file_handle.write(page_text)
     sys.exit(1)
 
+# Writes a scraped case page to case_html. With a parse pipeline (see
+# src/parser/pipeline.py) the page is also handed straight to the parser,
+# so it never has to be read back from disk; the file stays the archive.
+def save_case_html(
+    case_html_path: str, case_id: str, case_html: str, parse_pipeline=None
+) -> None:
+    case_html_bytes = case_html.encode("utf-8")
+    with open(os.path.join(case_html_path, f"{case_id}.html"), "wb") as file_handle:
+        file_handle.write(case_html_bytes)
+    if parse_pipeline is not None:
+        parse_pipeline.submit(case_id, case_html_bytes)
+
 # helper function to make form data
 def create_search_form_data(
     date: str, JO_id: str, hidden_values: Dict[str, str], odyssey_version: int
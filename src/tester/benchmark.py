@@ -0,0 +1,363 @@
+"""
+Benchmarks for the parse and clean pipeline.
+
+    python -m src.tester.benchmark run [-cases 200] [-rounds 5]
+    python -m src.tester.benchmark compare <base> [<head>] [-threshold 0.1]
+
+run times ParserHays.parser_hays per case, Parser.parse over a directory,
+Cleaner.process_single_case, build_event_csv's record building and the date
+normalization every case's dates go through, each over
+the fixture page and over synthetic pages (see synthetic.py), and writes the
+per-case times to resources/benchmarks/<commit>.json. A tree with uncommitted
+changes is saved as <commit>-dirty.json.
+
+compare takes two commits (or result files) and reports every benchmark whose
+median time per case got slower by more than the threshold, exiting with
+status 1 if there are any. head defaults to the current tree's results.
+
+Logging below WARNING is switched off while timing, so the numbers measure
+the work rather than the console.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from time import perf_counter
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from .. import cleaner, parser
+from ..cleaner.schema import adapt_case
+from ..parser import dates
+from . import synthetic
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+RESULTS_DIR = os.path.join(PROJECT_ROOT, "resources", "benchmarks")
+FIXTURE_PATH = os.path.join(PROJECT_ROOT, "resources", "test_files", "test_123456.html")
+# Enough copies of the fixture that the per-run setup of parse doesn't dominate.
+FIXTURE_COPIES = 20
+
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src", "tools"))
+import build_event_csv  # noqa: E402
+
+
+class BenchmarkCase(NamedTuple):
+    case_number: str
+    html: bytes
+    # Parser output, without html_hash and parser_version
+    case_data: dict
+
+
+class BenchmarkParser(parser.Parser):
+    """Reads and writes in the given directories instead of data/<county>."""
+
+    def __init__(self, case_html_path: str, case_json_path: str):
+        super().__init__()
+        self.directories = (case_html_path, case_json_path)
+
+    def get_directories(self, county: str, logger, parse_single_file: bool = False) -> Tuple[str, str]:
+        return self.directories
+
+
+def get_git_commit() -> Tuple[str, bool]:
+    """The HEAD commit and whether tracked files have uncommitted changes."""
+    commit = subprocess.run(
+        ["git", "rev-parse", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    ).stdout.strip()
+    status = subprocess.run(
+        ["git", "status", "--porcelain", "--untracked-files=no"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return commit, bool(status.strip())
+
+
+def get_results_path(commit: str, dirty: bool = False) -> str:
+    return os.path.join(RESULTS_DIR, f"{commit[:12]}{'-dirty' if dirty else ''}.json")
+
+
+def load_inputs(case_count: int, seed: int = 0) -> Dict[str, List[BenchmarkCase]]:
+    with open(FIXTURE_PATH, "rb") as file_handle:
+        fixture_html = file_handle.read()
+    parser_instance = parser.Parser()
+    fixture_data = parser_instance.parse_html("hays", "123456", fixture_html, logger=logging.getLogger(__name__))
+    return {
+        "fixture": [
+            BenchmarkCase(str(123456 + copy), fixture_html, fixture_data) for copy in range(FIXTURE_COPIES)
+        ],
+        "synthetic": [
+            BenchmarkCase(case.case_number, case.html, case.expected)
+            for case in synthetic.generate_cases(case_count, seed=seed, malformed_rate=0.0)
+        ],
+    }
+
+
+def bench_parser_hays(cases: List[BenchmarkCase], work_dir: str) -> Callable[[], int]:
+    parser_hays = parser.Parser().get_class_and_method(logging.getLogger(__name__), "hays")[0]
+    logger = logging.getLogger(__name__)
+    soups = [
+        (case.case_number, BeautifulSoup(parser.Parser().decode_case_html(case.html), "html.parser"))
+        for case in cases
+    ]
+
+    def run():
+        for case_number, soup in soups:
+            parser_hays.parser_hays("hays", case_number, logger, soup)
+        return len(soups)
+
+    return run
+
+
+def bench_parse_directory(cases: List[BenchmarkCase], work_dir: str) -> Callable[[], int]:
+    case_html_path = os.path.join(work_dir, "case_html")
+    os.makedirs(case_html_path)
+    for case in cases:
+        with open(os.path.join(case_html_path, f"{case.case_number}.html"), "wb") as file_handle:
+            file_handle.write(case.html)
+    case_json_path = os.path.join(work_dir, "case_json")
+
+    def run():
+        # parse skips cases that already have JSON
+        shutil.rmtree(case_json_path, ignore_errors=True)
+        os.makedirs(case_json_path)
+        BenchmarkParser(case_html_path, case_json_path).parse(
+            county="hays", case_number="", log_level=logging.WARNING
+        )
+        return len(cases)
+
+    return run
+
+
+def bench_clean_case(cases: List[BenchmarkCase], work_dir: str) -> Callable[[], int]:
+    case_json_path = os.path.join(work_dir, "case_json")
+    cleaned_path = os.path.join(work_dir, "case_json_cleaned")
+    os.makedirs(case_json_path)
+    os.makedirs(cleaned_path)
+    file_names = []
+    for case in cases:
+        file_names.append(f"{case.case_number}.json")
+        # as the parser writes it, so the run goes through the cleaner's schema adapter
+        case_data = {"html_hash": "", **case.case_data, "parser_version": parser.PARSER_VERSION}
+        with open(os.path.join(case_json_path, file_names[-1]), "w") as file_handle:
+            json.dump(case_data, file_handle)
+    cleaner_instance = cleaner.Cleaner()
+
+    def run():
+        for file_name in file_names:
+            cleaner_instance.process_single_case(case_json_path, file_name, cleaned_path)
+        return len(file_names)
+
+    return run
+
+
+def bench_build_event_csv(cases: List[BenchmarkCase], work_dir: str) -> Callable[[], int]:
+    adapted_cases = [adapt_case(case.case_data) for case in cases]
+
+    def run():
+        events, charges = build_event_csv.build_records(adapted_cases)
+        build_event_csv.write_records(os.path.join(work_dir, "events_combined.csv"), events)
+        build_event_csv.write_records(os.path.join(work_dir, "charges_combined.csv"), charges)
+        return len(adapted_cases)
+
+    return run
+
+
+def bench_normalize_dates(cases: List[BenchmarkCase], work_dir: str) -> Callable[[], int]:
+    """Every date string of the cases, DOBs included, through normalize_date from a cold cache."""
+    date_strings = []
+    for case in cases:
+        case_data = case.case_data
+        date_strings.append(case_data["Defendent Information"].get("date of birth", ""))
+        date_strings.extend(charge["date"] for charge in case_data["Charge Information"])
+        date_strings.extend(event[0] for event in case_data["Other Events and Hearings"])
+        date_strings.extend(
+            disposition["date"] for disposition in case_data.get("Disposition Information", [])
+        )
+
+    def run():
+        dates.parse_date.cache_clear()
+        dates.normalize_date.cache_clear()
+        for date_string in date_strings:
+            dates.normalize_date(date_string)
+        return len(cases)
+
+    return run
+
+
+BENCHMARKS = {
+    "parser_hays": bench_parser_hays,
+    "parse_directory": bench_parse_directory,
+    "clean_case": bench_clean_case,
+    "build_event_csv": bench_build_event_csv,
+    "normalize_dates": bench_normalize_dates,
+}
+
+
+def time_benchmark(run: Callable[[], int], rounds: int) -> Dict:
+    run()  # warm up caches and imports
+    per_case = []
+    for _ in range(rounds):
+        start = perf_counter()
+        case_count = run()
+        per_case.append((perf_counter() - start) / case_count)
+    return {
+        "cases": case_count,
+        "rounds": rounds,
+        "median_seconds_per_case": statistics.median(per_case),
+        "min_seconds_per_case": min(per_case),
+        "cases_per_second": 1 / statistics.median(per_case),
+    }
+
+
+def run_benchmarks(
+    case_count: int = 200,
+    rounds: int = 5,
+    names: Optional[List[str]] = None,
+    seed: int = 0,
+) -> Dict:
+    """Runs the benchmarks over each input set and returns the results, keyed by benchmark[input]."""
+    inputs = load_inputs(case_count, seed)
+    results = {}
+    previous_disable = logging.root.manager.disable
+    logging.disable(logging.INFO)
+    try:
+        for name in names or list(BENCHMARKS):
+            for input_name, cases in inputs.items():
+                work_dir = tempfile.mkdtemp()
+                try:
+                    results[f"{name}[{input_name}]"] = time_benchmark(BENCHMARKS[name](cases, work_dir), rounds)
+                finally:
+                    shutil.rmtree(work_dir, ignore_errors=True)
+    finally:
+        logging.disable(previous_disable)
+    return results
+
+
+def save_results(results: Dict, case_count: int, seed: int, results_dir: Optional[str] = None) -> str:
+    commit, dirty = get_git_commit()
+    path = get_results_path(commit, dirty)
+    if results_dir is not None:
+        path = os.path.join(results_dir, os.path.basename(path))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as file_handle:
+        json.dump(
+            {
+                "commit": commit,
+                "dirty": dirty,
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "synthetic_cases": case_count,
+                "seed": seed,
+                "results": results,
+            },
+            file_handle,
+            indent=4,
+        )
+    return path
+
+
+def load_results(ref: str, results_dir: str = RESULTS_DIR) -> Dict:
+    """Results from a file path, or for a commit-ish such as HEAD~1 or a commit hash."""
+    if os.path.isfile(ref):
+        path = ref
+    else:
+        commit = subprocess.run(
+            ["git", "rev-parse", ref], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        path = os.path.join(results_dir, os.path.basename(get_results_path(commit)))
+    with open(path, "r") as file_handle:
+        return json.load(file_handle)
+
+
+def compare_results(base: Dict, head: Dict, threshold: float = 0.1) -> Tuple[List[str], List[str]]:
+    """Report lines for every benchmark the two runs share, and the names of those that regressed."""
+    lines = [f"{'benchmark':<32}{'base':>12}{'head':>12}{'change':>10}"]
+    regressions = []
+    for name in sorted(set(base["results"]) & set(head["results"])):
+        base_time = base["results"][name]["median_seconds_per_case"]
+        head_time = head["results"][name]["median_seconds_per_case"]
+        change = head_time / base_time - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        lines.append(
+            f"{name:<32}{base_time * 1000:>10.3f}ms{head_time * 1000:>10.3f}ms{change:>+10.1%}{flag}"
+        )
+    return lines, regressions
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser()
+    subparsers = argparser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks and save the results for this commit.")
+    run_parser.add_argument(
+        "-cases",
+        type=int,
+        default=200,
+        help="Number of synthetic cases per benchmark.",
+    )
+    run_parser.add_argument(
+        "-rounds",
+        type=int,
+        default=5,
+        help="Timed rounds per benchmark, the median is reported.",
+    )
+    run_parser.add_argument(
+        "-only",
+        type=str,
+        nargs="+",
+        choices=list(BENCHMARKS),
+        default=None,
+        help="Only run these benchmarks.",
+    )
+    run_parser.add_argument(
+        "-seed",
+        type=int,
+        default=0,
+        help="Seed of the synthetic corpus.",
+    )
+    compare_parser = subparsers.add_parser("compare", help="Compare the results of two commits.")
+    compare_parser.add_argument("base", type=str, help="Commit or results file to compare against.")
+    compare_parser.add_argument(
+        "head",
+        type=str,
+        nargs="?",
+        default=None,
+        help="Commit or results file to check. Defaults to the current tree.",
+    )
+    compare_parser.add_argument(
+        "-threshold",
+        type=float,
+        default=0.1,
+        help="Slowdown of the median time per case that counts as a regression.",
+    )
+    argparser.description = "Benchmark the parse and clean pipeline."
+    args = argparser.parse_args()
+
+    if args.command == "run":
+        results = run_benchmarks(args.cases, args.rounds, args.only, args.seed)
+        for name, result in results.items():
+            print(f"{name:<32}{result['median_seconds_per_case'] * 1000:>10.3f} ms/case")
+        print(f"Saved to {save_results(results, args.cases, args.seed)}")
+    else:
+        head = args.head
+        if head is None:
+            commit, dirty = get_git_commit()
+            head = get_results_path(commit, dirty)
+        lines, regressions = compare_results(load_results(args.base), load_results(head), args.threshold)
+        print("\n".join(lines))
+        if regressions:
+            print(f"{len(regressions)} benchmarks slower by more than {args.threshold:.0%}")
+            sys.exit(1)
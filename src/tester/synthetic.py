@@ -0,0 +1,600 @@
+"""
+Synthetic Hays case pages for scale testing.
+
+generate_case builds a random but realistic case (parties, one or more
+charges, dispositions, a long tail of events and a financial table), renders
+it in the markup Hays' Odyssey portal serves, and works out the JSON the
+parser should produce for it. Each case is seeded by its index, so any slice
+of a corpus can be regenerated on its own.
+
+A share of the cases are malformed variants (see MALFORMED_VARIANTS). Their
+expected JSON is whatever the parser's fallbacks give for them, or None when
+the parser is expected to reject the page.
+
+The expected JSON leaves out html_hash and parser_version, which Parser adds.
+"""
+import json
+import os
+import random
+import zipfile
+from html import escape
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# The parser's contract, kept separate from the parser so the two can be checked against each other.
+DISPOSITION_EVENTS = ["disposition", "amended disposition", "deferred adjudication", "punishment hearing"]
+CHARGE_SEVERITY = {
+    "First Degree Felony": 1,
+    "Second Degree Felony": 2,
+    "Third Degree Felony": 3,
+    "State Jail Felony": 4,
+    "Misdemeanor A": 5,
+    "Misdemeanor B": 6,
+}
+
+MALFORMED_VARIANTS = {
+    "missing_case_number": "The case number span is gone, so the code is Unknown.",
+    "missing_party_table": "No Party Information table, so no defendant or state sections.",
+    "charge_missing_cell": "One charge row lost its statute cell, shifting the charges after it.",
+    "no_dispositions": "The events table has no disposition rows, so only the other events come out of it.",
+    "invalid_utf8": "Stray bytes that aren't valid UTF-8, which decoding drops.",
+    "empty_page": "A page with none of the case tables, only Case Metadata comes out.",
+}
+
+FIRST_NAMES = [
+    "James", "Maria", "Robert", "Jose", "Michael", "Linda", "David", "Juan", "Jennifer", "Daniel",
+    "Elizabeth", "Carlos", "Ashley", "Christopher", "Jessica", "Luis", "Sarah", "Matthew", "Ana", "Joshua",
+]
+LAST_NAMES = [
+    "Garcia", "Smith", "Martinez", "Johnson", "Hernandez", "Williams", "Lopez", "Brown", "Gonzalez", "Jones",
+    "Rodriguez", "Davis", "Perez", "Miller", "Sanchez", "Wilson", "Ramirez", "Moore", "Torres", "Taylor",
+]
+JUDGES = ["Boyer, Bruce", "Henry, William R", "Steel, Gary L.", "Robison, Jack", "Junkin, David", "Ramsay, Charles"]
+ATTORNEYS = ["Richard Jones", "Maria Alvarez", "Thomas Keller", "Angela Reyes", "Samuel Ortiz", "Karen Whitfield"]
+PROSECUTORS = ["Yuuuuu Haaaaa", "Wes Mau", "Kristen Cole", "Daniel Ruiz", "Amanda Price"]
+CITIES = [("San Marcos", "78666"), ("Kyle", "78640"), ("Buda", "78610"), ("Wimberley", "78676"), ("Dripping Springs", "78620")]
+STREETS = ["Main St", "Hopkins St", "Old Ranch Road 12", "Center Point Rd", "Aquarena Springs Dr", "Wonder World Dr"]
+LOCATIONS = ["22nd District Court", "207th District Court", "428th District Court", "453rd District Court"]
+MISDEMEANOR_LOCATIONS = ["County Court at Law #1", "County Court at Law #2", "County Court at Law #3"]
+RACES = ["White", "Black", "Hispanic", "Asian"]
+
+# (charge, statute, level); some names carry the " >=" amounts the top charge lookup cuts off.
+CHARGES = [
+    ("AGGRAVATED ASSAULT WITH A DEADLY WEAPON", "22.02(a)(2)", "Second Degree Felony"),
+    ("AGG ROBBERY", "29.03", "First Degree Felony"),
+    ("BURGLARY OF HABITATION", "30.02(c)(2)", "Second Degree Felony"),
+    ("POSS CS PG 1 >=1G<4G", "481.115(c)", "Third Degree Felony"),
+    ("THEFT PROP >=$2,500<$30K", "31.03(e)(4)", "State Jail Felony"),
+    ("EVADING ARREST DETENTION", "38.04(a)", "Misdemeanor A"),
+    ("ASSAULT CAUSES BODILY INJ FAMILY MEMBER", "22.01(a)(1)", "Misdemeanor A"),
+    ("RESIST ARREST SEARCH OR TRANSP", "38.03", "Misdemeanor A"),
+    ("DRIVING WHILE INTOXICATED", "49.04", "Misdemeanor B"),
+    ("POSS MARIJ <2OZ", "481.121(b)(1)", "Misdemeanor B"),
+    ("CRIMINAL MISCHIEF >=$100<$750", "28.03(b)(2)", "Misdemeanor B"),
+    ("DRIVING WHILE LICENSE INVALID", "521.457", "Misdemeanor C"),
+]
+FELONY_LEVELS = {"First Degree Felony", "Second Degree Felony", "Third Degree Felony", "State Jail Felony"}
+
+HEARINGS = [
+    "Arraignment", "Pre Trial Motions (Non-Evidentiary)", "Status Hearing", "Plea Hearing",
+    "Jury Trial", "Motion to Adjudicate", "Motion to Revoke", "Punishment Hearing",
+]
+HEARING_RESULTS = ["Reset", "Held", "Failure To Appear", "Passed", "Prob Modified"]
+DOCKET_ENTRIES = [
+    "Indictment (Open Case)", "Court's Docket Sheet", "Waiver of Arraignment",
+    "Discovery Receipt Email from District Attorney", "Acknowledgement of Receipt of Discovery",
+    "Bond (Cash/Surety) After Release from Jail", "Returned To Sender", "Motion for Continuance",
+]
+ORDERS = [
+    ("Application For Court Appointed Attorney/Order", ["Granted", "Denied"]),
+    ("Order", ["Appointing Attorney", "Setting Bond", "Granting Continuance"]),
+    ("Motion To Waive Court Ordered Debts", ["Supervision Fees", "Court Costs"]),
+]
+OUTCOMES = ["Dismissed", "Convicted", "Deferred Adjudication", "Not Guilty", "Dismissed"]
+PLEAS = ["Guilty", "Not Guilty", "Nolo Contendere"]
+SENTENCES = [("CSCD", "Years"), ("TDCJ", "Years"), ("County Jail", "Days")]
+
+# Static chrome above and below the case, trimmed from a real page.
+PAGE_HEAD = (
+    '<html>\n  <head>\n    <link rel="stylesheet" type="text/css" href="CSS/PublicAccess.css"/>\n  </head>\n'
+    '  <body onload="Javascript:checkRefresh()">\n'
+    '<table cellspacing="0" cellpadding="0" width="100%" border="0" style="table-layout: fixed; margin:0px; padding:0px;">'
+    '<tr><td bgcolor="#000000" height="20px"><table cellspacing="0" cellpadding="0" width="100%" border="0"><tr>'
+    '<td align="left" style="padding-left: 5px"><font size="1"><a class="ssBlackNavBarHyperlink" href="#MainContent">'
+    'Skip to Main Content</a>&nbsp;<a class="ssBlackNavBarHyperlink" href="logout.aspx">Logout</a>&nbsp;'
+    '<a class="ssBlackNavBarHyperlink" href="default.aspx">Search Menu</a>&nbsp;</font></td>'
+    '<td align="right" style="padding-right: 10px"><table cellspacing="0" cellpadding="0" border="0"><tr>'
+    '<td class="ssBlackNavBarLocation">\n                          Location : All Courts</td></tr></table></td>'
+    '</tr></table></td></tr></table>'
+    '<a id="MainContent" name="MainContent" tabindex="-1"></a>'
+    '<div class="ssCaseDetailROA" nowrap="true">Register of Actions</div>'
+)
+PAGE_TAIL = '\n        <form id="Form1" action="" method="post"></form>\n  \n  </body>\n</html>\n'
+TABLE_OPEN = '<table cellpadding="0" cellspacing="0" width="100%" border="0">'
+SPACER_CELLS = '<td>&nbsp;</td><td style="border-right: 1px solid black">&nbsp;</td><td>&nbsp;</td>'
+
+
+class SyntheticCase(NamedTuple):
+    case_number: str
+    variant: str
+    html: bytes
+    # None when the parser should reject the page.
+    expected: Optional[dict]
+
+
+def text(value: str) -> str:
+    return escape(value, quote=False)
+
+
+def get_date(rng: random.Random, year: int) -> Tuple[int, int, int]:
+    return (year, rng.randint(1, 12), rng.randint(1, 28))
+
+
+def format_date(date: Tuple[int, int, int]) -> str:
+    return f"{date[1]:02d}/{date[2]:02d}/{date[0]}"
+
+
+def add_days(date: Tuple[int, int, int], days: int) -> Tuple[int, int, int]:
+    # A 12 x 28 day calendar keeps the dates valid without datetime's overhead.
+    ordinal = (date[0] * 12 + date[1] - 1) * 28 + date[2] - 1 + days
+    return (ordinal // 336, ordinal % 336 // 28 + 1, ordinal % 28 + 1)
+
+
+def render_case_details(name: str, case_type: str, date_filed: str, location: str) -> str:
+    rows = "".join(
+        f'<tr><th class="ssTableHeaderLabel">{label}</th><td style="padding-left:10px"><b>{text(value)}</b></td></tr>'
+        for label, value in [("Case Type:", case_type), ("Date Filed:", date_filed), ("Location:", location)]
+    )
+    return (
+        f'{TABLE_OPEN}<tr><td width="50%" valign="top"><b>{text(name)}</b></td>'
+        '<td>&sect;<br />&sect;<br />&sect;<br /></td><td width="50%" valign="top" align="center">'
+        f'<table cellpadding="0" cellspacing="0" width="90%" border="0"><tr><td width="70%">{TABLE_OPEN}{rows}'
+        "</table></td></tr></table></td></tr></table>"
+    )
+
+
+def render_related_cases(related_cases: List[str]) -> str:
+    rows = "".join(f"<tr><td>{text(case)}</td></tr>" for case in related_cases)
+    return (
+        f'{TABLE_OPEN}<caption><div class="ssCaseDetailSectionTitle">Related Case Information</div></caption>'
+        f"{rows}</table>"
+    )
+
+
+def render_party_table(defendant: dict, state: dict) -> str:
+    attorney = (
+        f'<b>{text(defendant["defense attorney"])}</b><br />  <I>{defendant["appointed or retained"]}</I>'
+        f'<br />{defendant["defense attorney phone number"]}'
+        if defendant["defense attorney"]
+        else ""
+    )
+    feet, inches = defendant["height"]
+    return (
+        f'{TABLE_OPEN}<caption><div class="ssCaseDetailSectionTitle">Party Information</div></caption>'
+        '<tr><td colspan="4"></td><th class="ssTableHeader" id="PIc5">Lead Attorneys</th></tr>'
+        '<tr><th class="ssTableHeader" valign="top" rowspan="2" id="PIr01">Defendant</th>'
+        f'<th class="ssTableHeader" valign="top" id="PIr11">{text(defendant["defendant"])}</th><td rowspan="2"></td>'
+        f'<td rowspan="2" valign="top">{defendant["sex"]} {defendant["race"]}<br />\n'
+        f'                      DOB: {defendant["date of birth"]}<br />{feet}\'&nbsp;{inches}", {defendant["weight"]} lbs</td>'
+        f'<td rowspan="2" valign="top">{attorney}</td></tr>'
+        f'<tr><td valign="top">&nbsp;&nbsp;{text(defendant["street"])}<br />&nbsp;&nbsp;{text(defendant["city"])}<br />'
+        f'<nobr>&nbsp;&nbsp;SID:\n                  </nobr>{defendant["SID"]}<br /></td></tr>'
+        '<tr height="25"><td colspan="5">&nbsp;</td></tr>'
+        '<tr><th class="ssTableHeader" valign="top" rowspan="2" id="PIr02">State</th>'
+        '<th class="ssTableHeader" valign="top" id="PIr12">The State of Texas</th><td rowspan="2"></td>'
+        '<td rowspan="2" valign="top"> </td>'
+        f'<td rowspan="2" valign="top"><b>{text(state["prosecuting attorney"])}</b><br />{state["phone"]}</td></tr>'
+        '<tr><td valign="top">&nbsp;&nbsp;712 S Stagecoach TRL <br />&nbsp;&nbsp;San Marcos, TX 78666<br /></td></tr>'
+        "</table>"
+    )
+
+
+def render_charge_table(defendant_name: str, charge_cells: List[List[str]]) -> str:
+    rows = "".join(
+        f'<tr><td valign="top">{cells[0]}\n            &nbsp;</td>'
+        + "".join(f'<td valign="top">{text(cell)}</td>' for cell in cells[1:])
+        + "</tr>"
+        for cells in charge_cells
+    )
+    return (
+        f'{TABLE_OPEN}<caption><div class="ssCaseDetailSectionTitle">Charge Information</div></caption>'
+        f'<tr><th class="ssTableHeader" nowrap="true" colspan="2">\n              Charges: {text(defendant_name)}</th>'
+        '<th class="ssTableHeader"></th><th class="ssTableHeader">\n              Statute\n            </th>'
+        '<th class="ssTableHeader">\n              Level\n            </th>'
+        '<th class="ssTableHeader">\n              Date\n            </th></tr>'
+        f"{rows}<tr><td /><td></td></tr></table>"
+    )
+
+
+def render_disposition(event: str, judge: str, reason: str, details: List[Tuple[str, str, Optional[str]]]) -> str:
+    """details are (numbered charge, outcome, sentence term or None)."""
+    charges = ""
+    for charge, outcome, term in details:
+        if term is None:
+            result = f'<div style="padding-left: 40px">{text(outcome)}</div><div style="padding-left: 40px"></div>'
+        else:
+            result = (
+                '<div style="padding-left: 40px"><table cellspacing="0px" cellpadding="0px" style="table-layout:fixed" width="100%">'
+                f'<tr><td class="ssMenuText ssSmallText" colspan="2"><nobr>{text(outcome)} <span>{term}\n                </span></nobr></td></tr>'
+                '<tr><td /><td class="ssMenuText ssSmallText"><nobr></nobr></td></tr></table></div>'
+            )
+        number, _, name = charge.partition(" ")
+        charges += f'<div style="padding-left: 10px">{number}&nbsp;{text(name)}{result}</div>'
+    return (
+        f'<div style="padding-bottom: 10px"><b>{event}</b> (Judicial Officer: {judge}){reason}<br />'
+        f"<div>{charges}</div></div>"
+    )
+
+
+def render_hearing(title: str, judge: str, result: Optional[str], canceled_reason: Optional[str]) -> str:
+    officer = f"&nbsp;\n            (9:00 AM)\n          \n    (Judicial Officer&nbsp;{judge})\n  "
+    if canceled_reason is not None:
+        return (
+            f"<i>CANCELED</i>&nbsp;&nbsp;\n          <b>{text(title)}</b>{officer}"
+            f'<div style="padding-left: 10px"><i>{canceled_reason}</i></div><table></table>'
+        )
+    return f"<b>{text(title)}</b>{officer}<table></table>" + (f" Result: {result}" if result else "")
+
+
+def render_events_table(disposition_rows: List[Tuple[str, str]], other_rows: List[Tuple[str, str]]) -> str:
+    """Rows are (date, cell HTML) pairs."""
+    rows = [
+        f'<tr>{SPACER_CELLS}<th id="CDisp" class="ssEventsAndOrdersSubTitle">DISPOSITIONS</th></tr>'
+    ]
+    for number, (date, cell) in enumerate(disposition_rows, 1):
+        rows.append(
+            f'<tr><th class="ssTableHeaderLabel" valign="top" id="RCDCD{number}">{date}</th>{SPACER_CELLS}'
+            f'<td valign="top" headers="CDisp RCDCD{number}">{cell}</td></tr>'
+        )
+    rows.append("<tr><td>&nbsp;</td><td>&nbsp;</td><td>&nbsp;</td><td></td></tr>")
+    rows.append(
+        f'<tr>{SPACER_CELLS}<th id="COtherEventsAndHearings" class="ssEventsAndOrdersSubTitle">OTHER EVENTS AND HEARINGS</th></tr>'
+    )
+    for number, (date, cell) in enumerate(other_rows, 1):
+        rows.append(
+            f'<tr><th class="ssTableHeaderLabel" valign="top" id="RCDER{number}">{date}</th>{SPACER_CELLS}'
+            f'<td headers="COtherEventsAndHearings RCDER{number}">{cell}</td></tr>'
+        )
+    return (
+        '<table cellpadding="0" cellspacing="0" width="100%" border="0" style="table-layout:fixed;">'
+        '<col width="54px" /><col width="3px" /><col width="3px" /><col width="700px" /><col width="100%" />'
+        '<caption><div class="ssCaseDetailSectionTitle">Events &amp; Orders of the Court</div></caption>'
+        + "".join(rows)
+        + "</table>"
+    )
+
+
+def render_financial_table(defendant_name: str, transactions: List[Tuple[str, str, float]]) -> str:
+    assessed = sum(amount for _, kind, amount in transactions if kind == "Transaction Assessment")
+    paid = -sum(amount for _, kind, amount in transactions if kind == "Payment")
+    rows = [
+        f'<tr><td valign="top">&nbsp;</td><td style="border-right: 1px solid black">&nbsp;</td><td>&nbsp;</td>'
+        f'<th class="ssTableHeaderLabelLeft" colspan="4" style="padding-left:3px" id="CDFRB1">'
+        f'<span style="font-weight: bold;">Defendant</span>&nbsp;{text(defendant_name)}</th></tr>',
+        f'<tr>{SPACER_CELLS}<th class="ssTableHeaderLabelLeft" colspan="3" style="padding-left:3px">Total Financial Assessment</th>'
+        f'<td align="right">&nbsp;{assessed:,.2f}</td></tr>',
+        f'<tr>{SPACER_CELLS}<th class="ssTableHeaderLabelLeft" colspan="3" style="padding-left:3px">Total Payments and Credits</th>'
+        f'<td align="right">&nbsp;{paid:,.2f}</td></tr>',
+        f'<tr>{SPACER_CELLS}<th class="ssTableHeader" colspan="3" style="padding-left:3px">\n          Balance Due as of 07/21/2024</th>'
+        f'<td align="right">&nbsp;<b>{assessed - paid:,.2f}</b></td></tr>',
+    ]
+    for number, (date, kind, amount) in enumerate(transactions, 1):
+        payer = ("&nbsp;Receipt # 412412-DC", f"&nbsp;{text(defendant_name)}") if kind == "Payment" else ("&nbsp;", "&nbsp;")
+        shown = f"({-amount:,.2f})" if amount < 0 else f"{amount:,.2f}"
+        rows.append(
+            f'<tr><th class="ssTableHeaderLabel" valign="top" id="RCDFTRD{number}">{date}</th>{SPACER_CELLS}'
+            f'<th class="ssTableHeaderLabelLeft" style="padding-left:3px">{kind}</th>'
+            f'<td>{payer[0]}</td><td>{payer[1]}</td><td align="right">&nbsp;{shown}</td></tr>'
+        )
+    return (
+        f'{TABLE_OPEN}<caption><div class="ssCaseDetailSectionTitle">Financial Information</div></caption>'
+        + "".join(rows)
+        + "</table>"
+    )
+
+
+def get_judicial_officer(officer_text: str) -> str:
+    if len(officer_text) > 18 and officer_text.startswith("(Judicial Officer:"):
+        return officer_text[18:-1].strip()
+    return ""
+
+
+def get_expected_events(
+    disposition_rows: List[List[str]], other_rows: List[List[str]], charge_information: List[Dict]
+) -> Dict:
+    """
+    The events sections the parser builds from the rows of the disposition part and
+    of the other events part, as it sees them in page order. Without a Disposition
+    row to start the disposition part, there are no disposition sections at all.
+    """
+    # Rows with fewer than four parts (bare docket entries) are dropped.
+    rows = [row for row in disposition_rows if len(row) >= 4]
+    # Generated oldest first, so page order is already date order.
+    other_events = [row for row in other_rows if len(row) >= 4]
+    start = next((i for i, row in enumerate(rows) if row[1] in ["Disposition", "Disposition:"]), None)
+    if start is None:
+        return {"Other Events and Hearings": other_events}
+    # Walked from the last row up, turning the list around after each addition.
+    dispositions = []
+    for row in rows[start:][::-1]:
+        if len(row) >= 5 and row[1].lower() in DISPOSITION_EVENTS:
+            details = {"charge": row[3], "outcome": row[4]}
+            if len(row) > 5:
+                details["additional_info"] = row[5:]
+            dispositions.append(
+                {"date": row[0], "event": row[1], "judicial officer": get_judicial_officer(row[2]), "details": [details]}
+            )
+            dispositions.reverse()
+
+    events = {
+        "Other Events and Hearings": other_events,
+        "Disposition Information": dispositions,
+    }
+    if dispositions:
+        events["Top Charge"] = get_expected_top_charge(dispositions, charge_information)
+        events["Dismissed Charges Count"] = sum(
+            1 for disposition in dispositions for detail in disposition["details"]
+            if detail["outcome"].lower() == "dismissed"
+        )
+    return events
+
+
+def get_expected_top_charge(dispositions: List[Dict], charge_information: List[Dict]) -> Optional[Dict]:
+    try:
+        levels = {charge["charges"]: charge["level"] for charge in charge_information}
+    except KeyError:
+        return {"charge name": "Unknown", "charge level": "Unknown"}
+    top_charge, top_severity = None, float("inf")
+    for disposition in dispositions:
+        for detail in disposition["details"]:
+            name = detail["charge"].strip().split(" >=")[0].strip().lstrip("0123456789. ").strip()
+            level = levels.get(name, "Unknown")
+            severity = next(
+                (severity for level_name, severity in CHARGE_SEVERITY.items() if level_name in level), float("inf")
+            )
+            if severity < top_severity:
+                top_charge, top_severity = {"charge name": name, "charge level": level}, severity
+    return top_charge
+
+
+def pick_variant(rng: random.Random, malformed_rate: float) -> str:
+    if rng.random() < malformed_rate:
+        return rng.choice(sorted(MALFORMED_VARIANTS))
+    return "valid"
+
+
+def generate_case(index: int, seed: int = 0, malformed_rate: float = 0.05, variant: Optional[str] = None) -> SyntheticCase:
+    rng = random.Random(f"{seed}-{index}")
+    variant = variant or pick_variant(rng, malformed_rate)
+    case_number = str(70000000 + index)
+
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    defendant_name = f"{last}, {first}"
+    filed = get_date(rng, rng.randint(2012, 2023))
+    # Long-tailed, most cases are short but some run to hundreds of events.
+    event_count = min(int(rng.paretovariate(1.3) * 6), 400)
+
+    charge_count = rng.choices([1, 2, 3, 4, 5, 6], weights=[60, 22, 10, 4, 2, 2])[0]
+    charges = [rng.choice(CHARGES) for _ in range(charge_count)]
+    charge_cells = [
+        [f"{number}.", name, statute, level, format_date(add_days(filed, -rng.randint(5, 120)))]
+        for number, (name, statute, level) in enumerate(charges, 1)
+    ]
+    if variant == "charge_missing_cell":
+        del rng.choice(charge_cells)[2]
+    # The parser reads the charge cells as one run of texts, five at a time, after the five header texts.
+    charge_texts = [text for cells in charge_cells for text in cells]
+    charge_information = [
+        dict(zip(["charges", "statute", "level", "date"], charge_texts[i + 1 : i + 5]))
+        for i in range(0, len(charge_texts), 5)
+    ]
+    felony = any(level in FELONY_LEVELS for _, _, level in charges)
+    location = rng.choice(LOCATIONS if felony else MISDEMEANOR_LOCATIONS)
+    code = f"CR-{filed[0] % 100:02d}-{rng.randint(1, 9999):04d}-{rng.choice('ABCDE')}"
+
+    case_details = {
+        "name": f"The State of Texas vs. {first} {last}",
+        "case type": "Adult Felony" if felony else "Adult Misdemeanor",
+        "date filed": format_date(filed),
+        "location": location,
+    }
+    represented = rng.random() > 0.03
+    city, zip_code = rng.choice(CITIES)
+    defendant = {
+        "defendant": defendant_name,
+        "sex": rng.choice(["Male", "Female"]),
+        "race": rng.choice(RACES),
+        "date of birth": format_date(get_date(rng, filed[0] - rng.randint(17, 60))),
+        "height": (rng.randint(4, 6), rng.randint(0, 11)),
+        "weight": str(rng.randint(100, 300)),
+        "defense attorney": rng.choice(ATTORNEYS) if represented else "",
+        "appointed or retained": rng.choice(["Court Appointed", "Retained"]),
+        "defense attorney phone number": f"512-{rng.randint(200, 999)}-{rng.randint(0, 9999):04d}(W)",
+        "street": f"{rng.randint(1, 9999)} {rng.choice(STREETS)}",
+        "city": f"{city}, TX {zip_code}",
+        "SID": f"TX{rng.randint(0, 99999999):08d}",
+    }
+    state = {"prosecuting attorney": rng.choice(PROSECUTORS), "phone": f"512-{rng.randint(200, 999)}-{rng.randint(0, 9999):04d}(W)"}
+    related_cases = [
+        f"CR-{filed[0] % 100:02d}-{rng.randint(1, 9999):04d}-{rng.choice('ABCDE')} (Companion Case)"
+        for _ in range(rng.choice([0, 0, 0, 1, 2]))
+    ]
+
+    # Dispositions come first on the page, in date order, then the other events.
+    disposition_rows, disposition_texts = [], []
+    other_rows, other_texts = [], []
+
+    def add_disposition(date, event, judge, reason, details):
+        disposition_rows.append((format_date(date), render_disposition(event, judge, reason, details)))
+        row = [format_date(date), event, f"(Judicial Officer: {judge}){reason}"]
+        for charge, outcome, term in details:
+            row += [charge, outcome] + ([term] if term else [])
+        disposition_texts.append(row)
+
+    judge = rng.choice(JUDGES)
+    disposed = add_days(filed, rng.randint(60, 700))
+    numbered = [f"{number}. {name}" for number, (name, _, _) in enumerate(charges, 1)]
+    if variant != "no_dispositions":
+        outcomes = [rng.choice(OUTCOMES) for _ in charges]
+        if rng.random() < 0.7:
+            add_disposition(disposed, "Plea", judge, "", [(charge, rng.choice(PLEAS), None) for charge in numbered])
+        add_disposition(disposed, "Disposition", judge, "", [(charge, outcome, None) for charge, outcome in zip(numbered, outcomes)])
+        sentenced = [charge for charge, outcome in zip(numbered, outcomes) if outcome in ["Convicted", "Deferred Adjudication"]]
+        if sentenced:
+            kind, unit = rng.choice(SENTENCES)
+            event = "Deferred Adjudication" if "Deferred Adjudication" in outcomes else "Sentence"
+            add_disposition(disposed, event, judge, "", [(charge, kind, f"{rng.randint(1, 10)} {unit}") for charge in sentenced])
+        if rng.random() < 0.15:
+            amended = add_days(disposed, rng.randint(100, 1200))
+            reason = " Reason: Community Supervision Extended"
+            add_disposition(amended, "Amended Disposition", judge, reason, [(numbered[0], "Amend Probation", None)])
+
+    date = add_days(filed, -rng.randint(1, 30))
+    for _ in range(event_count):
+        date = add_days(date, rng.randint(1, 45))
+        kind = rng.random()
+        if kind < 0.45:
+            title, hearing_judge = rng.choice(HEARINGS), rng.choice(JUDGES)
+            canceled = rng.choice(["Defendant's Request", "Waived Arraignment", "Reset by Court"]) if rng.random() < 0.1 else None
+            result = rng.choice(HEARING_RESULTS) if canceled is None and date < disposed else None
+            other_rows.append((format_date(date), render_hearing(title, hearing_judge, result, canceled)))
+            officer = f"(9:00 AM) (Judicial Officer {hearing_judge})"
+            if canceled is not None:
+                other_texts.append([format_date(date), "CANCELED", title, officer, canceled])
+            else:
+                other_texts.append([format_date(date), title, officer] + ([f"Result: {result}"] if result else []))
+        elif kind < 0.6:
+            title, results = rng.choice(ORDERS)
+            order_judge, result = rng.choice(JUDGES), rng.choice(results)
+            other_rows.append(
+                (
+                    format_date(date),
+                    f"<b>{text(title)}</b>\n            (Judicial Officer:\n            {order_judge}\n            )\n"
+                    f'          <div style="padding-left: 10px"><i>{result}</i></div>',
+                )
+            )
+            other_texts.append([format_date(date), title, f"(Judicial Officer: {order_judge} )", result])
+        else:
+            title = rng.choice(DOCKET_ENTRIES)
+            other_rows.append((format_date(date), f"<b>{text(title)}</b>"))
+            other_texts.append([format_date(date), title])
+
+    transactions = []
+    date = disposed
+    for _ in range(rng.randint(0, 20)):
+        date = add_days(date, rng.randint(1, 60))
+        if rng.random() < 0.4:
+            transactions.append((format_date(date), "Transaction Assessment", round(rng.uniform(25, 800), 2)))
+        else:
+            transactions.append((format_date(date), "Payment", -round(rng.uniform(25, 200), 2)))
+
+    tables = [
+        render_case_details(case_details["name"], case_details["case type"], case_details["date filed"], location)
+    ]
+    if related_cases:
+        tables.append(render_related_cases(related_cases))
+    if variant != "missing_party_table":
+        tables.append(render_party_table(defendant, state))
+    tables.append(render_charge_table(defendant_name, charge_cells))
+    tables.append(render_events_table(disposition_rows, other_rows))
+    tables.append(render_financial_table(defendant_name, transactions))
+    if variant == "empty_page":
+        tables = []
+    case_code = "" if variant == "missing_case_number" else f'<span style="font-variant: normal">{code}</span>'
+    page = (
+        PAGE_HEAD
+        + f'<div class="ssCaseDetailCaseNbr" nowrap="true">\n          Case No. {case_code}</div>'
+        + "".join(tables)
+        + PAGE_TAIL
+    )
+    html = page.encode("utf-8")
+    if variant == "invalid_utf8":
+        # Between two tables, where dropping the bytes changes nothing.
+        split = html.index(b"<table", html.index(b"ssCaseDetailCaseNbr"))
+        html = html[:split] + b"\xa0\xff\xfe" + html[split:]
+
+    expected = {"Case Metadata": {"code": code if variant != "missing_case_number" else "Unknown", "odyssey id": case_number, "county": "hays"}}
+    if variant == "empty_page":
+        return SyntheticCase(case_number, variant, html, expected)
+    expected["Case Details"] = case_details
+    if related_cases:
+        expected["Related Cases"] = related_cases
+    if variant != "missing_party_table":
+        if represented:
+            expected["Defendent Information"] = {
+                "defendant": defendant_name,
+                "sex": defendant["sex"],
+                "race": defendant["race"],
+                "date of birth": f"DOB: {defendant['date of birth']}",
+                "height": f"{defendant['height'][0]}'{defendant['height'][1]}\",",
+                "weight": defendant["weight"],
+                "defense attorney": defendant["defense attorney"],
+                "appointed or retained": defendant["appointed or retained"],
+                "defense attorney phone number": defendant["defense attorney phone number"],
+                "defendant address": f"{defendant['street']} {defendant['city']}",
+                "SID": defendant["SID"],
+            }
+        else:
+            # Without the attorney cells the defendant row is too short and every field falls back.
+            expected["Defendent Information"] = {
+                field: "Unknown"
+                for field in [
+                    "defendant", "sex", "race", "date of birth", "height", "weight", "defense attorney",
+                    "appointed or retained", "defense attorney phone number", "defendant address", "SID",
+                ]
+            }
+        expected["State Information"] = {
+            "prosecuting attorney": state["prosecuting attorney"],
+            "prosectuing attorney phone number": state["phone"],
+        }
+    expected["Charge Information"] = charge_information
+    expected.update(get_expected_events(disposition_texts, other_texts, charge_information))
+    return SyntheticCase(case_number, variant, html, expected)
+
+
+def generate_cases(count: int, seed: int = 0, malformed_rate: float = 0.05, start: int = 0) -> Iterator[SyntheticCase]:
+    for index in range(start, start + count):
+        yield generate_case(index, seed, malformed_rate)
+
+
+def write_corpus(
+    output_dir: str,
+    count: int,
+    seed: int = 0,
+    malformed_rate: float = 0.05,
+    start: int = 0,
+    archive: bool = False,
+) -> Dict[str, int]:
+    """
+    Writes case_html/<case number>.html (or case_html.zip with archive),
+    expected_json/<case number>.json and a manifest.jsonl line per case with its
+    variant and whether the parser should reject it. Returns the count per variant.
+    """
+    html_dir = os.path.join(output_dir, "case_html")
+    expected_dir = os.path.join(output_dir, "expected_json")
+    os.makedirs(expected_dir, exist_ok=True)
+    if not archive:
+        os.makedirs(html_dir, exist_ok=True)
+    counts = {}
+    archive_file = zipfile.ZipFile(html_dir + ".zip", "a", zipfile.ZIP_DEFLATED) if archive else None
+    try:
+        with open(os.path.join(output_dir, "manifest.jsonl"), "a") as manifest:
+            for case in generate_cases(count, seed, malformed_rate, start):
+                if archive_file is not None:
+                    archive_file.writestr(f"{case.case_number}.html", case.html)
+                else:
+                    with open(os.path.join(html_dir, f"{case.case_number}.html"), "wb") as file_handle:
+                        file_handle.write(case.html)
+                if case.expected is not None:
+                    with open(os.path.join(expected_dir, f"{case.case_number}.json"), "w") as file_handle:
+                        json.dump(case.expected, file_handle, indent=4)
+                manifest.write(
+                    json.dumps(
+                        {"case_number": case.case_number, "variant": case.variant, "rejected": case.expected is None}
+                    )
+                    + "\n"
+                )
+                counts[case.variant] = counts.get(case.variant, 0) + 1
+    finally:
+        if archive_file is not None:
+            archive_file.close()
+    return counts
@@ -1,11 +1,15 @@
 from datetime import datetime, timedelta
+import io
 import unittest
 import sys
 import os
 import json
 import logging
+import logging.handlers
 from unittest.mock import patch, MagicMock, mock_open
 import tempfile
+import shutil
+import random
 from bs4 import BeautifulSoup
 
 # Import all of the programs modules within the parent_dir
@@ -938,7 +942,631 @@ class ParseTestCase(unittest.TestCase):
             base_dir, "data", county, "cases_with_parsing_error.txt"
         )
 
-        mock_open_func.assert_called_once_with(error_log_path, "w")
+        mock_open_func.assert_called_once_with(error_log_path, "a")
+
+    def test_html_hash_ignores_balance_table(self):
+        with open(os.path.join(project_root, "resources", "test_files", "test_123456.html"), "rb") as f:
+            case_html = f.read()
+
+        html_hash = self.parser_instance.get_html_hash(case_html)
+
+        # A payment only changes the balance table, so the hash should not move.
+        self.assertEqual(
+            html_hash,
+            self.parser_instance.get_html_hash(case_html.replace(b"2,043.10", b"1,000.00")),
+        )
+        self.assertNotEqual(
+            html_hash,
+            self.parser_instance.get_html_hash(case_html.replace(b"Boyer, Bruce", b"Smith, Jane")),
+        )
+
+    def test_parser_skips_unchanged_html(self):
+        case_html_path = os.path.join(self.test_dir, "hays", "case_html")
+        os.makedirs(case_html_path, exist_ok=True)
+        with open(os.path.join(project_root, "resources", "test_files", "test_123456.html"), "rb") as f:
+            case_html = f.read()
+        with open(os.path.join(case_html_path, "123456.html"), "wb") as f:
+            f.write(case_html)
+        manifest_path = os.path.join(self.test_dir, "hays", "html_hash_manifest.json")
+
+        with patch.object(
+            self.parser_instance, "get_directories", return_value=(case_html_path, self.case_json_path)
+        ), patch.object(
+            self.parser_instance, "get_html_hash_manifest_path", return_value=manifest_path
+        ), patch.object(
+            self.parser_instance, "write_json_data", wraps=self.parser_instance.write_json_data
+        ) as mock_write:
+            self.parser_instance.parse(county="hays", case_number="123456", skip_unchanged=True)
+            self.parser_instance.parse(county="hays", case_number="123456", skip_unchanged=True)
+            self.assertEqual(mock_write.call_count, 1)
+            # a new parser version re-parses the unchanged HTML
+            with patch("src.parser.PARSER_VERSION", "99.0.0"):
+                self.parser_instance.parse(county="hays", case_number="123456", skip_unchanged=True)
+            self.assertEqual(mock_write.call_count, 2)
+
+        with open(manifest_path, "r") as f:
+            self.assertEqual(
+                json.load(f),
+                {"123456": {"html_hash": self.parser_instance.get_html_hash(case_html), "parser_version": "99.0.0"}},
+            )
+
+    def test_shard_writer_round_trip(self):
+        shard_dir = os.path.join(self.test_dir, "hays", "case_jsonl")
+        with parser.shards.ShardWriter(shard_dir, max_records_per_shard=2) as shard_writer:
+            for case_number in ["1", "2", "3"]:
+                shard_writer.write(case_number, {"odyssey id": case_number})
+        # A later run re-parses case 2, which should replace the earlier record.
+        with parser.shards.ShardWriter(shard_dir, compress=False) as shard_writer:
+            shard_writer.write("2", {"odyssey id": "2", "version": 2})
+
+        self.assertEqual(
+            sorted(file_name for file_name in os.listdir(shard_dir) if file_name.startswith("part-")),
+            ["part-00000.jsonl.gz", "part-00001.jsonl.gz", "part-00002.jsonl"],
+        )
+        self.assertEqual(
+            parser.shards.read_case_from_shards(shard_dir, "2"), {"odyssey id": "2", "version": 2}
+        )
+        self.assertIsNone(parser.shards.read_case_from_shards(shard_dir, "4"))
+        self.assertEqual(
+            dict(parser.shards.iter_shard_records(shard_dir)),
+            {
+                "1": {"odyssey id": "1"},
+                "2": {"odyssey id": "2", "version": 2},
+                "3": {"odyssey id": "3"},
+            },
+        )
+
+    def test_parser_jsonl_output(self):
+        shard_dir = os.path.join(self.test_dir, "hays", "case_jsonl")
+        with patch.object(self.parser_instance, "get_shard_directory", return_value=shard_dir):
+            self.parser_instance.parse(
+                county="hays", case_number="123456", parse_single_file=True, test=True, output_format="jsonl"
+            )
+
+        with open(os.path.join(project_root, "resources", "test_files", "test_123456.json"), "r") as f:
+            expected_case_data = json.load(f)
+        self.assertEqual(
+            parser.shards.read_case_from_shards(shard_dir, "test_123456"), expected_case_data
+        )
+
+    def test_parser_columnar_output(self):
+        import pyarrow.dataset as ds
+
+        columnar_dir = os.path.join(self.test_dir, "columnar")
+        with patch.object(
+            self.parser_instance, "get_columnar_directory", return_value=columnar_dir
+        ), patch.object(self.parser_instance, "write_json_data"):
+            self.parser_instance.parse(
+                county="hays", case_number="123456", parse_single_file=True, test=True, columnar_format="parquet"
+            )
+
+        cases = ds.dataset(os.path.join(columnar_dir, "cases"), partitioning="hive").to_table().to_pylist()
+        self.assertEqual(len(cases), 1)
+        self.assertEqual(cases[0]["code"], "CR-17-5152-C")
+        self.assertEqual(cases[0]["county"], "hays")
+        self.assertEqual(cases[0]["filing_month"], "2016-01")
+        for table_name, column in [("charges", "charge_count"), ("events", "event_count")]:
+            table = ds.dataset(os.path.join(columnar_dir, table_name), partitioning="hive").to_table()
+            self.assertEqual(table.num_rows, cases[0][column])
+        events = ds.dataset(os.path.join(columnar_dir, "events"), partitioning="hive").to_table().sort_by("event_id")
+        event_dates = events.column("event_date").to_pylist()
+        self.assertEqual(event_dates, sorted(event_dates))
+        self.assertNotIn("Plea", events.column("event").to_pylist())
+        self.assertTrue(
+            os.path.isdir(os.path.join(columnar_dir, "dispositions", "county=hays", "filing_month=2016-01"))
+        )
+
+    def test_columnar_writer_keeps_one_file_per_partition(self):
+        import pyarrow.dataset as ds
+        from ..parser.columnar import ColumnarWriter
+
+        with open(os.path.join(project_root, "resources", "test_files", "test_123456.json"), "r") as f:
+            case_data = json.load(f)
+        columnar_dir = os.path.join(self.test_dir, "columnar")
+        for file_format, max_open_files, files_per_partition in [("parquet", 256, 1), ("arrow", 1, 2)]:
+            shutil.rmtree(columnar_dir, ignore_errors=True)
+            with ColumnarWriter(
+                columnar_dir, file_format=file_format, row_group_size=30, max_open_files=max_open_files
+            ) as writer:
+                for filed in ["01/05/2016", "02/05/2016"] * 3:
+                    writer.add_case({**case_data, "Case Details": {**case_data["Case Details"], "date filed": filed}})
+            events_dir = os.path.join(columnar_dir, "events", "county=hays")
+            self.assertEqual(sorted(os.listdir(events_dir)), ["filing_month=2016-01", "filing_month=2016-02"])
+            for partition in os.listdir(events_dir):
+                self.assertEqual(len(os.listdir(os.path.join(events_dir, partition))), files_per_partition)
+            events = ds.dataset(
+                os.path.join(columnar_dir, "events"), format="parquet" if file_format == "parquet" else "ipc",
+                partitioning="hive",
+            ).to_table()
+            self.assertEqual(events.num_rows, 6 * len(case_data["Other Events and Hearings"]))
+
+    def test_stage_timer_summary(self):
+        timer = parser.timing.StageTimer(n_slowest=2)
+        instance, _ = self.parser_instance.get_class_and_method(logger=self.mock_logger, county="hays")
+        timer.instrument(instance)
+
+        for case_number, seconds in [("1", 0.001), ("2", 0.003), ("3", 0.002)]:
+            timer.start_case(case_number)
+            timer.add("soup", seconds)
+            instance.get_charge_severity("Misdemeanor A", self.mock_logger)
+            instance.count_dismissed_charges([], self.mock_logger)
+            instance.get_case_details(BeautifulSoup("<table></table>", "html.parser"), self.mock_logger)
+            timer.end_case()
+        timer.start_case("4")
+        timer.cancel_case()
+        timer.end_case()
+
+        self.assertEqual(list(timer.stage_times["soup"]), [0.001, 0.003, 0.002])
+        self.assertEqual(len(timer.stage_times["get_case_details"]), 3)
+        self.assertEqual(len(timer.case_times), 3)
+        self.assertEqual(parser.timing.percentile(sorted(timer.stage_times["soup"]), 0.5), 0.002)
+        self.assertEqual(parser.timing.percentile(sorted(timer.stage_times["soup"]), 0.95), 0.003)
+        summary = timer.summary()
+        self.assertTrue(any(line.startswith("get_case_details") for line in summary))
+        self.assertTrue(summary[-1].startswith("Slowest cases: "))
+        self.assertEqual(summary[-1].count("ms)"), 2)
+
+    def test_date_normalization_is_memoized(self):
+        dates = parser.dates
+        dates.parse_date.cache_clear()
+        dates.normalize_date.cache_clear()
+
+        self.assertEqual(dates.normalize_date("07/07/2016"), "2016-07-07")
+        self.assertEqual(dates.normalize_date("DOB: 10/02/1994"), "1994-10-02")
+        self.assertEqual(dates.parse_date("1/5/2020"), datetime(2020, 1, 5).date())
+        for not_a_date in ["02/30/2020", "2020-01-05", "07/07/2016 extra", "", None, 20160707]:
+            self.assertIsNone(dates.normalize_date(not_a_date))
+
+        dates.normalize_date("07/07/2016")
+        self.assertEqual(dates.normalize_date.cache_info().hits, 1)
+
+        # The county parsers share the package's module, and with it the cache.
+        instance, _ = self.parser_instance.get_class_and_method(logger=self.mock_logger, county="hays")
+        self.assertIs(sys.modules[type(instance).__module__].parse_date, dates.parse_date)
+
+    def test_parser_profile_output(self):
+        profile_output = os.path.join(self.test_dir, "parse.prof")
+        with patch.object(self.parser_instance, "write_json_data"):
+            self.parser_instance.parse(
+                county="hays", case_number="123456", parse_single_file=True, test=True, profile_output=profile_output
+            )
+        self.assertTrue(os.path.getsize(profile_output) > 0)
+
+    def test_configure_logger_reuses_queue_handler(self):
+        logger = self.parser_instance.configure_logger()
+        logger = self.parser_instance.configure_logger(logging.DEBUG)
+
+        self.assertEqual(
+            len([handler for handler in logger.handlers if isinstance(handler, logging.handlers.QueueHandler)]), 1
+        )
+        self.assertEqual(logger.level, logging.DEBUG)
+        self.assertFalse(logger.propagate)
+        self.parser_instance.configure_logger()
+
+    def test_log_sampling_is_deterministic(self):
+        case_numbers = [str(case_number) for case_number in range(1000)]
+        sampled = [
+            case_number for case_number in case_numbers
+            if self.parser_instance.is_case_sampled(case_number, 0.1)
+        ]
+
+        self.assertTrue(50 < len(sampled) < 150)
+        self.assertEqual(
+            sampled,
+            [case_number for case_number in case_numbers if self.parser_instance.is_case_sampled(case_number, 0.1)],
+        )
+        self.assertFalse(any(self.parser_instance.is_case_sampled(case_number, 0.0) for case_number in case_numbers))
+        self.assertTrue(all(self.parser_instance.is_case_sampled(case_number, 1.0) for case_number in case_numbers))
+
+    def test_parse_error_ledger_and_only_failed(self):
+        case_html_path = os.path.join(self.test_dir, "hays", "case_html")
+        os.makedirs(case_html_path, exist_ok=True)
+        with open(os.path.join(project_root, "resources", "test_files", "test_123456.html"), "rb") as f:
+            case_html = f.read()
+        with open(os.path.join(case_html_path, "123456.html"), "wb") as f:
+            f.write(case_html)
+        ledger_path = os.path.join(self.test_dir, "hays", "parse_error_ledger.jsonl")
+
+        with patch.object(
+            self.parser_instance, "get_directories", return_value=(case_html_path, self.case_json_path)
+        ), patch.object(
+            self.parser_instance, "get_error_ledger_path", return_value=ledger_path
+        ), patch.object(self.parser_instance, "write_error_log"):
+            with patch(f"{parser.__name__}.hays.ParserHays.get_charge_information", side_effect=ValueError("bad charge table")):
+                self.parser_instance.parse(county="hays", case_number="123456")
+
+            self.assertEqual(self.parser_instance.get_failed_cases("hays", self.mock_logger), ["123456"])
+            self.assertFalse(os.path.exists(os.path.join(self.case_json_path, "123456.json")))
+
+            self.parser_instance.parse(county="hays", case_number="", only_failed=True)
+
+            self.assertEqual(self.parser_instance.get_failed_cases("hays", self.mock_logger), [])
+            self.assertTrue(os.path.exists(os.path.join(self.case_json_path, "123456.json")))
+
+        with open(ledger_path, "r") as f:
+            failed_entry, resolved_entry = [json.loads(line) for line in f]
+        self.assertEqual(failed_entry["status"], "failed")
+        self.assertEqual(failed_entry["exception_type"], "ValueError")
+        self.assertEqual(failed_entry["section"], "get_charge_information")
+        self.assertEqual(failed_entry["parser_version"], parser.PARSER_VERSION)
+        self.assertEqual(resolved_entry["status"], "resolved")
+
+    def test_parse_error_ledger_records_swallowed_section_errors(self):
+        case_html_path = os.path.join(self.test_dir, "hays", "case_html")
+        os.makedirs(case_html_path, exist_ok=True)
+        with open(os.path.join(project_root, "resources", "test_files", "test_123456.html"), "rb") as f:
+            case_html = f.read()
+        with open(os.path.join(case_html_path, "123456.html"), "wb") as f:
+            f.write(case_html)
+        ledger_path = os.path.join(self.test_dir, "hays", "parse_error_ledger.jsonl")
+
+        # An empty party table makes parse_defendant_rows hit its own except block.
+        with patch(f"{parser.__name__}.hays.ParserHays.extract_rows", return_value=[]):
+            case_data = self.parser_instance.parse_html("hays", "123456", case_html, logger=self.mock_logger)
+            self.assertEqual(case_data["Defendent Information"]["defendant"], "Unknown")
+
+            with patch.object(
+                self.parser_instance, "get_directories", return_value=(case_html_path, self.case_json_path)
+            ), patch.object(
+                self.parser_instance, "get_error_ledger_path", return_value=ledger_path
+            ), patch.object(self.parser_instance, "write_error_log"):
+                self.parser_instance.parse(county="hays", case_number="123456")
+
+        self.assertFalse(os.path.exists(os.path.join(self.case_json_path, "123456.json")))
+        with open(ledger_path, "r") as f:
+            (failed_entry,) = [json.loads(line) for line in f]
+        self.assertEqual(failed_entry["status"], "failed")
+        self.assertEqual(failed_entry["exception_type"], "IndexError")
+        self.assertEqual(failed_entry["section"], "parse_defendant_rows")
+
+    def test_parser_reads_archives(self):
+        import tarfile
+        import zipfile
+
+        with open(os.path.join(project_root, "resources", "test_files", "test_123456.html"), "rb") as f:
+            case_html = f.read()
+        with open(os.path.join(project_root, "resources", "test_files", "test_123456.json"), "r") as f:
+            expected_case_data = json.load(f)
+        expected_case_data["Case Metadata"]["odyssey id"] = "123456"
+        member_dir = os.path.join(self.test_dir, "members")
+        os.makedirs(member_dir)
+        for case_number in ["123456", "654321"]:
+            with open(os.path.join(member_dir, f"{case_number}.html"), "wb") as f:
+                f.write(case_html)
+        zip_path = os.path.join(self.test_dir, "case_html.zip")
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            for file_name in os.listdir(member_dir):
+                zf.write(os.path.join(member_dir, file_name), arcname=file_name)
+        tar_path = os.path.join(self.test_dir, "case_html.tar.gz")
+        with tarfile.open(tar_path, "w:gz") as tf:
+            tf.add(member_dir, arcname="case_html")
+
+        for archive_path, workers in [(zip_path, 1), (tar_path, 1), (zip_path, 2)]:
+            case_json_path = os.path.join(self.test_dir, f"json-{os.path.basename(archive_path)}-{workers}")
+            os.makedirs(case_json_path)
+            with patch.object(
+                self.parser_instance, "get_directories", return_value=(member_dir, case_json_path)
+            ):
+                self.parser_instance.parse(
+                    county="hays", case_number="", archive_path=archive_path, workers=workers
+                )
+            self.assertEqual(sorted(os.listdir(case_json_path)), ["123456.json", "654321.json"])
+            with open(os.path.join(case_json_path, "123456.json"), "r") as f:
+                self.assertEqual(json.load(f), expected_case_data)
+
+        # a case number only parses that member
+        with patch.object(
+            self.parser_instance, "get_directories", return_value=(member_dir, self.case_json_path)
+        ):
+            self.parser_instance.parse(county="hays", case_number="654321", archive_path=tar_path)
+        self.assertEqual(os.listdir(self.case_json_path), ["654321.json"])
+
+    def test_parser_memory_mode_recycles_workers(self):
+        with open(os.path.join(project_root, "resources", "test_files", "test_123456.html"), "rb") as f:
+            case_html = f.read()
+        case_html_path = os.path.join(self.test_dir, "hays", "case_html")
+        os.makedirs(case_html_path)
+        for case_number in ["1", "2", "3", "4", "5"]:
+            with open(os.path.join(case_html_path, f"{case_number}.html"), "wb") as f:
+                f.write(case_html)
+        memory_report = os.path.join(self.test_dir, "memory_report.txt")
+
+        with patch.object(
+            self.parser_instance, "get_directories", return_value=(case_html_path, self.case_json_path)
+        ), patch.object(parser.RecyclingPool, "start_worker", autospec=True,
+                        side_effect=parser.RecyclingPool.start_worker) as mock_start_worker:
+            self.parser_instance.parse(
+                county="hays",
+                case_number="",
+                workers=2,
+                max_cases_per_worker=2,
+                memory_check_every=2,
+                memory_report=memory_report,
+            )
+
+        self.assertEqual(len(os.listdir(self.case_json_path)), 5)
+        # two workers to start with, replaced after every two cases
+        self.assertGreaterEqual(mock_start_worker.call_count, 3)
+        with open(memory_report, "r") as f:
+            report = f.read()
+        self.assertIn("Top 10 allocation sites:", report)
+        self.assertIn("Cases: 5", report)
+
+    def test_parser_releases_soup(self):
+        with patch.object(
+            parser.BeautifulSoup, "decompose", autospec=True, side_effect=parser.BeautifulSoup.decompose
+        ) as mock_decompose:
+            self.parser_instance.parse(
+                county="hays", case_number="123456", parse_single_file=True, test=True, memory_check_every=1
+            )
+        self.assertEqual(mock_decompose.call_count, 1)
+        with open(os.path.join(project_root, "resources", "test_files", "test_123456.json"), "r") as f:
+            self.assertEqual(json.load(f)["Case Metadata"]["odyssey id"], "test_123456")
+
+    def test_parse_html_selected_sections(self):
+        with open(os.path.join(project_root, "resources", "test_files", "test_123456.html"), "rb") as f:
+            case_html = f.read()
+        full_case_data = self.parser_instance.parse_html("hays", "123456", case_html, logger=self.mock_logger)
+
+        case_data = self.parser_instance.parse_html(
+            "hays",
+            "123456",
+            case_html,
+            sections=["Top Charge", "Other Events and Hearings", "Case Details.date filed"],
+            logger=self.mock_logger,
+        )
+        self.assertEqual(
+            case_data,
+            {
+                "Case Metadata": full_case_data["Case Metadata"],
+                "Top Charge": full_case_data["Top Charge"],
+                "Other Events and Hearings": full_case_data["Other Events and Hearings"],
+                "Case Details": {"date filed": full_case_data["Case Details"]["date filed"]},
+                "html_hash": full_case_data["html_hash"],
+                "parser_version": parser.PARSER_VERSION,
+            },
+        )
+
+        with patch("src.parser.BeautifulSoup") as mock_parser_soup, \
+                patch.object(self.parser_instance, "decode_case_html") as mock_decode, \
+                patch.object(self.parser_instance, "get_html_hash") as mock_hash:
+            metadata = self.parser_instance.parse_html(
+                "hays", "123456", case_html, sections=["Case Metadata"], logger=self.mock_logger
+            )
+        mock_parser_soup.assert_not_called()
+        mock_decode.assert_not_called()
+        mock_hash.assert_not_called()
+        self.assertEqual(
+            metadata,
+            {
+                "Case Metadata": full_case_data["Case Metadata"],
+                "parser_version": parser.PARSER_VERSION,
+            },
+        )
+
+        with self.assertRaises(ValueError):
+            self.parser_instance.parse_html(
+                "hays", "123456", case_html, sections=["Balance"], logger=self.mock_logger
+            )
+
+    def test_case_code_scanner_stops_early(self):
+        with open(os.path.join(project_root, "resources", "test_files", "test_123456.html"), "rb") as f:
+            case_html = self.parser_instance.decode_case_html(f.read())
+        parser_instance, _ = self.parser_instance.get_class_and_method(logger=self.mock_logger, county="hays")
+        hays = sys.modules[type(parser_instance).__module__]
+        with patch.object(hays.CaseCodeScanner, "feed", autospec=True,
+                          side_effect=hays.CaseCodeScanner.feed) as mock_feed:
+            metadata = parser_instance.parser_hays_metadata("hays", "123456", self.mock_logger, io.StringIO(case_html))
+        self.assertEqual(
+            metadata["Case Metadata"]["code"],
+            parser_instance.get_case_metadata("hays", "123456", BeautifulSoup(case_html, "html.parser"), self.mock_logger)["code"],
+        )
+        self.assertLess(mock_feed.call_count * hays.METADATA_CHUNK_SIZE, len(case_html))
+
+    def test_spec_parser_matches_parser_hays(self):
+        parser_hays, _ = self.parser_instance.get_class_and_method(logger=self.mock_logger, county="hays")
+        spec_parser, spec_function = self.parser_instance.get_class_and_method(
+            logger=self.mock_logger, county="hays", use_spec=True
+        )
+        self.assertIsInstance(spec_parser, parser.spec.SpecParser)
+        for file_name in ["test_123456.html", "test_51652356.html"]:
+            with open(os.path.join(project_root, "resources", "test_files", file_name), "rb") as f:
+                case_html = self.parser_instance.decode_case_html(f.read())
+            expected = parser_hays.parser_hays("hays", "123456", self.mock_logger, BeautifulSoup(case_html, "html.parser"))
+            case_data = spec_function("hays", "123456", self.mock_logger, BeautifulSoup(case_html, "html.parser"))
+            # same keys in the same order, so the JSON written out is identical too
+            self.assertEqual(json.dumps(case_data), json.dumps(expected))
+
+        case_data = spec_function(
+            "hays", "123456", self.mock_logger, BeautifulSoup(case_html, "html.parser"), sections=["Top Charge"]
+        )
+        self.assertEqual(list(case_data), ["Case Metadata", "Top Charge"])
+
+    def test_spec_parser_used_for_county_without_class(self):
+        spec_dir = os.path.join(self.test_dir, "parser_specs")
+        os.makedirs(spec_dir)
+        with open(os.path.join(project_root, "resources", "parser_specs", "hays.json"), "r") as f:
+            spec = json.load(f)
+        spec["county"] = "caldwell"
+        with open(os.path.join(spec_dir, "caldwell.json"), "w") as f:
+            json.dump(spec, f)
+
+        with patch("src.parser.spec.SPEC_DIR", spec_dir):
+            instance, method = self.parser_instance.get_class_and_method(logger=self.mock_logger, county="caldwell")
+            self.assertIsInstance(instance, parser.spec.SpecParser)
+            self.assertEqual(
+                self.parser_instance.get_class_and_method(logger=self.mock_logger, county="bexar"), (None, None)
+            )
+
+    def test_validate_cases_against_field_list(self):
+        from ..parser import validation
+
+        with open(os.path.join(project_root, "resources", "test_files", "test_123456.json"), "r") as f:
+            good_case = json.load(f)
+        good_case["parser_version"] = "1.0.0"
+        bad_case = json.loads(json.dumps(good_case))
+        bad_case["parser_version"] = "0.9.0"
+        bad_case["Case Details"]["case type"] = "Unknown"
+        bad_case["Case Details"]["location"] = 12
+        del bad_case["Defendent Information"]["sex"]
+        bad_case["Charge Information"] = [{"charges": "DWI", "level": "Misdemeanor B", "date": "01/01/2020"}]
+
+        report = validation.validate_cases([good_case, good_case, bad_case], batch_size=2)
+        rows = {(row["parser_version"], row["field"]): row for row in report}
+
+        self.assertEqual(rows[("1.0.0", "case type")]["rows"], 2)
+        self.assertEqual(rows[("1.0.0", "case type")]["unknown_rate"], 0.0)
+        self.assertEqual(rows[("0.9.0", "case type")]["unknown_rate"], 1.0)
+        self.assertEqual(rows[("0.9.0", "location")]["wrong_type_rate"], 1.0)
+        self.assertEqual(rows[("0.9.0", "sex")]["missing_rate"], 1.0)
+        self.assertEqual(rows[("1.0.0", "sex")]["missing_rate"], 0.0)
+        # charge fields are checked per charge
+        self.assertEqual(rows[("1.0.0", "charges")]["rows"], 2 * len(good_case["Charge Information"]))
+        self.assertEqual(rows[("0.9.0", "charges")]["too_short_rate"], 1.0)
+        # renamed in the current output
+        self.assertEqual(rows[("1.0.0", "prosecuting attorney phone number")]["missing_rate"], 0.0)
+
+        failures = validation.get_gate_failures(report)
+        self.assertIn(("0.9.0", "case type"), [(row["parser_version"], row["field"]) for row in failures])
+        self.assertNotIn("1.0.0", [row["parser_version"] for row in failures])
+
+    def test_synthetic_cases_parse_to_expected_json(self):
+        from . import synthetic
+
+        cases = list(synthetic.generate_cases(40, seed=7, malformed_rate=0.0))
+        cases += [synthetic.generate_case(100 + i, seed=7, variant=variant)
+                  for i, variant in enumerate(sorted(synthetic.MALFORMED_VARIANTS))]
+        for case in cases:
+            if case.expected is None:
+                with self.assertRaises(KeyError):
+                    self.parser_instance.parse_html("hays", case.case_number, case.html, logger=self.mock_logger)
+                continue
+            case_data = self.parser_instance.parse_html("hays", case.case_number, case.html, logger=self.mock_logger)
+            del case_data["html_hash"], case_data["parser_version"]
+            self.assertEqual(json.dumps(case_data), json.dumps(case.expected), f"{case.variant} {case.case_number}")
+
+        # a case without dispositions keeps its events, and the spec parser agrees
+        no_dispositions = next(case for case in cases if case.variant == "no_dispositions")
+        self.assertNotIn("Disposition Information", no_dispositions.expected)
+        self.assertTrue(no_dispositions.expected["Other Events and Hearings"])
+        _, spec_function = self.parser_instance.get_class_and_method(
+            logger=self.mock_logger, county="hays", use_spec=True
+        )
+        case_data = spec_function(
+            "hays", no_dispositions.case_number, self.mock_logger,
+            BeautifulSoup(self.parser_instance.decode_case_html(no_dispositions.html), "html.parser"),
+        )
+        self.assertEqual(json.dumps(case_data), json.dumps(no_dispositions.expected))
+
+        # reproducible per case, whatever slice of the corpus it is generated in
+        self.assertEqual(synthetic.generate_case(3, seed=7).html, cases[3].html)
+
+        counts = synthetic.write_corpus(self.test_dir, 5, seed=7, malformed_rate=0.0, archive=True)
+        self.assertEqual(counts, {"valid": 5})
+        self.assertEqual(len(os.listdir(os.path.join(self.test_dir, "expected_json"))), 5)
+        with open(os.path.join(self.test_dir, "manifest.jsonl"), "r") as f:
+            self.assertEqual(json.loads(f.readline())["case_number"], cases[0].case_number)
+
+    def test_benchmark_run_and_compare(self):
+        from . import benchmark
+
+        with patch.object(benchmark, "FIXTURE_COPIES", 2):
+            results = benchmark.run_benchmarks(case_count=2, rounds=1, names=["parser_hays", "parse_directory"])
+        self.assertEqual(
+            sorted(results),
+            ["parse_directory[fixture]", "parse_directory[synthetic]", "parser_hays[fixture]", "parser_hays[synthetic]"],
+        )
+        self.assertEqual(results["parse_directory[synthetic]"]["cases"], 2)
+
+        with patch.object(benchmark, "get_git_commit", return_value=("a" * 40, False)):
+            path = benchmark.save_results(results, 2, 0, results_dir=self.test_dir)
+        self.assertEqual(os.path.basename(path), "aaaaaaaaaaaa.json")
+        base = benchmark.load_results(path)
+        self.assertEqual(base["commit"], "a" * 40)
+
+        head = json.loads(json.dumps(base))
+        head["results"]["parser_hays[fixture]"]["median_seconds_per_case"] *= 1.5
+        head["results"]["parser_hays[synthetic]"]["median_seconds_per_case"] *= 1.05
+        _, regressions = benchmark.compare_results(base, head, threshold=0.1)
+        self.assertEqual(regressions, ["parser_hays[fixture]"])
+
+    def test_directory_watcher_waits_for_writes_to_settle(self):
+        watch_dir = os.path.join(self.test_dir, "case_html")
+        os.makedirs(watch_dir)
+        with open(os.path.join(watch_dir, "old.html"), "w") as f:
+            f.write("<html>")
+        watcher = parser.watch.DirectoryWatcher(watch_dir, settle_seconds=2)
+
+        with open(os.path.join(watch_dir, "new.html"), "w") as f:
+            f.write("<html>")
+        self.assertEqual(watcher.poll(now=0), [])
+        self.assertEqual(watcher.poll(now=1), [])
+        # a rewrite restarts the clock
+        with open(os.path.join(watch_dir, "new.html"), "a") as f:
+            f.write("<body>")
+        self.assertEqual(watcher.poll(now=2.5), [])
+        self.assertEqual(watcher.poll(now=4), [])
+        self.assertEqual(watcher.poll(now=4.5), ["new.html"])
+        self.assertEqual(watcher.poll(now=10), [])
+
+    @patch("src.cleaner.Cleaner.get_or_create_folder_path", return_value="cleaned")
+    @patch("src.cleaner.Cleaner.process_single_case")
+    def test_parser_watch_parses_new_files(self, mock_process_single_case, mock_get_folder):
+        case_html_path = os.path.join(self.test_dir, "hays", "case_html")
+        os.makedirs(case_html_path)
+        shutil.copy(
+            os.path.join(project_root, "resources", "test_files", "test_123456.html"),
+            os.path.join(case_html_path, "123456.html"),
+        )
+        manifest_path = os.path.join(self.test_dir, "html_hash_manifest.json")
+        with patch.object(
+            self.parser_instance, "get_directories", return_value=(case_html_path, self.case_json_path)
+        ), patch.object(self.parser_instance, "get_html_hash_manifest_path", return_value=manifest_path), \
+                patch.object(self.parser_instance, "get_error_ledger_path",
+                             return_value=os.path.join(self.test_dir, "ledger.jsonl")):
+            self.parser_instance.watch(
+                "hays", poll_interval=0, settle_seconds=0, clean=True, catch_up=True, max_polls=2
+            )
+            self.assertEqual(os.listdir(self.case_json_path), ["123456.json"])
+            mock_process_single_case.assert_called_once_with(self.case_json_path, "123456.json", "cleaned")
+
+            # rewriting the same HTML doesn't parse it again
+            case_json_file = os.path.join(self.case_json_path, "123456.json")
+            os.utime(case_json_file, (0, 0))
+            os.utime(os.path.join(case_html_path, "123456.html"))
+            self.parser_instance.watch("hays", poll_interval=0, settle_seconds=0, catch_up=True, max_polls=2)
+            self.assertEqual(os.path.getmtime(case_json_file), 0)
+
+    def test_parse_pipeline_parses_scraped_pages_without_rereading(self):
+        from ..parser.pipeline import ParsePipeline
+
+        with open(os.path.join(project_root, "resources", "test_files", "test_123456.html"), "rb") as f:
+            case_html = f.read().decode("utf-8", errors="ignore")
+        case_html_path = os.path.join(self.test_dir, "hays", "case_html")
+        os.makedirs(case_html_path)
+        with patch.object(
+            self.parser_instance, "get_directories", return_value=(case_html_path, self.case_json_path)
+        ), patch.object(self.parser_instance, "get_html_hash_manifest_path",
+                        return_value=os.path.join(self.test_dir, "html_hash_manifest.json")), \
+                patch.object(self.parser_instance, "get_error_ledger_path",
+                             return_value=os.path.join(self.test_dir, "ledger.jsonl")), \
+                patch.object(self.parser_instance, "read_case_html", side_effect=AssertionError("re-read")):
+            for workers in (1, 2):
+                with ParsePipeline(self.parser_instance, "hays", workers=workers, queue_size=1) as pipeline:
+                    for case_id in ("100", "101", "102"):
+                        scraper.helpers.save_case_html(case_html_path, f"{workers}{case_id}", case_html, pipeline)
+                self.assertEqual(pipeline.run_counts, {"parsed": 3, "skipped": 0, "failed": 0})
+
+        # the pages are still archived, and parse to the same JSON as the batch parser
+        self.assertEqual(len(os.listdir(case_html_path)), 6)
+        self.assertEqual(len(os.listdir(self.case_json_path)), 6)
+        with open(os.path.join(self.case_json_path, "2101.json"), "r") as f:
+            case_data = json.load(f)
+        self.assertEqual(case_data["Case Metadata"]["odyssey id"], "2101")
+        self.assertEqual(
+            case_data["Charge Information"],
+            self.parser_instance.parse_html("hays", "2101", case_html.encode("utf-8"))["Charge Information"],
+        )
 
     def test_parser_end_to_end(self, county="hays", case_number='123456'):
 
@@ -955,3 +1583,526 @@ class CleanTestCase(unittest.TestCase):
         # cleaner(counter="hays")
 
         # Need to finish coding this.
+
+    def test_charge_index_normalizes_caches_and_fuzzy_matches(self):
+        from ..cleaner.charges import ChargeIndex, normalize_charge_name
+
+        self.assertEqual(
+            normalize_charge_name("Agg Aslt w/Deadly Weapon - SBI"),
+            "AGGRAVATED ASSAULT WITH DEADLY WEAPON SERIOUS BODILY INJURY",
+        )
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        charge_map_path = os.path.join(test_dir, "charges.json")
+        cache_path = os.path.join(test_dir, "charges.pickle")
+        with open(charge_map_path, "w") as f:
+            json.dump(
+                [
+                    {"charge_name": "POSS CS PG 1 <1G", "uccs_code": "3090"},
+                    {"charge_name": "FRAUDULENT USE OR POSSESSION OF IDENTIFYING INFORMATION", "uccs_code": "2040"},
+                ],
+                f,
+            )
+
+        index = ChargeIndex.load(charge_map_path, cache_path)
+        self.assertEqual(index["POSS CS PG 1 <1G"]["uccs_code"], "3090")
+        self.assertEqual(index["Possession CS, PG 1 <1g"]["uccs_code"], "3090")
+        self.assertEqual(index["Fraudulent use or poss. of identifying info"]["uccs_code"], "2040")
+        self.assertNotIn("FRAUDULNT USE OR POSESSION OF IDENTIFYING INFO", index)
+
+        # the second load comes from the cache, with the fuzzy fallback turned on
+        with patch("json.load", side_effect=AssertionError("read the JSON")):
+            index = ChargeIndex.load(charge_map_path, cache_path, fuzzy_cutoff=0.85)
+        with patch("difflib.get_close_matches", wraps=__import__("difflib").get_close_matches) as mock_match:
+            for _ in range(2):
+                self.assertEqual(index["FRAUDULNT USE OR POSESSION OF IDENTIFYING INFO"]["uccs_code"], "2040")
+                self.assertIsNone(index.get("DRIVING WHILE INTOXICATED"))
+            self.assertEqual(mock_match.call_count, 2)
+
+        # a cache others can write to is never unpickled, only rebuilt
+        os.chmod(cache_path, 0o666)
+        with patch("pickle.load", side_effect=AssertionError("read a shared cache")), \
+                self.assertLogs(level="WARNING"):
+            index = ChargeIndex.load(charge_map_path, cache_path)
+        self.assertEqual(index["POSS CS PG 1 <1G"]["uccs_code"], "3090")
+        self.assertEqual(os.stat(cache_path).st_mode & 0o777, 0o600)
+
+        # names that normalize alike but map to different codes, in the shipped map
+        with self.assertLogs(level="WARNING"):
+            shipped = ChargeIndex.load(cache_path=None)
+        self.assertEqual(shipped.get("Unauth Use of Motor Vehicle")["uccs_code"], "2130")
+        self.assertEqual(shipped.get("UNAUTH USE OF MV")["uccs_code"], "2010")
+        self.assertEqual(shipped.get("aggravated sexual assault ")["uccs_code"], "1070")
+        self.assertEqual(
+            shipped.get("aggravated sexual assault ")["uccs_code"], shipped.get("AGGRAVATED SEXUAL ASSAULT")["uccs_code"]
+        )
+        for key, names in shipped.ambiguous.items():
+            self.assertNotIn(key, shipped.normalized)
+            self.assertGreater(len({shipped.exact[name]["uccs_code"] for name in names}), 1)
+
+        # the cleaner maps charges through the index
+        cleaner_instance = cleaner.Cleaner()
+        charges, earliest_charge_date = cleaner_instance.process_charges(
+            [{"level": "F", "charges": "poss. cs pg 1 <1g", "statute": "481.115", "date": "01/02/2020"}],
+            index,
+        )
+        self.assertEqual(charges[0]["uccs_code"], "3090")
+        self.assertEqual(earliest_charge_date, "2020-01-02")
+
+    def test_process_json_files_in_parallel(self):
+        from ..cleaner import charges
+
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        case_json_path = os.path.join(test_dir, "case_json")
+        os.makedirs(case_json_path)
+        for case_number in range(10):
+            with open(os.path.join(case_json_path, f"{case_number}.json"), "w") as f:
+                json.dump(
+                    {
+                        "code": f"CR-{case_number}",
+                        "county": "hays",
+                        "html_hash": "abc",
+                        "party information": {
+                            "appointed or retained": "Court Appointed",
+                            "defense attorney": "Jane Doe",
+                            "defense attorney phone number": "512-555-0100",
+                        },
+                        "charge information": [
+                            {"level": "F3", "charges": "MURDER", "statute": "19.02", "date": "01/02/2020"}
+                        ],
+                        "other events and hearings": [["01/03/2020", "Motion To Suppress"]],
+                    },
+                    f,
+                )
+        with open(os.path.join(case_json_path, "broken.json"), "w") as f:
+            f.write("{")
+
+        # built here without the on-disk cache, the forked workers inherit it
+        charge_index = charges.ChargeIndex.load(cache_path=None)
+        cleaner_instance = cleaner.Cleaner()
+        for workers in (1, 2):
+            cleaned_path = os.path.join(test_dir, f"cleaned_{workers}")
+            os.makedirs(cleaned_path)
+            with patch.dict(charges._charge_indexes, {(os.path.abspath(charges.CHARGE_MAP_PATH), None): charge_index}), \
+                    patch.object(cleaner_instance, "get_or_create_folder_path", return_value=cleaned_path), \
+                    patch.object(cleaner_instance, "get_clean_manifest_path",
+                                 return_value=os.path.join(test_dir, f"clean_manifest_{workers}.json")):
+                summary = cleaner_instance.process_json_files("hays", case_json_path, workers=workers, chunksize=3)
+            self.assertEqual(summary["cleaned"], 10)
+            self.assertEqual(summary["failed"], 1)
+            self.assertEqual(list(summary["errors"]), ["broken.json"])
+            self.assertEqual(len(os.listdir(cleaned_path)), 10)
+            with open(os.path.join(cleaned_path, "3.json"), "r") as f:
+                cleaned_case = json.load(f)
+            self.assertEqual(cleaned_case["charges"][0]["uccs_code"], charge_index["MURDER"]["uccs_code"])
+            self.assertEqual(cleaned_case["motions"], ["Motion To Suppress"])
+
+    def test_process_json_files_skips_unchanged_cases(self):
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        case_json_path = os.path.join(test_dir, "case_json")
+        cleaned_path = os.path.join(test_dir, "case_json_cleaned")
+        os.makedirs(case_json_path)
+        os.makedirs(cleaned_path)
+
+        def write_case(case_number, html_hash):
+            with open(os.path.join(case_json_path, f"{case_number}.json"), "w") as f:
+                json.dump({"code": case_number, "html_hash": html_hash}, f)
+
+        for case_number in ("1", "2", "3"):
+            write_case(case_number, "hash")
+        cleaner_instance = cleaner.Cleaner()
+        clean_case_data = lambda input_dict: {"case_number": input_dict["code"]}
+
+        def run(**kwargs):
+            return cleaner_instance.process_json_files("hays", case_json_path, **kwargs)
+
+        with patch.object(cleaner_instance, "get_or_create_folder_path", return_value=cleaned_path), \
+                patch.object(cleaner_instance, "get_clean_manifest_path",
+                             return_value=os.path.join(test_dir, "clean_manifest.json")), \
+                patch.object(cleaner_instance, "clean_case_data", side_effect=clean_case_data) as mock_clean:
+            self.assertEqual(run()["cleaned"], 3)
+            summary = run()
+            self.assertEqual((summary["cleaned"], summary["skipped"], summary["failed"]), (0, 3, 0))
+            self.assertEqual(mock_clean.call_count, 3)
+
+            # a changed page, a deleted output and a case that now fails are each re-cleaned
+            write_case("1", "new hash")
+            os.remove(os.path.join(cleaned_path, "2.json"))
+            with open(os.path.join(case_json_path, "3.json"), "w") as f:
+                f.write("{")
+            summary = run()
+            self.assertEqual((summary["cleaned"], summary["skipped"], summary["failed"]), (2, 0, 1))
+            write_case("3", "hash")
+            self.assertEqual(run()["cleaned"], 1)
+
+            # so is every case when the charge map or the cleaner changes, or with force
+            with patch("src.cleaner.get_charge_map_hash", return_value="other map"):
+                self.assertEqual(run()["cleaned"], 3)
+            with patch("src.cleaner.CLEANER_VERSION", "2.0.0"):
+                self.assertEqual(run()["cleaned"], 3)
+            # or the fuzzy charge cutoff, or the good motions list
+            with patch.object(cleaner_instance, "fuzzy_charge_cutoff", 0.9):
+                self.assertEqual(run()["cleaned"], 3)
+            with patch.object(cleaner_instance, "motion_matcher",
+                              cleaner.get_motion_matcher(tuple(cleaner.GOOD_MOTIONS[:-1]))):
+                self.assertEqual(run()["cleaned"], 3)
+            self.assertEqual(run(force=True)["cleaned"], 3)
+            self.assertEqual(run()["skipped"], 3)
+
+    def test_motion_matcher_matches_per_motion_search(self):
+        from ..cleaner import GOOD_MOTIONS
+        from ..tester import synthetic
+
+        cleaner_instance = cleaner.Cleaner()
+        events = [
+            ["02/24/2016", "Arraignment", "(Judicial Officer: Henry, William R)"],
+            ["03/01/2016", "MOTION TO REDUCE BOND HEARING", "Result: Granted"],
+            ["04/05/2016", "Defense motion in limine, motion to suppress"],
+            "Motion for Discovery",
+        ]
+        self.assertEqual(
+            cleaner_instance.find_good_motion_events(events, GOOD_MOTIONS),
+            [
+                {"motion": "Motion to Reduce Bond", "event": "MOTION TO REDUCE BOND HEARING", "date": "2016-03-01"},
+                {"motion": "Motion to Reduce Bond Hearing", "event": "MOTION TO REDUCE BOND HEARING", "date": "2016-03-01"},
+                {"motion": "Motion To Suppress", "event": "Defense motion in limine, motion to suppress", "date": "2016-04-05"},
+                {"motion": "Motion In Limine", "event": "Defense motion in limine, motion to suppress", "date": "2016-04-05"},
+                {"motion": "Motion for Discovery", "event": "Motion for Discovery", "date": ""},
+            ],
+        )
+
+        # the same motions as checking each motion against every event
+        def contains_motion(motion, event):
+            if isinstance(event, list):
+                return any(contains_motion(motion, item) for item in event)
+            return motion.lower() in event.lower()
+
+        rng = random.Random(3)
+        for case in synthetic.generate_cases(200, seed=3, malformed_rate=0.0):
+            case_events = case.expected["Other Events and Hearings"]
+            for _ in range(rng.randint(0, 3)):
+                motion = rng.choice(GOOD_MOTIONS)
+                case_events.append(["01/02/2020", rng.choice([motion.upper(), motion.lower(), f"Defense {motion}"])])
+            self.assertEqual(
+                cleaner_instance.find_good_motions(case_events, GOOD_MOTIONS),
+                [motion for motion in GOOD_MOTIONS if contains_motion(motion, case_events)],
+            )
+        self.assertEqual(cleaner_instance.find_good_motions(events, []), [])
+
+    def test_batch_cleaning_matches_single_case_cleaning(self):
+        from ..cleaner import charges
+        from ..tester import synthetic
+
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        case_json_path = os.path.join(test_dir, "case_json")
+        os.makedirs(case_json_path)
+        rng = random.Random(5)
+        charge_names = ["MURDER", "Poss CS PG 1 <1G", "NOT A REAL CHARGE", "theft prop >=$100<$750"]
+        for case in synthetic.generate_cases(60, seed=5, malformed_rate=0.0):
+            input_dict = {**case.expected, "html_hash": case.case_number}
+            for charge in input_dict["Charge Information"]:
+                charge["charges"] = rng.choice(charge_names + [charge["charges"]])
+                charge["date"] = rng.choice([charge["date"], "13/45/2020", "1/2/2020"])
+            if rng.random() < 0.2:
+                del input_dict["Defendent Information"]["defense attorney"]
+            with open(os.path.join(case_json_path, f"{case.case_number}.json"), "w") as f:
+                json.dump(input_dict, f)
+        with open(os.path.join(case_json_path, "no_charges.json"), "w") as f:
+            json.dump({**input_dict, "Charge Information": []}, f)
+        with open(os.path.join(case_json_path, "bad_charge.json"), "w") as f:
+            json.dump({**input_dict, "Charge Information": [{"level": "F1"}]}, f)
+
+        cleaner_instance = cleaner.Cleaner()
+        summaries = {}
+        reports = {}
+        charge_index = charges.ChargeIndex.load(cache_path=None)
+        for batch_size in (None, 7):
+            cleaned_path = os.path.join(test_dir, f"cleaned_{batch_size}")
+            os.makedirs(cleaned_path)
+            with patch.dict(charges._charge_indexes, {(os.path.abspath(charges.CHARGE_MAP_PATH), None): charge_index}), \
+                    patch.object(cleaner_instance, "get_or_create_folder_path", return_value=cleaned_path), \
+                    patch.object(cleaner_instance, "get_clean_manifest_path",
+                                 return_value=os.path.join(test_dir, f"clean_manifest_{batch_size}.json")):
+                summaries[batch_size] = cleaner_instance.process_json_files(
+                    "hays", case_json_path, batch_size=batch_size
+                )
+            reports[batch_size] = cleaner_instance.report
+        self.assertEqual(summaries[None]["cleaned"], 61)
+        self.assertGreater(reports[None].unmapped_charges["NOT A REAL CHARGE"], 0)
+        self.assertGreater(reports[None].unparsed_dates, 0)
+        self.assertEqual(reports[7].unmapped_charges, reports[None].unmapped_charges)
+        self.assertEqual(reports[7].unparsed_dates, reports[None].unparsed_dates)
+        self.assertEqual(len(reports[7].timer.case_times), len(reports[None].timer.case_times))
+        self.assertEqual(list(summaries[7]["errors"]), ["bad_charge.json"])
+        self.assertEqual(
+            {name: count for name, count in summaries[7].items() if name != "errors"},
+            {name: count for name, count in summaries[None].items() if name != "errors"},
+        )
+        file_names = sorted(os.listdir(os.path.join(test_dir, "cleaned_None")))
+        self.assertEqual(file_names, sorted(os.listdir(os.path.join(test_dir, "cleaned_7"))))
+        for file_name in file_names:
+            with open(os.path.join(test_dir, "cleaned_None", file_name), "rb") as f:
+                single = f.read()
+            with open(os.path.join(test_dir, "cleaned_7", file_name), "rb") as f:
+                self.assertEqual(f.read(), single, file_name)
+
+    def test_cleaner_reads_parser_output_through_schema_adapter(self):
+        from ..cleaner import charges, schema
+
+        with open(os.path.join(project_root, "resources", "test_files", "test_123456.html"), "rb") as f:
+            case_data = parser.Parser().parse_html("hays", "123456", f.read(), logger=logging.getLogger(__name__))
+        view = schema.adapt_case(case_data)
+        legacy_case = {field: view[field] for field in schema.FIELD_PATHS[schema.LEGACY_VERSION]}
+
+        self.assertEqual(view.schema_version, parser.PARSER_VERSION)
+        self.assertIs(view.case, case_data)
+        self.assertIs(view["charge information"], case_data["Charge Information"])
+        self.assertIs(schema.adapt_case(view), view)
+        self.assertEqual(schema.adapt_case(legacy_case).schema_version, schema.LEGACY_VERSION)
+        self.assertEqual(dict(schema.adapt_case(legacy_case)), legacy_case)
+        self.assertNotIn("parser_version", schema.adapt_case(legacy_case))
+        with self.assertRaises(KeyError):
+            view["not a field"]
+        with self.assertLogs(level="WARNING"):
+            future_view = schema.adapt_case({**case_data, "parser_version": "99.0.0"})
+        self.assertEqual(future_view.schema_version, schema.LATEST_VERSION)
+
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        case_json_path = os.path.join(test_dir, "case_json")
+        os.makedirs(case_json_path)
+        with open(os.path.join(case_json_path, "123456.json"), "w") as f:
+            json.dump(case_data, f)
+        with open(os.path.join(case_json_path, "legacy.json"), "w") as f:
+            json.dump(legacy_case, f)
+
+        cleaner_instance = cleaner.Cleaner()
+        charge_index = charges.ChargeIndex.load(cache_path=None)
+        for batch_size in (None, 2):
+            cleaned_path = os.path.join(test_dir, f"cleaned_{batch_size}")
+            os.makedirs(cleaned_path)
+            with patch.dict(charges._charge_indexes, {(os.path.abspath(charges.CHARGE_MAP_PATH), None): charge_index}), \
+                    patch.object(cleaner_instance, "get_or_create_folder_path", return_value=cleaned_path), \
+                    patch.object(cleaner_instance, "get_clean_manifest_path",
+                                 return_value=os.path.join(test_dir, f"clean_manifest_{batch_size}.json")):
+                summary = cleaner_instance.process_json_files("hays", case_json_path, batch_size=batch_size)
+                self.assertEqual((summary["cleaned"], summary["failed"]), (2, 0))
+                # cleaned once, then skipped as unchanged
+                summary = cleaner_instance.process_json_files("hays", case_json_path, batch_size=batch_size)
+                self.assertEqual((summary["cleaned"], summary["skipped"]), (0, 2))
+            with open(os.path.join(cleaned_path, "123456.json"), "r") as f:
+                cleaned = json.load(f)
+            with open(os.path.join(cleaned_path, "legacy.json"), "r") as f:
+                cleaned_legacy = json.load(f)
+            self.assertEqual(cleaned["case_number"], case_data["Case Metadata"]["code"])
+            self.assertEqual(cleaned, cleaned_legacy)
+
+    def test_cleaner_reads_unversioned_parser_output(self):
+        from ..cleaner import charges, schema
+
+        # The layout parsed cases had before the parser stamped its version or wrote the events.
+        with open(os.path.join(project_root, "resources", "test_files", "test_123456.json"), "r") as f:
+            case_data = json.load(f)
+        del case_data["parser_version"], case_data["Other Events and Hearings"]
+
+        with self.assertNoLogs(level="WARNING"):
+            view = schema.adapt_case(case_data)
+        self.assertEqual(view.schema_version, schema.SECTIONS_VERSION)
+        self.assertEqual(view["other events and hearings"], [])
+        self.assertIsNone(view.get("parser_version"))
+
+        cleaner_instance = cleaner.Cleaner()
+        charge_index = charges.ChargeIndex.load(cache_path=None)
+        with patch.dict(charges._charge_indexes, {(os.path.abspath(charges.CHARGE_MAP_PATH), None): charge_index}):
+            cleaned = cleaner_instance.clean_case_data(case_data)
+        self.assertEqual(cleaned["case_number"], case_data["Case Metadata"]["code"])
+        self.assertEqual((cleaned["motions"], cleaned["motion_events"]), ([], []))
+        self.assertEqual(len(cleaned["charges"]), len(case_data["Charge Information"]))
+
+    def test_pseudonymizer_memoizes_keys_and_persists_attorney_table(self):
+        import csv
+        import xxhash
+        from ..cleaner import charges, pseudonyms
+
+        unkeyed = pseudonyms.Pseudonymizer()
+        self.assertEqual(unkeyed.hash_value("CR-1"), xxhash.xxh64("CR-1").hexdigest())
+        keyed = pseudonyms.Pseudonymizer(b"secret")
+        self.assertNotEqual(keyed.hash_value("CR-1"), unkeyed.hash_value("CR-1"))
+        self.assertEqual(len(keyed.hash_value("CR-1")), len(unkeyed.hash_value("CR-1")))
+        self.assertNotEqual(keyed.hash_scheme, pseudonyms.Pseudonymizer(b"other").hash_scheme)
+        self.assertNotIn("secret", keyed.hash_scheme)
+        with self.assertRaises(ValueError):
+            pseudonyms.Pseudonymizer(b"k" * 65)
+        with patch.object(keyed, "hash_value", wraps=keyed.hash_value) as hash_value:
+            hashes = keyed.hash_values(["CR-1", "CR-2", "CR-1"])
+            self.assertEqual(hash_value.call_count, 2)
+            self.assertEqual(hashes[0], hashes[2])
+            attorney_id = keyed.attorney_id("Jane Doe", "512-555-0100")
+            self.assertEqual(keyed.attorney_id("Jane Doe", "512-555-0100"), attorney_id)
+            self.assertEqual(hash_value.call_count, 3)
+        self.assertEqual(keyed.take_new_attorneys(), [[attorney_id, "Jane Doe", "512-555-0100"]])
+        self.assertEqual(keyed.take_new_attorneys(), [])
+        with patch.object(pseudonyms, "load_dotenv"), patch.dict(os.environ, {"PSEUDONYM_KEY": "secret"}):
+            self.assertEqual(pseudonyms.load_pseudonym_key(), b"secret")
+
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        case_json_path = os.path.join(test_dir, "case_json")
+        cleaned_path = os.path.join(test_dir, "case_json_cleaned")
+        os.makedirs(case_json_path)
+        os.makedirs(cleaned_path)
+        attorneys = [("Jane Doe", "512-555-0100"), ("John Roe", "512-555-0199")]
+        for case_number in range(8):
+            name, phone = attorneys[case_number % 2]
+            with open(os.path.join(case_json_path, f"{case_number}.json"), "w") as f:
+                json.dump(
+                    {
+                        "code": f"CR-{case_number}",
+                        "county": "hays",
+                        "html_hash": f"hash{case_number}",
+                        "party information": {
+                            "appointed or retained": "Court Appointed",
+                            "defense attorney": name,
+                            "defense attorney phone number": phone,
+                        },
+                        "charge information": [],
+                        "other events and hearings": [],
+                    },
+                    f,
+                )
+
+        def read_attorney_table():
+            with open(os.path.join(test_dir, "attorneys.csv"), "r", newline="") as f:
+                return list(csv.DictReader(f))
+
+        charge_index = charges.ChargeIndex.load(cache_path=None)
+        for key, workers, batch_size, expected_cleaned in [
+            (None, 2, None, 8), (None, 1, None, 0), (b"secret", 1, 3, 8), (b"secret", 2, None, 0)
+        ]:
+            cleaner_instance = cleaner.Cleaner(pseudonym_key=key)
+            with patch.dict(charges._charge_indexes, {(os.path.abspath(charges.CHARGE_MAP_PATH), None): charge_index}), \
+                    patch.object(cleaner_instance, "get_or_create_folder_path", return_value=cleaned_path), \
+                    patch.object(cleaner_instance, "get_clean_manifest_path",
+                                 return_value=os.path.join(test_dir, "clean_manifest.json")):
+                summary = cleaner_instance.process_json_files(
+                    "hays", case_json_path, workers=workers, chunksize=1, batch_size=batch_size
+                )
+            self.assertEqual(summary["cleaned"], expected_cleaned, (key, workers))
+
+            # every attorney in the cleaned cases joins to one row of the table, written with this key
+            rows = read_attorney_table()
+            self.assertEqual(len(rows), 2)
+            self.assertEqual({row["hash_scheme"] for row in rows}, {cleaner_instance.pseudonymizer.hash_scheme})
+            table = {row["attorney_id"]: (row["defense_attorney"], row["defense_attorney_phone_number"]) for row in rows}
+            for case_number in range(8):
+                with open(os.path.join(cleaned_path, f"{case_number}.json"), "r") as f:
+                    cleaned_case = json.load(f)
+                self.assertEqual(table[cleaned_case["defense_attorney"]], attorneys[case_number % 2])
+                self.assertEqual(
+                    cleaned_case["cause_number_redacted"],
+                    cleaner_instance.pseudonymizer.hash_value(f"CR-{case_number}"),
+                )
+
+    def test_clean_report_times_stages_and_ranks_unmapped_charges(self):
+        from ..cleaner import charges
+
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        case_json_path = os.path.join(test_dir, "case_json")
+        cleaned_path = os.path.join(test_dir, "case_json_cleaned")
+        os.makedirs(case_json_path)
+        os.makedirs(cleaned_path)
+        for case_number, charge_names in [("1", ["NOT A CHARGE", "MURDER"]), ("2", ["NOT A CHARGE", "ALSO NOT"])]:
+            input_dict = {
+                "code": case_number,
+                "county": "hays",
+                "html_hash": f"hash{case_number}",
+                "party information": {
+                    "appointed or retained": "Court Appointed",
+                    "defense attorney": "Jane Doe",
+                    "defense attorney phone number": "512-555-0100",
+                },
+                "charge information": [
+                    {"level": "F1", "charges": name, "statute": "19.02", "date": "07/07/2016"}
+                    for name in charge_names
+                ] + [{"level": "F1", "charges": "MURDER", "statute": "19.02", "date": "not a date"}],
+                "other events and hearings": [["07/08/2016", "Motion To Suppress"]],
+            }
+            with open(os.path.join(case_json_path, f"{case_number}.json"), "w") as f:
+                json.dump(input_dict, f)
+
+        cleaner_instance = cleaner.Cleaner()
+        charge_index = charges.ChargeIndex.load(cache_path=None)
+        with patch.dict(charges._charge_indexes, {(os.path.abspath(charges.CHARGE_MAP_PATH), None): charge_index}), \
+                patch.object(cleaner_instance, "get_or_create_folder_path", return_value=cleaned_path), \
+                patch.object(cleaner_instance, "get_clean_manifest_path",
+                             return_value=os.path.join(test_dir, "clean_manifest.json")):
+            with self.assertLogs(level="INFO") as logs:
+                cleaner_instance.process_json_files("hays", case_json_path)
+            report = cleaner_instance.report
+            self.assertEqual(len(report.timer.case_times), 2)
+            for stage_name in ["load", "hashing", "charges", "motions", "write"]:
+                self.assertEqual(len(report.timer.stage_times[stage_name]), 2, stage_name)
+            self.assertEqual(report.unmapped_charges.most_common(), [("NOT A CHARGE", 2), ("ALSO NOT", 1)])
+            self.assertEqual(report.unparsed_dates, 2)
+            summary = report.summary()
+            self.assertTrue(summary[0].startswith("stage"))
+            self.assertIn("Unmapped charges: 3 (2 distinct), unparseable charge dates: 2", summary)
+            self.assertEqual(summary[-2:], [f"{2:>8}  NOT A CHARGE", f"{1:>8}  ALSO NOT"])
+            self.assertFalse(any("Couldn't find this charge" in line for line in logs.output))
+            self.assertTrue(any("Clean timings by stage" in line for line in logs.output))
+
+            # unchanged cases are skipped and left out of the timings
+            cleaner_instance.process_json_files("hays", case_json_path)
+            self.assertEqual(len(cleaner_instance.report.timer.case_times), 0)
+            self.assertEqual(cleaner_instance.report.unmapped_charges, {})
+
+    def test_process_jsonl_stream_reads_and_writes_gzipped_and_std_streams(self):
+        import gzip
+        import io
+        from ..cleaner import charges
+        from ..tester import synthetic
+
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        input_dicts = [
+            {**case.expected, "html_hash": ""}
+            for case in synthetic.generate_cases(20, seed=2, malformed_rate=0.0)
+        ]
+        input_path = os.path.join(test_dir, "cases.jsonl.gz")
+        with gzip.open(input_path, "wt") as f:
+            for input_dict in input_dicts:
+                f.write(json.dumps(input_dict) + "\n")
+            f.write("\n{not json\n")
+            f.write(json.dumps({"code": "CR-BROKEN"}) + "\n")
+
+        def read_cases(lines):
+            # parsing_date is the day of the run
+            return [{**json.loads(line), "parsing_date": None} for line in lines]
+
+        charge_index = charges.ChargeIndex.load(cache_path=None)
+        self.enterContext(
+            patch.dict(charges._charge_indexes, {(os.path.abspath(charges.CHARGE_MAP_PATH), None): charge_index})
+        )
+        cleaner_instance = cleaner.Cleaner()
+        expected = [
+            {**cleaner_instance.clean_case_data(input_dict), "parsing_date": None} for input_dict in input_dicts
+        ]
+        output_path = os.path.join(test_dir, "cleaned.jsonl.gz")
+        summary = cleaner_instance.process_jsonl_stream(input_path, output_path)
+        self.assertEqual((summary["cleaned"], summary["failed"]), (20, 1))
+        self.assertEqual(list(summary["errors"]), ["CR-BROKEN"])
+        with gzip.open(output_path, "rt") as f:
+            self.assertEqual(read_cases(f), expected)
+
+        # stdin to stdout, in batches
+        with open(input_path, "rb") as f:
+            stdin = io.TextIOWrapper(io.BytesIO(gzip.decompress(f.read())))
+        stdout = io.TextIOWrapper(io.BytesIO())
+        with patch("sys.stdin", stdin), patch("sys.stdout", stdout):
+            summary = cleaner_instance.process_jsonl_stream("-", "-", batch_size=8)
+        self.assertEqual((summary["cleaned"], summary["failed"]), (20, 1))
+        self.assertEqual(read_cases(stdout.buffer.getvalue().decode("utf-8").splitlines()), expected)
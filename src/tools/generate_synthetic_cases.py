@@ -0,0 +1,68 @@
+"""
+Write a corpus of synthetic Hays case pages, each with the JSON the parser
+should produce for it, for testing and benchmarking at scale. Parse it with
+python -m src.parser -archive <output_dir>/case_html.zip, or copy
+case_html into data/hays, and diff case_json against expected_json.
+"""
+import argparse
+import os
+import sys
+from time import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tester"))
+from synthetic import MALFORMED_VARIANTS, write_corpus
+
+START_TIME = time()
+
+argparser = argparse.ArgumentParser()
+argparser.add_argument(
+    "-count",
+    "-n",
+    type=int,
+    default=10000,
+    help="The number of cases to generate.",
+)
+argparser.add_argument(
+    "-output_dir",
+    "-o",
+    type=str,
+    default=os.path.join(os.path.dirname(__file__), "..", "..", "data", "synthetic"),
+    help="Where to write case_html, expected_json and manifest.jsonl.",
+)
+argparser.add_argument(
+    "-seed",
+    type=int,
+    default=0,
+    help="The same seed always gives the same corpus.",
+)
+argparser.add_argument(
+    "-start",
+    type=int,
+    default=0,
+    help="Index of the first case, to generate a corpus in slices.",
+)
+argparser.add_argument(
+    "-malformed_rate",
+    type=float,
+    default=0.05,
+    help=f"Share of malformed cases, spread over: {', '.join(sorted(MALFORMED_VARIANTS))}.",
+)
+argparser.add_argument(
+    "-archive",
+    action="store_true",
+    help="Write the pages into case_html.zip instead of one file each.",
+)
+argparser.description = "Generate synthetic Hays case HTML with expected JSON."
+args = argparser.parse_args()
+
+counts = write_corpus(
+    args.output_dir,
+    args.count,
+    seed=args.seed,
+    malformed_rate=args.malformed_rate,
+    start=args.start,
+    archive=args.archive,
+)
+for variant, count in sorted(counts.items()):
+    print(f"{variant}: {count}")
+print(f"Generated {sum(counts.values())} cases in {time() - START_TIME:.1f} seconds.")
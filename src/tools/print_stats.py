@@ -1,10 +1,14 @@
 import os
 import json
 import argparse
+import sys
 
 from time import time
 from statistics import mean, median, mode
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "parser"))
+from shards import iter_shard_records
+
 N_LONGEST = 5
 START_TIME = time()
 
@@ -18,15 +22,29 @@ argparser.add_argument(
     default="hays",
     help="The name of the county.",
 )
+argparser.add_argument(
+    "-input_format",
+    "-f",
+    type=str,
+    choices=["json", "jsonl"],
+    default="json",
+    help="Read per-case JSON files from case_json, or the JSONL shards in case_jsonl.",
+)
 argparser.description = "Print stats for the specified county."
 args = argparser.parse_args()
 
-case_json_path = os.path.join(
-    os.path.dirname(__file__), "..", "..", "data", args.county, "case_json"
-)
-for case_file in os.scandir(case_json_path):
-    with open(case_file.path, "r") as file_handle:
-        case_data_list.append(json.loads(file_handle.read()))
+if args.input_format == "jsonl":
+    shard_path = os.path.join(
+        os.path.dirname(__file__), "..", "..", "data", args.county, "case_jsonl"
+    )
+    case_data_list.extend(case_data for _, case_data in iter_shard_records(shard_path))
+else:
+    case_json_path = os.path.join(
+        os.path.dirname(__file__), "..", "..", "data", args.county, "case_json"
+    )
+    for case_file in os.scandir(case_json_path):
+        with open(case_file.path, "r") as file_handle:
+            case_data_list.append(json.loads(file_handle.read()))
 
 
 def print_top_cases_by_lambda(sort_function, description):
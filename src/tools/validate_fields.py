@@ -0,0 +1,91 @@
+"""
+Check every parsed case of one or more counties against field_validation_list.json
+and print per-field missing, "Unknown", too-short and wrong-type rates by county
+and parser version. Exits with status 1 when a gated field is over the limit, so
+it can be used to gate a pipeline run.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from itertools import chain
+from time import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "parser"))
+from shards import iter_shard_records
+from validation import format_report, get_gate_failures, validate_cases
+
+START_TIME = time()
+
+argparser = argparse.ArgumentParser()
+argparser.add_argument(
+    "-county",
+    "-c",
+    type=str,
+    nargs="+",
+    default=["hays"],
+    help="The name of the county, or several.",
+)
+argparser.add_argument(
+    "-input_format",
+    "-f",
+    type=str,
+    choices=["json", "jsonl"],
+    default="json",
+    help="Read per-case JSON files from case_json, or the JSONL shards in case_jsonl.",
+)
+argparser.add_argument(
+    "-output",
+    "-o",
+    type=str,
+    default=None,
+    help="Also write the report to this CSV file.",
+)
+argparser.add_argument(
+    "-gate_importance",
+    type=str,
+    nargs="*",
+    default=["necessary"],
+    help="Importance levels whose fields gate the run.",
+)
+argparser.add_argument(
+    "-max_rate",
+    type=float,
+    default=0.01,
+    help="Highest rate of any check allowed for a gated field.",
+)
+argparser.description = "Validate the parsed fields of the specified counties."
+args = argparser.parse_args()
+
+
+def iter_cases(county):
+    """Yield each parsed case dict of the county from the selected input format."""
+    data_dir = os.path.join(os.path.dirname(__file__), "..", "..", "data", county)
+    if args.input_format == "jsonl":
+        for _, case in iter_shard_records(os.path.join(data_dir, "case_jsonl")):
+            yield case
+        return
+    case_json_path = os.path.join(data_dir, "case_json")
+    for case_file in os.scandir(case_json_path):
+        if case_file.name.endswith(".json"):
+            with open(case_file.path, "r") as file_handle:
+                yield json.load(file_handle)
+
+
+report = validate_cases(chain.from_iterable(iter_cases(county) for county in args.county))
+print("\n".join(format_report(report)))
+
+if args.output:
+    with open(args.output, "w", newline="") as file_handle:
+        writer = csv.DictWriter(file_handle, fieldnames=list(report[0]) if report else [])
+        writer.writeheader()
+        writer.writerows(report)
+
+failures = get_gate_failures(report, args.gate_importance, args.max_rate)
+print(f"\nValidated in {time() - START_TIME:.1f} seconds.")
+if failures:
+    print(f"{len(failures)} gated fields over {args.max_rate:.2%}:")
+    for row in failures:
+        print(f"  {row['county']} {row['parser_version']} {row['field']}")
+    sys.exit(1)